@@ -0,0 +1,85 @@
+"""
+bench_import.py
+
+Start-up cost of importing calculation modules,
+each sample runs in a fresh interpreter
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 20 --output import.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["src", "src.ipr", "src.future_ipr", "src.utils", "matplotlib.pyplot"]
+
+# Prints seconds spent in import and whether matplotlib got loaded
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import %s
+print(time.perf_counter() - start, "matplotlib" in sys.modules)
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    times = []
+    loads_matplotlib = None
+
+    for _ in range(repeat):
+        try:
+            output = subprocess.check_output(
+                [sys.executable, "-c", SNIPPET % (module)], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+            )
+        except subprocess.CalledProcessError:
+            return {"module": module, "error": "import failed"}
+
+        (seconds, loaded) = output.split()
+        times.append(float(seconds))
+        loads_matplotlib = loaded == "True"
+
+    return {
+        "module": module,
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "loads_matplotlib": loads_matplotlib,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Import time of IPyR modules")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="JSON file of results (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        results.append(result)
+
+        if ("error" in result):
+            print("%-20s %s" % (module, result["error"]), file=sys.stderr)
+        else:
+            print("%-20s %9.4f s  matplotlib loaded: %s" % (
+                module, result["median"], result["loads_matplotlib"]
+            ), file=sys.stderr)
+
+    if (args.output):
+        with open(args.output, "w") as file:
+            json.dump({"results": results}, file, indent=2)
+    else:
+        json.dump({"results": results}, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
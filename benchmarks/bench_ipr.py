@@ -0,0 +1,281 @@
+"""
+bench_ipr.py
+
+Benchmark of IPR equations, regressions and production graphs
+over synthetic fleets of increasing size
+
+Usage:
+    python benchmarks/bench_ipr.py
+    python benchmarks/bench_ipr.py --sizes 10 1000 100000 --output after.json
+    python benchmarks/bench_ipr.py --compare before.json after.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from src.utils import eq, numerical
+from src.ipr import TwoPhaseProduction, ThreePhaseProduction
+from src.future_ipr import OilWell
+from src.fleet import WellFleet
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+# Largest fleet evaluated one Python object per well,
+# array benchmarks run for every size
+DEFAULT_MAX_LOOP_SIZE = 10000
+
+TESTS_PER_WELL = 3
+GRAPH_INTERVALS = 12
+
+
+def make_fleet(size: int, seed: int = 0) -> dict:
+    """
+    Synthetic wells with TESTS_PER_WELL Vogel-like tests each
+    """
+
+    rng = np.random.default_rng(seed)
+
+    p_res = rng.uniform(1000, 4000, size)
+    q_max = rng.uniform(500, 5000, size)
+
+    # Test pressures between 30 % and 60 % of reservoir pressure,
+    # so they stay below the future reservoir pressure
+    pr = rng.uniform(0.3, 0.6, (size, TESTS_PER_WELL))
+    p = pr * p_res[:, None]
+    q = q_max[:, None] * eq.vogel_equation_array(p, p_res[:, None])
+
+    return {
+        "p_res": p_res,
+        "q": q,
+        "p": p,
+        "water_cut": rng.uniform(0.05, 0.6, size),
+        "production_change": rng.uniform(0.05, 0.35, size),
+    }
+
+
+def two_phase_wells(fleet: dict) -> list:
+    wells = []
+
+    for i in range(fleet["p_res"].size):
+        well = TwoPhaseProduction(float(fleet["p_res"][i]))
+        well.data.extend_arrays(fleet["q"][i], fleet["p"][i])
+        wells.append(well)
+
+    return wells
+
+
+def bench_scalar_equations(fleet: dict):
+    p = fleet["p"][:, -1].tolist()
+    p_res = fleet["p_res"].tolist()
+
+    for i in range(len(p)):
+        eq.vogel_equation(p[i], p_res[i])
+        eq.fetkovich_equation(p[i], p_res[i], None, 0.8)
+        eq.wiggin_equation("oil", p[i], p_res[i])
+
+
+def bench_array_equations(fleet: dict):
+    p = fleet["p"][:, -1]
+    p_res = fleet["p_res"]
+
+    eq.vogel_equation(p, p_res)
+    eq.fetkovich_equation(p, p_res, None, 0.8)
+    eq.wiggin_equation("oil", p, p_res)
+
+
+def bench_power_regression(fleet: dict):
+    q = fleet["q"]
+    y = fleet["p_res"][:, None]**2 - fleet["p"]**2
+
+    for i in range(q.shape[0]):
+        numerical.power_regression(q[i], y[i])
+
+
+def bench_grouped_power_regression(fleet: dict):
+    (size, tests) = fleet["q"].shape
+    y = fleet["p_res"][:, None]**2 - fleet["p"]**2
+
+    numerical.grouped_power_regression(
+        fleet["q"].ravel(), y.ravel(), np.repeat(np.arange(size), tests), size
+    )
+
+
+def bench_two_phase_graph(method: str):
+    def bench(fleet: dict):
+        for well in two_phase_wells(fleet):
+            q_max = well.calculate_q_max(method, well.data[-1])
+            well.get_production_graph(method, q_max, GRAPH_INTERVALS)
+
+    return bench
+
+
+def bench_three_phase_q_max(fleet: dict):
+    for i in range(fleet["p_res"].size):
+        well = ThreePhaseProduction(float(fleet["p_res"][i]), float(fleet["water_cut"][i]))
+        data = {"q": float(fleet["q"][i, -1]), "p": float(fleet["p"][i, -1])}
+
+        well.calculate_q_max("oil", "wiggin", data)
+        well.calculate_q_max("water", "wiggin", data)
+
+
+def bench_oil_well_future(method: str):
+    def bench(fleet: dict):
+        for i in range(fleet["p_res"].size):
+            p_res = float(fleet["p_res"][i])
+
+            well = OilWell(p_res)
+            well.production_change = float(fleet["production_change"][i])
+            well.future_p_res = p_res * (1 - well.production_change)
+            well.data.extend_arrays(fleet["q"][i], fleet["p"][i])
+
+            data = well.data[-1]
+            well.calculate_present_pi(method, data)
+            well.calculate_q_max("eckmeir_present" if method == "eckmeir" else method, p_res, data)
+            well.calculate_future_pi(method, data)
+            well.calculate_future_q(method, data)
+
+    return bench
+
+
+def bench_fleet(fleet: dict):
+    wells = WellFleet(
+        fleet["p_res"],
+        fleet["q"].ravel(),
+        fleet["p"].ravel(),
+        method="fetkovich",
+        well=np.repeat(np.arange(fleet["p_res"].size), TESTS_PER_WELL),
+    )
+
+    q_max = wells.calculate_q_max()["q_max"]
+    wells.get_production_graph(GRAPH_INTERVALS, q_max)
+
+
+# (name, function, evaluated one Python object per well)
+BENCHMARKS = [
+    ("equations.scalar", bench_scalar_equations, True),
+    ("equations.array", bench_array_equations, False),
+    ("numericals.power_regression", bench_power_regression, True),
+    ("numericals.grouped_power_regression", bench_grouped_power_regression, False),
+    ("TwoPhaseProduction.get_production_graph[vogel]", bench_two_phase_graph("vogel"), True),
+    ("TwoPhaseProduction.get_production_graph[fetkovich]", bench_two_phase_graph("fetkovich"), True),
+    ("ThreePhaseProduction.calculate_q_max[wiggin]", bench_three_phase_q_max, True),
+    ("OilWell.future[standing]", bench_oil_well_future("standing"), True),
+    ("OilWell.future[eckmeir]", bench_oil_well_future("eckmeir"), True),
+    ("OilWell.future[fetkovich]", bench_oil_well_future("fetkovich"), True),
+    ("WellFleet.q_max_and_graph[fetkovich]", bench_fleet, False),
+]
+
+
+def measure(function, fleet: dict, repeat: int) -> list:
+    times = []
+
+    # Hide error messages printed by the calculation methods
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(fleet)
+            times.append(time.perf_counter() - start)
+
+    return times
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list, repeat: int, max_loop_size: int, only: str = None, seed: int = 0) -> dict:
+    results = []
+
+    for size in sizes:
+        fleet = make_fleet(size, seed)
+
+        for (name, function, loop) in BENCHMARKS:
+            if (only is not None and only not in name):
+                continue
+
+            if (loop and size > max_loop_size):
+                continue
+
+            times = measure(function, fleet, repeat)
+
+            results.append({
+                "name": name,
+                "size": size,
+                "repeat": repeat,
+                "min": min(times),
+                "median": float(np.median(times)),
+                "per_well": min(times) / size,
+            })
+
+            print("%-52s %9d wells %12.6f s" % (name, size, min(times)), file=sys.stderr)
+
+    return {
+        "commit": get_commit(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict) -> None:
+    """
+    Print speed-up of every benchmark found in both results
+    """
+
+    times = {(x["name"], x["size"]): x["min"] for x in before["results"]}
+
+    print("before: %s\nafter:  %s" % (before.get("commit"), after.get("commit")))
+
+    for x in after["results"]:
+        key = (x["name"], x["size"])
+        if (key in times):
+            print("%-52s %9d wells %8.2fx" % (x["name"], x["size"], times[key] / x["min"]))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of IPyR calculations")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-loop-size", type=int, default=DEFAULT_MAX_LOOP_SIZE)
+    parser.add_argument("--only", help="run benchmarks whose name contains this text")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file of results (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two JSON results")
+    args = parser.parse_args(argv)
+
+    if (args.compare):
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            compare(json.load(before), json.load(after))
+        return
+
+    result = run(args.sizes, args.repeat, args.max_loop_size, args.only, args.seed)
+
+    if (args.output):
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-from src import ipr, utils, future_ipr
\ No newline at end of file
+from src import ipr, utils, future_ipr, fleet, nodal, monte_carlo, sweep
\ No newline at end of file
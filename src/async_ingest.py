@@ -0,0 +1,308 @@
+"""
+async_ingest.py
+
+Concurrent ingestion of many small well test files
+(e.g. per-well files dropped into spool directories)
+
+Files are read concurrently by a bounded pool of workers,
+parsed off the event loop by the ingest parsers
+and merged into per-well batches ready for fitting
+"""
+
+import asyncio
+import fnmatch
+import io
+import os
+
+from collections import namedtuple
+
+import numpy as np
+
+from .utils import *
+from .ingest import TestChunk, group_by_well, load_productions, read_chunks
+
+# Files read and parsed at the same time
+DEFAULT_CONCURRENCY = 32
+
+# Per-well batches and per-file errors of an ingestion run
+IngestResult = namedtuple("IngestResult", ["batches", "errors"])
+
+
+class DirectorySource:
+    """
+    Well test files of a local directory,
+    blocking file system calls run in the executor
+    """
+
+    def __init__(self, path, pattern: dt.STRING = "*", recursive: dt.BOOLEAN = False, executor=None):
+        """
+        INPUT
+            path: str
+            pattern (file name pattern, e.g. "*.csv"): str
+                DEFAULT: "*"
+            recursive (include sub directories): bool
+                DEFAULT: False
+            executor: concurrent.futures.Executor
+                DEFAULT: None (default executor of event loop)
+        """
+
+        self.path = path
+        self.pattern = pattern
+        self.recursive = recursive
+        self.executor = executor
+
+    def __repr__(self):
+        return "DirectorySource(%r, pattern=%r)" % (self.path, self.pattern)
+
+    def list_names(self) -> list:
+        names = []
+
+        for (root, directories, files) in os.walk(self.path):
+            for name in files:
+                if (fnmatch.fnmatch(name, self.pattern)):
+                    names.append(os.path.relpath(os.path.join(root, name), self.path))
+
+            if (not self.recursive):
+                break
+
+        return sorted(names)
+
+    def read_text(self, name: dt.STRING) -> dt.STRING:
+        with open(os.path.join(self.path, name), "r", newline="") as file:
+            return file.read()
+
+    async def names(self) -> list:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.list_names)
+
+    async def read(self, name: dt.STRING) -> dt.STRING:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.read_text, name)
+
+
+class MemorySource:
+    """
+    In-process fake source of well test files,
+    with optional delay of every read to imitate I/O wait
+    """
+
+    def __init__(self, files: dict, delay: dt.NUMERIC = 0):
+        """
+        INPUT
+            files: { name: text }, name extension selects the parser
+            delay (seconds of every read): numeric
+                DEFAULT: 0
+        """
+
+        self.files = dict(files)
+        self.delay = delay
+
+        self.reads = 0
+        self.active = 0
+        self.max_active = 0
+
+    def __repr__(self):
+        return "MemorySource(files=%d)" % (len(self.files))
+
+    async def names(self) -> list:
+        return sorted(self.files)
+
+    async def read(self, name: dt.STRING) -> dt.STRING:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+        try:
+            if (self.delay > 0):
+                await asyncio.sleep(self.delay)
+
+            self.reads += 1
+
+            return self.files[name]
+        finally:
+            self.active -= 1
+
+
+def parse_text(name: dt.STRING, text: dt.STRING, columns: dict = None) -> dict:
+    """
+    Parse single file into tests of each well
+
+    INPUT
+        name: str, ".csv" is parsed as CSV, otherwise NDJSON
+        text: str
+        columns: dict (see ingest.DEFAULT_COLUMNS)
+
+    OUTPUT
+        { well: TestChunk[] }
+    """
+
+    file = io.StringIO(text)
+    file.name = name
+
+    tests = {}
+
+    for chunk in read_chunks(file, columns=columns):
+        for (well, well_tests) in group_by_well(chunk):
+            tests.setdefault(well, []).append(well_tests)
+
+    return tests
+
+
+def merge_tests(parts: list) -> TestChunk:
+    """
+    Concatenate tests of single well,
+    t is NaN for parts without timestamp
+    """
+
+    has_t = any(x.t is not None for x in parts)
+
+    return TestChunk(
+        np.concatenate([x.well for x in parts]),
+        np.concatenate([x.q for x in parts]),
+        np.concatenate([x.p for x in parts]),
+        np.concatenate([
+            x.t if x.t is not None else np.full(x.q.size, np.nan)
+            for x in parts
+        ]) if has_t else None,
+    )
+
+
+async def iter_files(sources: list, max_concurrency: dt.INT = DEFAULT_CONCURRENCY, executor=None, columns: dict = None):
+    """
+    Read and parse files of all sources concurrently,
+    at most max_concurrency files at a time
+
+    INPUT
+        sources: (DirectorySource | MemorySource)[]
+            any object with async names() and async read(name)
+        max_concurrency: int
+            DEFAULT: DEFAULT_CONCURRENCY
+        executor (parser executor): concurrent.futures.Executor
+            DEFAULT: None (default executor of event loop)
+        columns: dict (see ingest.DEFAULT_COLUMNS)
+
+    OUTPUT
+        async generator of (source index, name, { well: TestChunk[] } | Exception)
+        in order of completion
+    """
+
+    if (max_concurrency < 1):
+        raise ValueError("max_concurrency must be positive")
+
+    loop = asyncio.get_running_loop()
+    listings = await asyncio.gather(*[source.names() for source in sources])
+
+    n_workers = min(max_concurrency, sum(len(names) for names in listings))
+
+    # Bounded queues keep pending files and unread results
+    # below max_concurrency whatever the number of files
+    jobs = asyncio.Queue(max_concurrency)
+    results = asyncio.Queue(max_concurrency)
+
+    async def produce():
+        for (index, (source, names)) in enumerate(zip(sources, listings)):
+            for name in names:
+                await jobs.put((index, source, name))
+
+        # One stop mark for each worker
+        for _ in range(n_workers):
+            await jobs.put(None)
+
+    async def work():
+        while True:
+            job = await jobs.get()
+            if (job is None):
+                break
+
+            (index, source, name) = job
+
+            try:
+                text = await source.read(name)
+                tests = await loop.run_in_executor(executor, parse_text, name, text, columns)
+            except Exception as error:
+                tests = error
+
+            await results.put((index, name, tests))
+
+        await results.put(None)
+
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(n_workers)]
+    running = n_workers
+
+    try:
+        while (running > 0):
+            result = await results.get()
+
+            if (result is None):
+                running -= 1
+            else:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def ingest_sources(sources: list, max_concurrency: dt.INT = DEFAULT_CONCURRENCY, executor=None, columns: dict = None) -> IngestResult:
+    """
+    Ingest all files of sources into per-well batches
+
+    Tests of each well keep the order of sources, file names
+    and rows, whatever order the files complete in.
+    Failed files are reported in errors instead of stopping the run
+
+    INPUT
+        see iter_files
+
+    OUTPUT
+        IngestResult(
+            batches: { well: TestChunk },
+            errors: { (source index, name): str },
+        )
+    """
+
+    results = []
+    errors = {}
+
+    async for (index, name, tests) in iter_files(sources, max_concurrency, executor, columns):
+        if (isinstance(tests, Exception)):
+            errors[(index, name)] = "%s: %s" % (type(tests).__name__, tests)
+            log.logger.debug("ingest failed %s of source %d: %s", name, index, tests)
+            continue
+
+        results.append((index, name, tests))
+
+    parts = {}
+
+    for (index, name, tests) in sorted(results, key=lambda x: (x[0], x[1])):
+        for (well, chunks) in tests.items():
+            parts.setdefault(well, []).extend(chunks)
+
+    batches = {well: merge_tests(x) for (well, x) in sorted(parts.items())}
+
+    return IngestResult(batches, errors)
+
+
+async def ingest_productions(sources: list, factory, productions: dict = None, **kwargs):
+    """
+    Ingest all files of sources into production instances of each well
+
+    INPUT
+        sources: see iter_files
+        factory (creates production instance of new well): callable(well)
+            e.g. lambda well: TwoPhaseProduction(p_res[well])
+        productions: { well: Production } to continue
+            DEFAULT: {}
+        **kwargs: max_concurrency, executor, columns of iter_files
+
+    OUTPUT
+        ({ well: Production }, { (source index, name): str })
+    """
+
+    (batches, errors) = await ingest_sources(sources, **kwargs)
+
+    return (load_productions(batches.values(), factory, productions), errors)
+
+
+def run_ingest(sources: list, **kwargs) -> IngestResult:
+    """
+    ingest_sources from synchronous code
+    """
+
+    return asyncio.run(ingest_sources(sources, **kwargs))
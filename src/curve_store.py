@@ -0,0 +1,174 @@
+"""
+curve_store.py
+
+Binary file of production graphs (IPR curves) readable with numpy.memmap
+
+Layout (little-endian):
+    header (HEADER_SIZE bytes):
+        magic (8 bytes), version (uint32), reserved (uint32),
+        wells (uint64), points (uint64),
+        index offset, p offset, q offset (uint64)
+    index: int64[wells + 1], first point of each well
+    p: float64[points], pressure of all curves
+    q: float64[points], flow rate of all curves
+"""
+
+import struct
+
+import numpy as np
+
+from .utils import *
+
+MAGIC = b"IPYRCRV\x00"
+VERSION = 1
+
+HEADER_FORMAT = "<8sIIQQQQQ"
+HEADER_SIZE = 64
+
+
+def curve_arrays(curve):
+    """
+    Get (p, q) arrays of single curve given as
+    { "q": numeric, "p": numeric }[] (get_production_graph),
+    structured array with "p" and "q" fields, (p, q)
+    or object with p and q arrays (ProductionSeries)
+    """
+
+    if (isinstance(curve, np.ndarray) and curve.dtype.names is not None):
+        return (curve["p"], curve["q"])
+
+    if (isinstance(curve, tuple)):
+        return curve
+
+    if (hasattr(curve, "p") and hasattr(curve, "q")):
+        # e.g. ProductionSeries
+        return (curve.p, curve.q)
+
+    curve = list(curve)
+    return ([x["p"] for x in curve], [x["q"] for x in curve])
+
+
+def write_curves(path, curves) -> None:
+    """
+    Write production graphs of several wells into single file
+
+    INPUT
+        path: str
+        curves: curve[] (see curve_arrays), or 2-D structured array
+            from WellFleet.get_production_graph
+    """
+
+    p_list = []
+    q_list = []
+
+    for curve in curves:
+        (p, q) = curve_arrays(curve)
+
+        p = np.asarray(p, dtype="<f8").ravel()
+        q = np.asarray(q, dtype="<f8").ravel()
+
+        if (p.size != q.size):
+            raise ValueError("p and q of a curve must have the same length")
+
+        p_list.append(p)
+        q_list.append(q)
+
+    sizes = np.array([x.size for x in p_list], dtype="<i8")
+    index = np.concatenate([[0], np.cumsum(sizes)]).astype("<i8")
+
+    wells = len(p_list)
+    points = int(index[-1])
+
+    index_offset = HEADER_SIZE
+    p_offset = index_offset + index.nbytes
+    q_offset = p_offset + 8 * points
+
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, VERSION, 0, wells, points, index_offset, p_offset, q_offset
+    ).ljust(HEADER_SIZE, b"\x00")
+
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(index.tobytes())
+
+        for p in p_list:
+            file.write(p.tobytes())
+
+        for q in q_list:
+            file.write(q.tobytes())
+
+
+class CurveStore:
+    """
+    Read-only, memory-mapped production graphs written by write_curves.
+    Opening only reads the header, curves are zero-copy views of the file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+
+        if (len(header) < HEADER_SIZE):
+            raise ValueError("%s is not a curve store file" % (path))
+
+        (magic, version, reserved, wells, points, index_offset, p_offset, q_offset) = \
+            struct.unpack_from(HEADER_FORMAT, header)
+
+        if (magic != MAGIC):
+            raise ValueError("%s is not a curve store file" % (path))
+
+        if (version != VERSION):
+            raise ValueError("Unsupported curve store version %d" % (version))
+
+        self.wells = wells
+        self.points = points
+
+        self.index = np.memmap(path, dtype="<i8", mode="r", offset=index_offset, shape=(wells + 1,))
+        self.p = self.map(p_offset)
+        self.q = self.map(q_offset)
+
+    def map(self, offset: dt.INT) -> dt.ARRAY:
+        if (self.points == 0):
+            return np.empty(0, dtype="<f8")
+
+        return np.memmap(self.path, dtype="<f8", mode="r", offset=offset, shape=(self.points,))
+
+    def __len__(self) -> dt.INT:
+        return self.wells
+
+    def __repr__(self):
+        return "CurveStore(%r, wells=%d, points=%d)" % (self.path, self.wells, self.points)
+
+    def curve(self, well: dt.INT):
+        """
+        Get production graph of single well
+
+        INPUT
+            well (well index): int
+
+        OUTPUT
+            (p, q): (numeric[], numeric[]) views of the file
+        """
+
+        well = range(self.wells)[well]
+        (start, stop) = (int(self.index[well]), int(self.index[well + 1]))
+
+        return (self.p[start:stop], self.q[start:stop])
+
+    def __getitem__(self, well: dt.INT):
+        return self.curve(well)
+
+    def __iter__(self):
+        for well in range(self.wells):
+            yield self.curve(well)
+
+    def get_production_graph(self, well: dt.INT) -> dt.FLOWRATE_PRESSURE_DATA:
+        """
+        Get production graph of single well as { "q": numeric, "p": numeric }[]
+        """
+
+        (p, q) = self.curve(well)
+
+        return [{"p": float(x), "q": float(y)} for (x, y) in zip(p, q)]
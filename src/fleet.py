@@ -0,0 +1,347 @@
+"""
+fleet.py
+
+Batch calculation of production performance for many wells
+"""
+
+import numpy as np
+
+from .utils import *
+
+STANDARD_PRESSURE = 14.7                              # in psia
+
+FLEET_METHODS = ["vogel", "fetkovich", "wiggin", "composite"]
+
+# Structured array layouts of fleet results
+Q_MAX_DTYPE = np.dtype([("well", np.int64), ("q_max", np.float64)])
+PWF_DTYPE = np.dtype([("well", np.int64), ("q", np.float64), ("p_wf", np.float64)])
+CURVE_DTYPE = np.dtype([("p", np.float64), ("q", np.float64)])
+
+
+class WellFleet:
+    """
+    Production performance of many wells,
+    calculated at once with array equations instead of
+    one TwoPhaseProduction or ThreePhaseProduction per well
+    """
+
+    def __init__(
+        self,
+        p_res: dt.NUMERIC_ARRAY,
+        q: dt.NUMERIC_ARRAY,
+        p: dt.NUMERIC_ARRAY,
+        method: dt.STRING_ARRAY = "vogel",
+        water_cut: dt.NUMERIC_ARRAY = 0,
+        phase: dt.STRING_ARRAY = "oil",
+        well=None,
+        p_b: dt.NUMERIC_ARRAY = np.nan,
+        weight: dt.NUMERIC_ARRAY = None,
+        fetkovich_loss: dt.STRING = None,
+        single_n: dt.OPTIONAL_NUMERIC = None,
+    ):
+        """
+        INPUT
+            p_res (Reservoir pressure of each well): numeric[]
+            q (Flow rate of each test): numeric[]
+            p (Pressure of each test): numeric[]
+            method ("vogel", "fetkovich", "wiggin" or "composite" of each well): str | str[]
+                DEFAULT: "vogel"
+            water_cut (Water cut of each well, used by "wiggin"): numeric | numeric[]
+                DEFAULT: 0
+            phase ("oil" or "water" of each well, used by "wiggin"): str | str[]
+                DEFAULT: "oil"
+            well (Well index of each test): int[]
+                DEFAULT: one test per well, in order
+            p_b (Bubble point pressure of each well, used by "composite"): numeric | numeric[]
+                DEFAULT: NaN
+            weight (Weight of each test in Fetkovich fitting): numeric[]
+                DEFAULT: None (equal weights)
+            fetkovich_loss (robust Fetkovich fitting, "huber" or "tukey"): str
+                DEFAULT: None (weighted least squares)
+            single_n (n assumed for wells with a single test): numeric
+                DEFAULT: None (NaN)
+        """
+
+        self.p_res = np.atleast_1d(np.asarray(p_res, dtype=np.float64))
+        size = self.p_res.size
+
+        self.method = np.broadcast_to(np.asarray(method, dtype=np.str_), (size,)).copy()
+        self.water_cut = np.broadcast_to(np.asarray(water_cut, dtype=np.float64), (size,)).copy()
+        self.phase = np.broadcast_to(np.asarray(phase, dtype=np.str_), (size,)).copy()
+        self.p_b = np.broadcast_to(np.asarray(p_b, dtype=np.float64), (size,)).copy()
+
+        unknown_method = ~np.isin(self.method, FLEET_METHODS)
+        if (unknown_method.any()):
+            raise err.MethodNotExistExecption(
+                "Method of calculation does not exist: %s" % (sorted(set(self.method[unknown_method])))
+            )
+
+        unknown_phase = (self.method == "wiggin") & ~np.isin(self.phase, dt.PHASE_DATA)
+        if (unknown_phase.any()):
+            raise err.PhaseNotExistsException(
+                "Phase selected doesn't exist: %s" % (sorted(set(self.phase[unknown_phase])))
+            )
+
+        missing_p_b = (self.method == "composite") & ~np.isfinite(self.p_b)
+        if (missing_p_b.any()):
+            raise err.BubblePointNotExistException(
+                "Bubble point pressure (p_b) is required by composite method: wells %s" % (np.flatnonzero(missing_p_b).tolist())
+            )
+
+        self.fetkovich_loss = fetkovich_loss
+        self.single_n = single_n
+
+        self.tests = ps.ProductionSeries()
+        self.test_well = np.empty(0, dtype=np.int64)
+        self.test_weight = np.empty(0, dtype=np.float64)
+        self.fit_cache = fc.FitCache()
+
+        self.insert_tests(q, p, well, weight)
+
+    def __len__(self) -> dt.INT:
+        return self.p_res.size
+
+    def __repr__(self):
+        return "WellFleet(wells=%d, tests=%d)" % (len(self), len(self.tests))
+
+    def insert_tests(self, q: dt.NUMERIC_ARRAY, p: dt.NUMERIC_ARRAY, well=None, weight: dt.NUMERIC_ARRAY = None) -> None:
+        """
+        Add production tests
+
+        INPUT
+            q (Flow rate of each test): numeric[]
+            p (Pressure of each test): numeric[]
+            well (Well index of each test): int[]
+                DEFAULT: one test per well, in order
+            weight (Weight of each test in Fetkovich fitting): numeric | numeric[]
+                DEFAULT: 1
+        """
+
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+
+        if (well is None):
+            if (q.size != len(self)):
+                raise ValueError("well index is required unless there is one test per well")
+
+            well = np.arange(len(self))
+
+        well = np.atleast_1d(np.asarray(well, dtype=np.int64))
+
+        if (well.size != q.size):
+            raise ValueError("well index must have the same length as q and p")
+
+        if (well.size > 0 and (well.min() < 0 or well.max() >= len(self))):
+            raise IndexError("well index out of range")
+
+        weight = np.broadcast_to(np.asarray(1 if weight is None else weight, dtype=np.float64), q.shape)
+
+        self.tests.extend_arrays(q, p)
+        self.test_well = np.concatenate([self.test_well, well])
+        self.test_weight = np.concatenate([self.test_weight, weight])
+
+    def get_last_tests(self):
+        """
+        Get the latest test of each well
+
+        OUTPUT
+            (q, p): (numeric[], numeric[]), NaN for wells without test
+        """
+
+        def find():
+            last = np.full(len(self), -1, dtype=np.int64)
+            np.maximum.at(last, self.test_well, np.arange(len(self.tests)))
+
+            has_test = last >= 0
+            q = np.where(has_test, self.tests.q[last], np.nan)
+            p = np.where(has_test, self.tests.p[last], np.nan)
+
+            return (q, p)
+
+        return self.fit_cache.get("last_tests", self.tests.version, find)
+
+    def get_fetkovich_fit(self):
+        """
+        Fit Fetkovich equation of every well over its weighted tests,
+        robust to outlying tests if fetkovich_loss is set
+
+        OUTPUT
+            (C, n, test_weights): (numeric[], numeric[], numeric[])
+            test_weights are the final weights of each test
+            (0 for rejected tests)
+        """
+
+        def fit():
+            production_x = self.tests.q
+            production_y = self.p_res[self.test_well]**2 - self.tests.p**2
+
+            return numerical.robust_grouped_power_regression(
+                production_x, production_y, self.test_well, len(self), self.test_weight,
+                loss=self.fetkovich_loss, single_n=self.single_n
+            )
+
+        key = ("fetkovich", self.fetkovich_loss, self.single_n)
+
+        return self.fit_cache.get(key, self.tests.version, fit)
+
+    def get_fetkovich_coefficients(self):
+        """
+        Get (C, n) of Fetkovich equation of every well
+        using power regression method over its tests
+
+        OUTPUT
+            (C, n): (numeric[], numeric[]), NaN for wells
+            with less than two distinct tests (unless single_n is set)
+        """
+
+        (C, n, test_weights) = self.get_fetkovich_fit()
+
+        return (C, n)
+
+    def calculate_rate_ratio(self, p: dt.NUMERIC_ARRAY) -> dt.ARRAY:
+        """
+        Calculate flow rate ratio (q / q_max) of every well
+        with its own method
+
+        INPUT
+            p (pressure): numeric[] broadcast against (wells,) or (wells, points)
+
+        OUTPUT
+            qr: numeric[]
+        """
+
+        p = np.asarray(p, dtype=np.float64)
+        extra = (1,) * max(p.ndim - 1, 0)
+
+        p_res = self.p_res.reshape((-1,) + extra)
+        method = self.method.reshape((-1,) + extra)
+
+        qr = np.full(np.broadcast(p, p_res).shape, np.nan)
+
+        is_vogel = np.broadcast_to(method == "vogel", qr.shape)
+        if (is_vogel.any()):
+            qr = np.where(is_vogel, eq.vogel_equation_array(p, p_res), qr)
+
+        is_fetkovich = np.broadcast_to(method == "fetkovich", qr.shape)
+        if (is_fetkovich.any()):
+            (C, n) = self.get_fetkovich_coefficients()
+            with np.errstate(invalid="ignore", over="ignore"):
+                fetkovich_qr = eq.fetkovich_equation_array(p, p_res, None, n.reshape((-1,) + extra))
+            qr = np.where(is_fetkovich, fetkovich_qr, qr)
+
+        is_wiggin = np.broadcast_to(method == "wiggin", qr.shape)
+        if (is_wiggin.any()):
+            phase = self.phase.reshape((-1,) + extra)
+            qr = np.where(is_wiggin, eq.wiggin_equation_array(phase, p, p_res), qr)
+
+        is_composite = np.broadcast_to(method == "composite", qr.shape)
+        if (is_composite.any()):
+            p_b = self.p_b.reshape((-1,) + extra)
+            qr = np.where(is_composite, eq.composite_equation_array(p, p_res, p_b), qr)
+
+        return qr
+
+    def calculate_q_max(self) -> dt.ARRAY:
+        """
+        Calculation of max flow rate (q_max) of every well
+        based on its latest test
+
+        OUTPUT
+            { "well": int, "q_max": numeric }[] (structured array)
+        """
+
+        (q, p) = self.get_last_tests()
+
+        # Water phase of Wiggin equation uses water flow rate
+        is_water = (self.method == "wiggin") & (self.phase == "water")
+        with np.errstate(divide="ignore"):
+            q = np.where(is_water, q / ((1 / self.water_cut) - 1), q)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            q_max = q / self.calculate_rate_ratio(p)
+
+        result = np.empty(len(self), dtype=Q_MAX_DTYPE)
+        result["well"] = np.arange(len(self))
+        result["q_max"] = q_max
+
+        return result
+
+    def calculate_pwf(self, q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY = None) -> dt.ARRAY:
+        """
+        Calculation of wellbore pressure (p_wf) of every well
+
+        INPUT
+            q (flow rate): numeric[] broadcast against (wells,)
+            q_max (max flow rate): numeric[]
+                DEFAULT: calculate_q_max()
+
+        OUTPUT
+            { "well": int, "q": numeric, "p_wf": numeric }[] (structured array),
+            p_wf is NaN where q has no solution
+        """
+
+        if (q_max is None):
+            q_max = self.calculate_q_max()["q_max"]
+
+        q = np.broadcast_to(np.asarray(q, dtype=np.float64), (len(self),))
+        q_max = np.broadcast_to(np.asarray(q_max, dtype=np.float64), (len(self),))
+
+        pressure_ratio = np.full(len(self), np.nan)
+
+        is_vogel = self.method == "vogel"
+        if (is_vogel.any()):
+            pressure_ratio[is_vogel] = eq.pressure_ratio_from_vogel_equation_array(q[is_vogel], q_max[is_vogel])
+
+        is_fetkovich = self.method == "fetkovich"
+        if (is_fetkovich.any()):
+            (C, n) = self.get_fetkovich_coefficients()
+            pressure_ratio[is_fetkovich] = eq.pressure_ratio_from_fetkovich_equation_array(
+                q[is_fetkovich], q_max[is_fetkovich], n[is_fetkovich]
+            )
+
+        is_wiggin = self.method == "wiggin"
+        if (is_wiggin.any()):
+            pressure_ratio[is_wiggin] = eq.pressure_ratio_from_wiggin_equation_array(
+                self.phase[is_wiggin], q[is_wiggin], q_max[is_wiggin]
+            )
+
+        is_composite = self.method == "composite"
+        if (is_composite.any()):
+            pressure_ratio[is_composite] = eq.pressure_ratio_from_composite_equation_array(
+                q[is_composite], q_max[is_composite], self.p_res[is_composite], self.p_b[is_composite]
+            )
+
+        result = np.empty(len(self), dtype=PWF_DTYPE)
+        result["well"] = np.arange(len(self))
+        result["q"] = q
+        result["p_wf"] = pressure_ratio * self.p_res
+
+        return result
+
+    def get_production_graph(self, n: dt.INT, q_max: dt.NUMERIC_ARRAY = None) -> dt.ARRAY:
+        """
+        Create production data of every well
+        from STANDARD_PRESSURE to its reservoir pressure in n intervals
+
+        INPUT
+            n: int
+            q_max (max flow rate): numeric[]
+                DEFAULT: calculate_q_max()
+
+        OUTPUT
+            { "p": numeric, "q": numeric }[wells, n + 1] (structured array)
+        """
+
+        if (q_max is None):
+            q_max = self.calculate_q_max()["q_max"]
+
+        q_max = np.broadcast_to(np.asarray(q_max, dtype=np.float64), (len(self),))
+
+        # Evenly spaced pressure of each well
+        grid = np.linspace(0, 1, n + 1)
+        p = STANDARD_PRESSURE + (self.p_res[:, None] - STANDARD_PRESSURE) * grid[None, :]
+
+        result = np.empty(p.shape, dtype=CURVE_DTYPE)
+        result["p"] = p
+        result["q"] = q_max[:, None] * self.calculate_rate_ratio(p)
+
+        return result
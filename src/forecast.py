@@ -0,0 +1,164 @@
+"""
+forecast.py
+
+Future production performance of many oil wells
+using several processes
+"""
+
+import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .utils import *
+from .future_ipr import OilWell
+
+FORECAST_METHODS = ["standing", "eckmeir", "fetkovich"]
+
+# Chunks per worker, more chunks balance the load,
+# less chunks pickle less
+CHUNKS_PER_WORKER = 4
+
+
+def forecast_well(well: dict) -> dict:
+    """
+    Run future production chain of single oil well
+    using its latest production data
+
+    INPUT
+        well: {
+            "p_res": numeric,
+            "data": { "q": numeric, "p": numeric }[],
+            "production_change": numeric,
+            "method": "standing" | "eckmeir" | "fetkovich",
+        }
+
+    OUTPUT
+        {
+            "method": str,
+            "j_present": numeric, "q_max": numeric,
+            "j_future": numeric, "future_p_res": numeric,
+            "future_q": numeric, "future_q_max": numeric,
+            "error": None,
+        }
+    """
+
+    method = well["method"]
+    if (method not in FORECAST_METHODS):
+        raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (method))
+
+    p_res = well["p_res"]
+
+    production = OilWell(p_res)
+    production.production_change = well.get("production_change", 0)
+    production.future_p_res = p_res * (1 - production.production_change)
+    production.insert_data(well["data"])
+
+    data = production.data[-1]
+    future_p_res = production.future_p_res
+
+    j_present = production.calculate_present_pi(method, data)
+    q_max = production.calculate_q_max(
+        "eckmeir_present" if method == "eckmeir" else method, p_res, data
+    )
+    j_future = production.calculate_future_pi(method, data)
+    future_q = production.calculate_future_q(method, data)
+    future_data = {"q": future_q, "p": data["p"]}
+
+    if (method == "standing"):
+        future_q_max = production.calculate_q_max("standing", future_p_res, future_data)
+    elif (method == "eckmeir"):
+        future_q_max = production.calculate_q_max("eckmeir_future", future_p_res, future_data)
+    elif (method == "fetkovich"):
+        # Future Fetkovich curve at p = 0
+        (C, n) = production.get_fetkovich_coefficients()
+        future_q_max = j_future * math.pow(future_p_res**2, n)
+
+    return {
+        "method": method,
+        "j_present": j_present,
+        "q_max": q_max,
+        "j_future": j_future,
+        "future_p_res": future_p_res,
+        "future_q": future_q,
+        "future_q_max": future_q_max,
+        "error": None,
+    }
+
+
+def failed_forecast(well, error: Exception) -> dict:
+    return {
+        "method": well.get("method") if isinstance(well, dict) else None,
+        "j_present": None,
+        "q_max": None,
+        "j_future": None,
+        "future_p_res": None,
+        "future_q": None,
+        "future_q_max": None,
+        "error": "%s: %s" % (type(error).__name__, error),
+    }
+
+
+def forecast_chunk(wells: list) -> list:
+    """
+    Forecast several wells in a single process,
+    failure of one well is reported in its own result
+    """
+
+    results = []
+
+    for well in wells:
+        try:
+            results.append(forecast_well(well))
+        except Exception as error:
+            results.append(failed_forecast(well, error))
+
+    return results
+
+
+def run_forecast(wells: list, max_workers: dt.INT = None, chunksize: dt.INT = None) -> list:
+    """
+    Forecast many oil wells over a process pool
+
+    Wells are sent in chunks to amortize pickling,
+    results keep the order of wells and failed wells
+    (or failed chunks) are reported in "error"
+    instead of stopping the run
+
+    INPUT
+        wells: well[] (see forecast_well)
+        max_workers: int
+            DEFAULT: os.cpu_count(), 1 runs in current process
+        chunksize (wells per task): int
+            DEFAULT: wells spread over CHUNKS_PER_WORKER tasks per worker
+
+    OUTPUT
+        result[] (see forecast_well)
+    """
+
+    wells = list(wells)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if (len(wells) == 0):
+        return []
+
+    if (max_workers == 1):
+        return forecast_chunk(wells)
+
+    if (chunksize is None):
+        chunksize = max(1, math.ceil(len(wells) / (max_workers * CHUNKS_PER_WORKER)))
+
+    chunks = [wells[i:i + chunksize] for i in range(0, len(wells), chunksize)]
+    results = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(forecast_chunk, chunk) for chunk in chunks]
+
+        # Collect in submission order
+        for (chunk, future) in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as error:
+                results.extend([failed_forecast(well, error) for well in chunk])
+
+    return results
@@ -4,15 +4,22 @@ future_ipr.py
 Calculation of future production performance
 """
 
-import matplotlib.pyplot as plt
 import math
 
+import numpy as np
+
 from src.utils import dt
 from .utils import *
 
 STANDARD_PRESSURE = 14.7                              # in psia
 STANDARD_TEMPERATURE = 60                             # in Fahrenheit
 
+# Methods of production graph of oil well
+OIL_WELL_METHODS = ["standing", "eckmeir", "fetkovich"]
+
+# Structured array layout of production graphs
+CURVE_DTYPE = np.dtype([("p", np.float64), ("q", np.float64)])
+
 class Production:
     """
     Production performance instance
@@ -46,6 +53,8 @@ class Production:
         self.production_change = 0
         self.water_cut = 0
         self.future_water_cut = 0
+
+        self.fit_cache = fc.FitCache()
         
         self.data = []
         self.future_data = []
@@ -53,26 +62,86 @@ class Production:
         self.p_res = p_res
         self.future_p_res = self.p_res * (1 - self.production_change)
 
+    @property
+    def p_res(self) -> dt.NUMERIC:
+        return self._p_res
+
+    @p_res.setter
+    def p_res(self, p_res: dt.NUMERIC) -> None:
+        self._p_res = p_res
+        self.fit_cache.clear()
+
+    @property
+    def data(self) -> ps.ProductionSeries:
+        return self._data
+
+    @data.setter
+    def data(self, data: dt.FLOWRATE_PRESSURE_DATA) -> None:
+        self._data = ps.ProductionSeries(data)
+        self.fit_cache.clear()
+
+    def get_fetkovich_coefficients(
+            self,
+            p_res: dt.OPTIONAL_NUMERIC = None,
+            padding: dt.NUMERIC = 1.00000001,
+            loss: dt.STRING = None,
+            single_n: dt.OPTIONAL_NUMERIC = None):
+        """
+        Get (C, n) of Fetkovich equation using power regression method,
+        fitted once and reused until data or p_res changes
+
+        INPUT
+            p_res (Reservoir pressure): numeric
+                DEFAULT: self.p_res
+            padding (point added to single production data): numeric
+                DEFAULT: 1.00000001
+            loss (robust fitting against outlying data, "huber" or "tukey"): str
+                DEFAULT: None
+            single_n (n assumed for single production data, instead of padding): numeric
+                DEFAULT: None
+
+        OUTPUT
+            (C, n): (numeric, numeric)
+        """
+
+        p_res = self.p_res if p_res is None else p_res
+
+        def fit():
+            production_x = self.data.q
+            production_y = p_res**2 - self.data.p**2
+
+            if (loss is not None or single_n is not None):
+                return numerical.robust_power_regression(
+                    production_x, production_y, loss=loss, single_n=single_n
+                )
+
+            if (len(self.data) == 1):
+                production_x = np.append(production_x, padding)
+                production_y = np.append(production_y, padding)
+
+            return numerical.power_regression(production_x, production_y)
+
+        key = ("fetkovich", p_res, padding) if loss is None and single_n is None else ("fetkovich", p_res, loss, single_n)
+
+        return self.fit_cache.get(key, self.data.version, fit)
+
     def insert_data(self, data: dt.FLOWRATE_PRESSURE_DATA) -> None:
-        for i in data:
-            self.data.append(i)
+        self.data.extend(data)
 
     def __repr__(self):
-        data = "".join(["    " + dt.STRING(x) + ",\n" for x in self.data])
+        data = self.data.preview()
 
         class_repr = dt.STRING("Production performance data with reservoir pressure (psia) = "
                             + dt.STRING(self.p_res)
                             + "\nand "
                             + (
-                                "some production data: [\n" + data + "]."
+                                "some production data: [\n" + data + "\n]."
                                 if len(self.data) > 0
                                 else "empty production data."
                             )
                             )
 
-        print(class_repr)
-
-        return repr("Production instance exists!")
+        return class_repr
     
 class OilWell(Production):
     """
@@ -84,10 +153,46 @@ class OilWell(Production):
 
     def insert_future_data(self, method: dt.STRING, data: dt.FLOWRATE_PRESSURE_DATA) -> None:
         for i in data:
-            print(i)
+            log.logger.debug("future data: %s", i)
             if (method == "standing" or method == "eckmeir"):
                 self.future_data.append({ "q": self.calculate_future_q("eckmeir" if method == "eckmeir" else method, i), "p": i["p"] })
 
+    def q_max_key(self, method: dt.STRING, p_res: dt.NUMERIC, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA):
+        """
+        Memoization key of calculate_q_max,
+        covering fitted Fetkovich coefficients and future state
+        """
+
+        if (not memo.is_hashable_scalar(method, p_res, data["q"], data["p"])):
+            return None
+
+        if (method == "fetkovich"):
+            state = (
+                self.get_fetkovich_coefficients(),
+                self.get_fetkovich_coefficients(padding=0.1),
+                self.production_change,
+            )
+        elif (method == "eckmeir_future"):
+            state = (self.future_p_res, tuple(self.data[-1].items()))
+        else:
+            state = None
+
+        return ("OilWell.calculate_q_max", method, p_res, self.p_res, data["q"], data["p"], state)
+
+    def pwf_key(self, p_res: dt.NUMERIC, q: dt.NUMERIC, q_max: dt.NUMERIC, method: dt.STRING = "standing"):
+        """
+        Memoization key of calculate_pwf,
+        covering fitted Fetkovich coefficients of current data
+        """
+
+        if (not memo.is_hashable_scalar(p_res, q, q_max, method)):
+            return None
+
+        fit = self.get_fetkovich_coefficients(p_res) if method == "fetkovich" else None
+
+        return ("OilWell.calculate_pwf", method, p_res, q, q_max, fit)
+
+    @memo.memoized(q_max_key)
     def calculate_q_max(
             self,
             method: dt.STRING,
@@ -117,20 +222,13 @@ class OilWell(Production):
 
         elif (method == "fetkovich"):
             # Resolving n using power regression method
-            production_x = [x["q"] for x in self.data]
-            production_y = [(self.p_res**2 - x["p"]**2) for x in self.data]
-
-            if (len(self.data) == 1):
-                production_x.append(1.00000001)
-                production_y.append(1.00000001)
-
-            (C, n) = numerical.power_regression(production_x, production_y)
+            (C, n) = self.get_fetkovich_coefficients()
 
-            print("n =", n, "c =", C)
+            log.logger.debug("fetkovich n = %s, C = %s", n, C)
 
             # applied all parameters in Fetkovich Equation
             q_max = self.calculate_future_pi(method, data) * math.pow(p_res**2 - data["p"]**2, n)
-            print(q_max)
+            log.logger.debug("fetkovich q_max = %s", q_max)
 
             return q_max
         
@@ -143,7 +241,8 @@ class OilWell(Production):
 
             return pr * present_q_max
     
-    def calculate_pwf(self, p_res, q: dt.NUMERIC, q_max: dt.NUMERIC) -> dt.NUMERIC:
+    @memo.memoized(pwf_key)
+    def calculate_pwf(self, p_res, q: dt.NUMERIC, q_max: dt.NUMERIC, method: dt.STRING = "standing") -> dt.NUMERIC:
         """
         Calculation of wellbore pressure (p_wf)
 
@@ -151,12 +250,29 @@ class OilWell(Production):
             p_res (reservoir pressure): numeric
             q (flow rate): numeric
             q_max (max flow rate): numeric
+            method: str | callable(pr[]) -> qr[]
+                flow rate ratio of any other IPR is inverted numerically
+                DEFAULT: "standing"
 
         OUTPUT:
             p_wf = numeric
         """
 
-        pressure_ratio = eq.pressure_ratio_from_vogel_equation(q, q_max)
+        try:
+            if (method == "standing" or method == "eckmeir"):
+                pressure_ratio = eq.pressure_ratio_from_vogel_equation(q, q_max)
+            elif (method == "fetkovich"):
+                (C, n) = self.get_fetkovich_coefficients(p_res)
+                pressure_ratio = eq.pressure_ratio_from_fetkovich_equation(q, q_max, n)
+            elif (callable(method)):
+                pressure_ratio = eq.pressure_ratio_from_rate_ratio_function(method, q, q_max)
+            else:
+                raise err.MethodNotExistExecption
+
+        except err.MethodNotExistExecption:
+            print("Method of calculation does not exist.")
+            return None
+
         p_wf = pressure_ratio * p_res
 
         return p_wf
@@ -199,16 +315,9 @@ class OilWell(Production):
             return j_p
     
         elif (method == "fetkovich"):
-            production_x = [x["q"] for x in self.data]
-            production_y = [(self.p_res**2 - x["p"]**2) for x in self.data]
+            (C, n) = self.get_fetkovich_coefficients(padding=0.1)
 
-            if (len(self.data) == 1):
-                production_x.append(0.1)
-                production_y.append(0.1)
-            
-            (C, n) = numerical.power_regression(production_x, production_y)
-
-            print("ini n =", n, C)
+            log.logger.debug("present fetkovich n = %s, C = %s", n, C)
 
             if (len(self.data) >= 1):
             #     return C    
@@ -274,14 +383,7 @@ class OilWell(Production):
             return q
         
         elif (method == "fetkovich"):
-            production_x = [x["q"] for x in self.data]
-            production_y = [(self.p_res**2 - x["p"]**2) for x in self.data]
-
-            if (len(self.data) == 1):
-                production_x.append(1.00000001)
-                production_y.append(1.00000001)
-
-            (C, n) = numerical.power_regression(production_x, production_y)
+            (C, n) = self.get_fetkovich_coefficients()
 
             future_p_res = self.calculate_future_p_res(self.production_change)
 
@@ -292,15 +394,22 @@ class OilWell(Production):
             return q
         
         elif (method == "eckmeir"):
-            print(self.future_p_res, self.p_res)
+            log.logger.debug("eckmeir future p_res = %s, p_res = %s", self.future_p_res, self.p_res)
             pr = math.pow(self.future_p_res / self.p_res, 3)
-            print(pr)
+            log.logger.debug("eckmeir pressure ratio = %s", pr)
 
             q = pr * data["q"]
-            print(q)
+            log.logger.debug("eckmeir future q = %s", q)
             return q
     
-    def get_production_graph(self, method: dt.STRING, q_max: dt.NUMERIC, n: dt.INT, p_res: dt.NUMERIC, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA):
+    def get_production_graph(
+            self,
+            method: dt.STRING,
+            q_max: dt.NUMERIC,
+            n: dt.INT,
+            p_res: dt.NUMERIC,
+            data: dt.FLOWRATE_PRESSURE_SINGLE_DATA,
+            tolerance: dt.OPTIONAL_NUMERIC = None):
         """
         Create plot of production data interval
         based on q_max estimation and n intervals
@@ -310,13 +419,41 @@ class OilWell(Production):
             n: int
             p_res (reservoir pressure): numeric
             data: (Flow rate, pressure) : { "q": numeric, "p": numeric }
+            tolerance (max flow rate error of linear interpolation): numeric
+                DEFAULT: None (fixed intervals), otherwise n intervals
+                are split adaptively until the error is below tolerance
 
         OUTPUT: { "q": numeric, "p": numeric }[]
         """
 
-        pressure_list = [x["p"] for x in self.data] + [p_res]
+        try:
+            if (method not in OIL_WELL_METHODS):
+                raise err.MethodNotExistExecption
+
+        except err.MethodNotExistExecption:
+            print("Method of calculation does not exist.")
+            return None
+
+        pressure_list = self.data.p.tolist() + [p_res]
         production_list = []
 
+        if (n > 0 and tolerance is not None):
+            if (method == "standing" or method == "eckmeir"):
+                rate = lambda p: q_max * eq.vogel_equation_array(p, p_res)
+            else:
+                (C, fetkovich_n) = self.get_fetkovich_coefficients(p_res)
+                rate = lambda p: q_max * eq.fetkovich_equation_array(p, p_res, None, fetkovich_n)
+
+            # Keep measured data on the curve, as fixed intervals do
+            (pressure_list, rate_list) = numerical.adaptive_sample(
+                rate, STANDARD_PRESSURE, p_res, tolerance, n, points=self.data.p
+            )
+
+            return [
+                {"q": round(float(q), 2), "p": float(p)}
+                for (p, q) in zip(pressure_list, rate_list)
+            ]
+
         if (n > 0):
             # Add data for each interval
             interval = p_res // n
@@ -329,6 +466,9 @@ class OilWell(Production):
 
             pressure_list.sort()
 
+            if (method == "fetkovich"):
+                (C, fetkovich_n) = self.get_fetkovich_coefficients(p_res)
+
             # Add pressure list
             for p in pressure_list:
                 if (method == "standing" or method == "eckmeir"):
@@ -338,18 +478,162 @@ class OilWell(Production):
                     })
 
                 elif (method == "fetkovich"):
-                    production_x = [x["q"] for x in self.data]
-                    production_y = [(p_res**2 - x["p"]**2) for x in self.data]
-
-                    if (len(self.data) == 1):
-                        production_x.append(1.00000001)
-                        production_y.append(1.00000001)
-
-                    (C, n) = numerical.power_regression(production_x, production_y)
-
                     production_list.append({
                         "p": p,
-                        "q": round(q_max * eq.fetkovich_equation(p, p_res, None, n), 2),
+                        "q": round(q_max * eq.fetkovich_equation(p, p_res, None, fetkovich_n), 2),
                     })
 
-            return production_list
\ No newline at end of file
+            return production_list
+
+    def get_future_schedule(
+            self,
+            method: dt.STRING,
+            future_p_res: dt.NUMERIC_ARRAY = None,
+            production_change: dt.NUMERIC_ARRAY = None,
+            n: dt.INT = 20,
+            data: dt.FLOWRATE_PRESSURE_SINGLE_DATA = None):
+        """
+        Evaluate future production of every step of a schedule at once,
+        without changing future_p_res or production_change of the well
+
+        future_q_max and curves of each step follow
+        calculate_future_pi and calculate_future_q:
+            standing: j_f = j_p (p_res_f / p_res)^2, q_max_f = j_f p_res_f / 1.8
+            eckmeir: q_max_f = (p_res_f / p_res)^3 q_max
+            fetkovich: j_f = j_p p_res_f / p_res, q_max_f = j_f (p_res_f^2)^n
+
+        INPUT
+            method: "standing" | "eckmeir" | "fetkovich"
+            future_p_res (future reservoir pressure of each step): numeric[]
+            production_change (of each step, if future_p_res is not given): numeric[]
+            n (intervals of each curve): int
+                DEFAULT: 20
+            data: (Flow rate, pressure) : { "q": numeric, "p": numeric }
+                DEFAULT: latest production data
+
+        OUTPUT
+            {
+                "future_p_res": numeric[steps],
+                "j_future": numeric[steps],
+                "future_q": numeric[steps] (at pressure of data, same as calculate_future_q),
+                "future_q_max": numeric[steps],
+                "curve": { "p": numeric, "q": numeric }[steps, n + 1] (structured array)
+                    from STANDARD_PRESSURE to future_p_res of each step,
+            }
+        """
+
+        if ((future_p_res is None) == (production_change is None)):
+            raise ValueError("Either future_p_res or production_change is required")
+
+        if (future_p_res is None):
+            future_p_res = self.p_res * (1 - np.asarray(production_change, dtype=np.float64))
+
+        future_p_res = np.atleast_1d(np.asarray(future_p_res, dtype=np.float64))
+        data = self.data[-1] if data is None else data
+
+        (q, p) = (data["q"], data["p"])
+        pr = future_p_res / self.p_res
+
+        # Pressure points of every step
+        grid = np.linspace(0, 1, n + 1)
+        curve_p = STANDARD_PRESSURE + (future_p_res[:, None] - STANDARD_PRESSURE) * grid[None, :]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if (method == "standing"):
+                j_future = self.calculate_present_pi(method, data) * pr**2
+                future_q_max = j_future * future_p_res / 1.8
+
+                future_q = future_q_max * eq.vogel_equation_array(p, future_p_res)
+                curve_q = future_q_max[:, None] * eq.vogel_equation_array(curve_p, future_p_res[:, None])
+
+            elif (method == "eckmeir"):
+                present_q_max = self.calculate_q_max("eckmeir_present", self.p_res, data)
+
+                j_future = self.calculate_present_pi(method, data) * pr**2
+                future_q_max = eq.eckmeir_future_rate_array(present_q_max, self.p_res, future_p_res)
+
+                future_q = eq.eckmeir_future_rate_array(q, self.p_res, future_p_res)
+                curve_q = future_q_max[:, None] * eq.vogel_equation_array(curve_p, future_p_res[:, None])
+
+            elif (method == "fetkovich"):
+                (C, fetkovich_n) = self.get_fetkovich_coefficients()
+
+                j_future = self.calculate_present_pi(method, data) * pr
+                future_q_max = j_future * np.power(future_p_res**2, fetkovich_n)
+
+                future_q = j_future * np.power(future_p_res**2 - p**2, fetkovich_n)
+                curve_q = j_future[:, None] * np.power(future_p_res[:, None]**2 - curve_p**2, fetkovich_n)
+
+            else:
+                raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (method))
+
+        curve = np.empty(curve_p.shape, dtype=CURVE_DTYPE)
+        curve["p"] = curve_p
+        curve["q"] = curve_q
+
+        return {
+            "future_p_res": future_p_res,
+            "j_future": j_future,
+            "future_q": future_q,
+            "future_q_max": future_q_max,
+            "curve": curve,
+        }
+
+    def get_production_graph_family(
+            self,
+            method: dt.STRING,
+            q_max: dt.NUMERIC_ARRAY,
+            p_res: dt.NUMERIC_ARRAY,
+            grid: dt.NUMERIC_ARRAY = None,
+            n: dt.INT = 20):
+        """
+        Create production graphs of many (e.g. future) reservoir pressures
+        at once, evaluated together as arrays of (curves, points)
+
+        Curves match get_production_graph of each p_res and q_max,
+        Fetkovich n is fitted by get_fetkovich_coefficients
+        once per distinct p_res
+
+        INPUT:
+            method: "standing" | "eckmeir" | "fetkovich"
+            q_max (max flow rate of each curve): numeric[]
+            p_res (reservoir pressure of each curve): numeric[]
+            grid (pressure ratio p / p_res, 0 to 1): numeric[]
+                DEFAULT: n intervals from STANDARD_PRESSURE
+                to p_res of each curve, as get_production_graph
+            n: int
+                DEFAULT: 20
+
+        OUTPUT: { "p": numeric, "q": numeric }[curves, points] (structured array)
+        """
+
+        p_res = np.atleast_1d(np.asarray(p_res, dtype=np.float64))
+
+        if (grid is None):
+            p = STANDARD_PRESSURE + (p_res[:, None] - STANDARD_PRESSURE) * np.linspace(0, 1, n + 1)[None, :]
+            grid = p / p_res[:, None]
+        else:
+            grid = np.asarray(grid, dtype=np.float64)
+
+        if (method == "standing" or method == "eckmeir"):
+            (p, q) = eq.curve_family("vogel", p_res, q_max, grid)
+
+        elif (method == "fetkovich"):
+            # Same fit (and padding of single data) as get_production_graph
+            (pressures, index) = np.unique(p_res, return_inverse=True)
+            fetkovich_n = np.array([self.get_fetkovich_coefficients(x)[1] for x in pressures.tolist()])
+
+            (p, q) = eq.curve_family("fetkovich", p_res, q_max, grid, fetkovich_n[index])
+
+        else:
+            raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (method))
+
+        curve = np.empty(p.shape, dtype=CURVE_DTYPE)
+        curve["p"] = p
+        curve["q"] = q
+
+        return curve
+
+
+instrument.register_class(Production, prefix="future_ipr.Production")
+instrument.register_class(OilWell)
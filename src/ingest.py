@@ -0,0 +1,309 @@
+"""
+ingest.py
+
+Streaming of well test files (CSV / NDJSON) into production data
+"""
+
+import csv
+import io
+import json
+
+from collections import namedtuple
+
+import numpy as np
+
+from .utils import *
+
+# Rows parsed into a single chunk
+DEFAULT_CHUNK_SIZE = 65536
+
+# Column names of well id, flow rate, pressure and optional timestamp
+DEFAULT_COLUMNS = {"well": "well", "q": "q", "p": "p", "t": "t"}
+
+# Chunk of well tests stored as arrays of equal length,
+# t is None if the file has no timestamp
+TestChunk = namedtuple("TestChunk", ["well", "q", "p", "t"])
+
+
+def open_text(source):
+    """
+    Open path as text file, file objects are used as they are
+    """
+
+    if (isinstance(source, io.IOBase) or hasattr(source, "read")):
+        return source
+
+    return open(source, "r", newline="")
+
+
+class ChunkBuilder:
+    """
+    Fixed-size buffers of a chunk being parsed
+    """
+
+    def __init__(self, chunk_size: dt.INT, has_t: dt.BOOLEAN):
+        self.chunk_size = chunk_size
+        self.has_t = has_t
+
+        self.well = [None] * chunk_size
+        self.q = np.empty(chunk_size, dtype=np.float64)
+        self.p = np.empty(chunk_size, dtype=np.float64)
+        self.t = np.empty(chunk_size, dtype=np.float64) if has_t else None
+
+        self.size = 0
+
+    def add(self, well, q, p, t=None) -> dt.BOOLEAN:
+        """
+        Add single row, returns True once the chunk is full
+        """
+
+        i = self.size
+
+        self.well[i] = well
+        self.q[i] = q
+        self.p[i] = p
+
+        if (self.has_t):
+            self.t[i] = np.nan if t is None or t == "" else t
+
+        self.size += 1
+
+        return self.size == self.chunk_size
+
+    def add_t(self) -> None:
+        """
+        Add timestamp column, NaN for rows already added
+        """
+
+        if (self.t is None):
+            self.t = np.empty(self.chunk_size, dtype=np.float64)
+
+        self.t[:self.size] = np.nan
+        self.has_t = True
+
+    def build(self) -> TestChunk:
+        size = self.size
+        self.size = 0
+
+        return TestChunk(
+            np.array(self.well[:size], dtype=np.str_),
+            self.q[:size].copy(),
+            self.p[:size].copy(),
+            self.t[:size].copy() if self.has_t else None,
+        )
+
+
+def read_csv_chunks(source, chunk_size: dt.INT = DEFAULT_CHUNK_SIZE, columns: dict = None, delimiter: dt.STRING = ","):
+    """
+    Read CSV well tests (with header row) chunk by chunk,
+    only one chunk is held in memory at a time
+
+    INPUT
+        source: path | text file
+        chunk_size (rows per chunk): int
+            DEFAULT: DEFAULT_CHUNK_SIZE
+        columns (column names of "well", "q", "p" and "t"): dict
+            DEFAULT: DEFAULT_COLUMNS
+        delimiter: str
+            DEFAULT: ","
+
+    OUTPUT
+        TestChunk generator
+    """
+
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    file = open_text(source)
+
+    try:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+
+        if (header is None):
+            return
+
+        header = [x.strip() for x in header]
+
+        try:
+            well_index = header.index(columns["well"])
+            q_index = header.index(columns["q"])
+            p_index = header.index(columns["p"])
+        except ValueError:
+            raise ValueError("CSV header must contain %s, %s and %s columns, %s given" % (
+                columns["well"], columns["q"], columns["p"], header
+            ))
+
+        t_index = header.index(columns["t"]) if columns["t"] in header else None
+        chunk = ChunkBuilder(chunk_size, t_index is not None)
+
+        for (line, row) in enumerate(reader, start=2):
+            if (len(row) == 0):
+                continue
+
+            try:
+                full = chunk.add(
+                    row[well_index].strip(),
+                    float(row[q_index]),
+                    float(row[p_index]),
+                    None if t_index is None else row[t_index],
+                )
+            except (IndexError, ValueError) as error:
+                raise ValueError("Invalid well test at line %d: %s" % (line, error))
+
+            if (full):
+                yield chunk.build()
+
+        if (chunk.size > 0):
+            yield chunk.build()
+
+    finally:
+        if (file is not source):
+            file.close()
+
+
+def read_ndjson_chunks(source, chunk_size: dt.INT = DEFAULT_CHUNK_SIZE, columns: dict = None):
+    """
+    Read NDJSON well tests (one JSON object per line) chunk by chunk,
+    only one chunk is held in memory at a time
+
+    INPUT
+        source: path | text file
+        chunk_size (rows per chunk): int
+            DEFAULT: DEFAULT_CHUNK_SIZE
+        columns (keys of "well", "q", "p" and "t"): dict
+            DEFAULT: DEFAULT_COLUMNS
+
+    OUTPUT
+        TestChunk generator, t is NaN for rows without "t"
+        and None for chunks without any "t"
+    """
+
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    file = open_text(source)
+
+    try:
+        chunk = ChunkBuilder(chunk_size, False)
+
+        for (line, text) in enumerate(file, start=1):
+            text = text.strip()
+            if (len(text) == 0):
+                continue
+
+            try:
+                row = json.loads(text)
+
+                # Timestamp column is decided per chunk, by any of its rows
+                if (columns["t"] in row and not chunk.has_t):
+                    chunk.add_t()
+
+                full = chunk.add(
+                    dt.STRING(row[columns["well"]]),
+                    float(row[columns["q"]]),
+                    float(row[columns["p"]]),
+                    row.get(columns["t"]),
+                )
+            except (KeyError, TypeError, ValueError) as error:
+                raise ValueError("Invalid well test at line %d: %s" % (line, error))
+
+            if (full):
+                yield chunk.build()
+                chunk.has_t = False
+
+        if (chunk.size > 0):
+            yield chunk.build()
+
+    finally:
+        if (file is not source):
+            file.close()
+
+
+def read_chunks(source, chunk_size: dt.INT = DEFAULT_CHUNK_SIZE, columns: dict = None):
+    """
+    Read well tests chunk by chunk according to file extension
+    (.csv, otherwise .ndjson / .jsonl)
+    """
+
+    name = dt.STRING(getattr(source, "name", source)).lower()
+
+    if (name.endswith(".csv")):
+        return read_csv_chunks(source, chunk_size, columns)
+
+    return read_ndjson_chunks(source, chunk_size, columns)
+
+
+def group_by_well(chunk: TestChunk):
+    """
+    Split chunk into tests of each well, keeping the file order
+
+    OUTPUT
+        (well, TestChunk) generator
+    """
+
+    (wells, inverse) = np.unique(chunk.well, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(wells) + 1))
+
+    for i in range(len(wells)):
+        index = order[bounds[i]:bounds[i + 1]]
+
+        yield (dt.STRING(wells[i]), TestChunk(
+            chunk.well[index],
+            chunk.q[index],
+            chunk.p[index],
+            None if chunk.t is None else chunk.t[index],
+        ))
+
+
+def accumulate_fits(chunks, p_res, fits: dict = None) -> dict:
+    """
+    Feed Fetkovich power regression of each well from well test chunks,
+    memory depends on number of wells, not number of tests
+
+    INPUT
+        chunks: TestChunk iterable
+        p_res (Reservoir pressure): numeric | { well: numeric }
+        fits: { well: RegressionAccumulator } to continue
+            DEFAULT: {}
+
+    OUTPUT
+        { well: RegressionAccumulator }, use power_coefficients() for (C, n)
+    """
+
+    fits = {} if fits is None else fits
+
+    for chunk in chunks:
+        for (well, tests) in group_by_well(chunk):
+            well_p_res = p_res[well] if isinstance(p_res, dict) else p_res
+
+            if (well not in fits):
+                fits[well] = numerical.RegressionAccumulator(log_space=True)
+
+            fits[well].add_many(tests.q, well_p_res**2 - tests.p**2)
+
+    return fits
+
+
+def load_productions(chunks, factory, productions: dict = None) -> dict:
+    """
+    Insert well test chunks into production instances of each well
+
+    INPUT
+        chunks: TestChunk iterable
+        factory (creates production instance of new well): callable(well)
+            e.g. lambda well: TwoPhaseProduction(p_res[well])
+        productions: { well: Production } to continue
+            DEFAULT: {}
+
+    OUTPUT
+        { well: Production }
+    """
+
+    productions = {} if productions is None else productions
+
+    for chunk in chunks:
+        for (well, tests) in group_by_well(chunk):
+            if (well not in productions):
+                productions[well] = factory(well)
+
+            productions[well].data.extend_arrays(tests.q, tests.p, tests.t)
+
+    return productions
@@ -3,6 +3,9 @@ from .utils import *
 STANDARD_PRESSURE = 14.7                              # in psia
 STANDARD_TEMPERATURE = 60                             # in Fahrenheit
 
+# Methods of production graph of two-phase production
+TWO_PHASE_METHODS = ["vogel", "fetkovich", "composite"]
+
 class Production:
     """
     Calculation of production performance of multi-phase of IPR
@@ -20,31 +23,102 @@ class Production:
                 Default: []
         """
 
+        self.fit_cache = fc.FitCache()
+
         self.p_res = p_res
         self.data = []
 
+    @property
+    def p_res(self) -> dt.NUMERIC:
+        return self._p_res
+
+    @p_res.setter
+    def p_res(self, p_res: dt.NUMERIC) -> None:
+        self._p_res = p_res
+        self.fit_cache.clear()
+
+    @property
+    def data(self) -> ps.ProductionSeries:
+        return self._data
+
+    @data.setter
+    def data(self, data: dt.FLOWRATE_PRESSURE_DATA) -> None:
+        self._data = ps.ProductionSeries(data)
+        self.fit_cache.clear()
+
+    def get_fetkovich_coefficients(self):
+        """
+        Get (C, n) of Fetkovich equation using power regression method,
+        fitted once and reused until data or p_res changes
+
+        OUTPUT:
+            (C, n): (numeric, numeric)
+        """
+
+        def fit():
+            production_x = self.data.q
+            production_y = self.p_res**2 - self.data.p**2
+
+            return numerical.power_regression(production_x, production_y)
+
+        return self.fit_cache.get(("fetkovich", self.p_res), self.data.version, fit)
+
     def __repr__(self):
-        data = "".join(["    " + dt.STRING(x) + ",\n" for x in self.data])
+        data = self.data.preview()
 
         class_repr = dt.STRING("Production performance data with reservoir pressure (psia) = "
                             + dt.STRING(self.p_res)
                             + "\nand "
                             + (
-                                "some production data: [\n" + data + "]."
+                                "some production data: [\n" + data + "\n]."
                                 if len(self.data) > 0
                                 else "empty production data."
                             )
                             )
 
-        print(class_repr)
-
-        return repr("Production instance exists!")
+        return class_repr
 
 
 class TwoPhaseProduction(Production):
-    def __init__(self, p_res: dt.NUMERIC):
+    def __init__(self, p_res: dt.NUMERIC, p_b: dt.OPTIONAL_NUMERIC = None):
+        """
+        INPUT:
+            p_res (Reservoir pressure) : numeric
+            p_b (Bubble point pressure, required by "composite" method) : numeric
+                Default: None
+        """
+
         super().__init__(p_res)
 
+        self.p_b = p_b
+
+    def q_max_key(self, method: dt.STRING, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA):
+        """
+        Memoization key of calculate_q_max,
+        covering fitted Fetkovich coefficients of current data
+        """
+
+        if (not isinstance(method, dt.STRING) or not memo.is_hashable_scalar(data["q"], data["p"], self.p_b)):
+            return None
+
+        fit = self.get_fetkovich_coefficients() if method == "fetkovich" else None
+
+        return ("TwoPhaseProduction.calculate_q_max", method, self.p_res, self.p_b, data["q"], data["p"], fit)
+
+    def pwf_key(self, method: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC):
+        """
+        Memoization key of calculate_pwf,
+        covering fitted Fetkovich coefficients of current data
+        """
+
+        if (not memo.is_hashable_scalar(method, q, q_max, self.p_b)):
+            return None
+
+        fit = self.get_fetkovich_coefficients() if method == "fetkovich" else None
+
+        return ("TwoPhaseProduction.calculate_pwf", method, self.p_res, self.p_b, q, q_max, fit)
+
+    @memo.memoized(q_max_key)
     def calculate_q_max(
         self,
         method: dt.STRING,
@@ -75,12 +149,7 @@ class TwoPhaseProduction(Production):
 
             elif (method == "fetkovich"):
                 # Resolving n using power regression method
-                production_x = [x["q"] for x in self.data]
-                production_y = [
-                    (self.p_res**2 - x["p"]**2) for x in self.data
-                ]
-
-                (C, n) = numerical.power_regression(production_x, production_y)
+                (C, n) = self.get_fetkovich_coefficients()
 
                 # applied all parameters in Fetkovich Equation
                 q_max = data["q"] / eq.fetkovich_equation(
@@ -92,6 +161,17 @@ class TwoPhaseProduction(Production):
 
                 return q_max
 
+            elif (method == "composite"):
+                if (self.p_b is None):
+                    raise err.BubblePointNotExistException
+
+                # Straight line PI above bubble point, Vogel equation below
+                q_max = data["q"] / eq.composite_equation(
+                    data["p"], self.p_res, self.p_b
+                )
+
+                return q_max
+
             else:
                 raise err.MethodNotExistExecption
 
@@ -99,15 +179,22 @@ class TwoPhaseProduction(Production):
             print("Method of calculation does not exist.")
             return None
 
+        except err.BubblePointNotExistException:
+            print("Bubble point pressure (p_b) is required by composite method.")
+            return None
+
         except TypeError:
             print("Expected str value  for method, %s given" % (type(method)))
             return None
 
+    @memo.memoized(pwf_key)
     def calculate_pwf(self, method: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC) -> dt.NUMERIC:
         """
         Calculation of wellbore pressure (p_wf)
 
         INPUT:
+            method: str | callable(pr[]) -> qr[]
+                flow rate ratio of any other IPR is inverted numerically
             q (flow rate): numeric
             q_max (max flow rate): numeric
 
@@ -115,24 +202,37 @@ class TwoPhaseProduction(Production):
             p_wf = numeric
         """
 
-        if (method == "vogel"):
-            pressure_ratio = eq.pressure_ratio_from_vogel_equation(q, q_max)
-        elif (method == "fetkovich"):
-            # Resolving n using power regression method
-            production_x = [x["q"] for x in self.data]
-            production_y = [
-                (self.p_res**2 - x["p"]**2) for x in self.data
-            ]
+        try:
+            if (method == "vogel"):
+                pressure_ratio = eq.pressure_ratio_from_vogel_equation(q, q_max)
+            elif (method == "fetkovich"):
+                # Resolving n using power regression method
+                (C, n) = self.get_fetkovich_coefficients()
+
+                pressure_ratio = eq.pressure_ratio_from_fetkovich_equation(q, q_max, n)
+            elif (method == "composite"):
+                if (self.p_b is None):
+                    raise err.BubblePointNotExistException
+
+                pressure_ratio = eq.pressure_ratio_from_composite_equation(q, q_max, self.p_res, self.p_b)
+            elif (callable(method)):
+                pressure_ratio = eq.pressure_ratio_from_rate_ratio_function(method, q, q_max)
+            else:
+                raise err.MethodNotExistExecption
 
-            (C, n) = numerical.power_regression(production_x, production_y)
+        except err.MethodNotExistExecption:
+            print("Method of calculation does not exist.")
+            return None
 
-            pressure_ratio = eq.pressure_ratio_from_fetkovich_equation(q, q_max, n)
+        except err.BubblePointNotExistException:
+            print("Bubble point pressure (p_b) is required by composite method.")
+            return None
 
         p_wf = pressure_ratio * self.p_res
 
         return p_wf
 
-    def get_production_graph(self, method: dt.STRING, q_max: dt.NUMERIC, n: dt.INT):
+    def get_production_graph(self, method: dt.STRING, q_max: dt.NUMERIC, n: dt.INT, tolerance: dt.OPTIONAL_NUMERIC = None):
         """
         Create plot of production data interval
         based on q_max estimation and n intervals
@@ -140,13 +240,52 @@ class TwoPhaseProduction(Production):
         INPUT:
             q_max: numeric
             n: int
+            tolerance (max flow rate error of linear interpolation): numeric
+                DEFAULT: None (fixed intervals), otherwise n intervals
+                are split adaptively until the error is below tolerance
 
         OUTPUT: { "q": numeric, "p": numeric }[]
         """
 
-        pressure_list = [x["p"] for x in self.data] + [self.p_res]
+        try:
+            if (method not in TWO_PHASE_METHODS):
+                raise err.MethodNotExistExecption
+
+            if (method == "composite" and self.p_b is None):
+                raise err.BubblePointNotExistException
+
+        except err.MethodNotExistExecption:
+            print("Method of calculation does not exist.")
+            return None
+
+        except err.BubblePointNotExistException:
+            print("Bubble point pressure (p_b) is required by composite method.")
+            return None
+
+        pressure_list = self.data.p.tolist() + [self.p_res]
         production_list = []
 
+        if (n > 0 and tolerance is not None):
+            if (method == "vogel"):
+                rate = lambda p: q_max * eq.vogel_equation_array(p, self.p_res)
+            elif (method == "fetkovich"):
+                (C, fetkovich_n) = self.get_fetkovich_coefficients()
+                rate = lambda p: q_max * eq.fetkovich_equation_array(p, self.p_res, None, fetkovich_n)
+            else:
+                rate = lambda p: q_max * eq.composite_equation_array(p, self.p_res, self.p_b)
+
+            # Keep measured data (and bubble point) on the curve, as fixed intervals do
+            points = self.data.p.tolist() + ([self.p_b] if method == "composite" else [])
+
+            (pressure_list, rate_list) = numerical.adaptive_sample(
+                rate, STANDARD_PRESSURE, self.p_res, tolerance, n, points=points
+            )
+
+            return [
+                {"p": float(p), "q": round(float(q), 2)}
+                for (p, q) in zip(pressure_list, rate_list)
+            ]
+
         if (n > 0):
             # Add data for each interval
             interval = self.p_res // n
@@ -157,8 +296,15 @@ class TwoPhaseProduction(Production):
                 pressure_list.append(pressure_segment)
                 pressure_segment += interval
 
+            # Keep the break of composite curve at bubble point
+            if (method == "composite" and self.p_b < self.p_res):
+                pressure_list.append(self.p_b)
+
             pressure_list.sort()
 
+            if (method == "fetkovich"):
+                (C, fetkovich_n) = self.get_fetkovich_coefficients()
+
             # Add pressure list
             for p in pressure_list:
                 if (method == "vogel"):
@@ -167,16 +313,14 @@ class TwoPhaseProduction(Production):
                         "q": round(q_max * eq.vogel_equation(p, self.p_res), 2),
                     })
                 elif (method == "fetkovich"):
-                    production_x = [x["q"] for x in self.data]
-                    production_y = [
-                        (self.p_res**2 - x["p"]**2) for x in self.data
-                    ]
-
-                    (C, n) = numerical.power_regression(production_x, production_y)
-
                     production_list.append({
                         "p": p,
-                        "q": round(q_max * eq.fetkovich_equation(p, self.p_res, None, n), 2),
+                        "q": round(q_max * eq.fetkovich_equation(p, self.p_res, None, fetkovich_n), 2),
+                    })
+                elif (method == "composite"):
+                    production_list.append({
+                        "p": p,
+                        "q": round(q_max * eq.composite_equation(p, self.p_res, self.p_b), 2),
                     })
 
             return production_list
@@ -192,6 +336,27 @@ class ThreePhaseProduction(Production):
 
         self.water_cut = water_cut
 
+    def q_max_key(self, phase: dt.STRING, method: dt.STRING, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA):
+        """
+        Memoization key of calculate_q_max
+        """
+
+        if (not memo.is_hashable_scalar(phase, method, data["q"], data["p"], self.water_cut)):
+            return None
+
+        return ("ThreePhaseProduction.calculate_q_max", phase, method, self.p_res, data["q"], data["p"], self.water_cut)
+
+    def pwf_key(self, phase: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC, method: dt.STRING = "wiggin"):
+        """
+        Memoization key of calculate_pwf
+        """
+
+        if (not memo.is_hashable_scalar(phase, q, q_max, method)):
+            return None
+
+        return ("ThreePhaseProduction.calculate_pwf", phase, method, self.p_res, q, q_max)
+
+    @memo.memoized(q_max_key)
     def calculate_q_max(self, phase: dt.STRING, method: dt.STRING, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA) -> dt.NUMERIC:
         """
         Calculate max flow rate (q_max)
@@ -236,25 +401,41 @@ class ThreePhaseProduction(Production):
             print("Expected str value  for method, %s given" % (type(method)))
             return None
 
-    def calculate_pwf(self, phase: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC):
+    @memo.memoized(pwf_key)
+    def calculate_pwf(self, phase: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC, method: dt.STRING = "wiggin"):
         """
         Calculation of wellbore pressure (p_wf)
-        Using Vogel equations only
 
         INPUT:
+            phase: str
             q (flow rate): numeric
             q_max (max flow rate): numeric
+            method: str | callable(pr[]) -> qr[]
+                Wiggin equation is inverted in closed form,
+                flow rate ratio of any other IPR is inverted numerically
+                DEFAULT: "wiggin"
 
         INPUT:
             p_wf = numeric
         """
 
-        pressure_ratio = eq.pressure_ratio_from_wiggin_equation(phase, q, q_max)
+        try:
+            if (method == "wiggin"):
+                pressure_ratio = eq.pressure_ratio_from_wiggin_equation(phase, q, q_max)
+            elif (callable(method)):
+                pressure_ratio = eq.pressure_ratio_from_rate_ratio_function(method, q, q_max)
+            else:
+                raise err.MethodNotExistExecption
+
+        except err.MethodNotExistExecption:
+            print("Method of calculation does not exist.")
+            return None
+
         p_wf = pressure_ratio * self.p_res
 
         return p_wf
 
-    def get_production_graph(self, phase: dt.STRING, q_max: dt.NUMERIC, n: dt.INT):
+    def get_production_graph(self, phase: dt.STRING, q_max: dt.NUMERIC, n: dt.INT, tolerance: dt.OPTIONAL_NUMERIC = None):
         """
         Create plot of production data interval
         based on q_max estimation and n intervals
@@ -263,13 +444,34 @@ class ThreePhaseProduction(Production):
             phase: str
             q_max: numeric
             n: int
+            tolerance (max flow rate error of linear interpolation): numeric
+                DEFAULT: None (fixed intervals), otherwise n intervals
+                are split adaptively until the error is below tolerance
 
         OUTPUT: { "q": numeric, "p": numeric }[]
         """
 
+        if (phase not in dt.PHASE_DATA):
+            print(
+                "Phase selected doesn't exist.\n" +
+                "Available phase: 'oil' and 'water'"
+            )
+            return None
+
         pressure_list = [self.p_res]
         production_list = []
 
+        if (n > 0 and tolerance is not None):
+            (pressure_list, rate_list) = numerical.adaptive_sample(
+                lambda p: q_max * eq.wiggin_equation_array(phase, p, self.p_res),
+                STANDARD_PRESSURE, self.p_res, tolerance, n
+            )
+
+            return [
+                {"p": float(p), "q": round(float(q), 2)}
+                for (p, q) in zip(pressure_list, rate_list)
+            ]
+
         if (n > 0):
             # Add data for each interval
             interval = self.p_res // n
@@ -290,3 +492,8 @@ class ThreePhaseProduction(Production):
                 })
 
             return production_list
+
+
+instrument.register_class(Production, prefix="ipr.Production")
+instrument.register_class(TwoPhaseProduction)
+instrument.register_class(ThreePhaseProduction)
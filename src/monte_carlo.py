@@ -0,0 +1,284 @@
+"""
+monte_carlo.py
+
+Uncertainty of q_max and future flow rate of oil wells
+from distributions of uncertain inputs
+"""
+
+import numpy as np
+
+from .utils import *
+
+MONTE_CARLO_METHODS = ["standing", "eckmeir", "fetkovich"]
+
+# Samples evaluated at once, bounds memory of temporary arrays
+DEFAULT_CHUNK_SIZE = 262144
+
+# numpy.random.Generator methods allowed in distribution specs
+DISTRIBUTIONS = [
+    "normal", "lognormal", "uniform", "triangular",
+    "beta", "gamma", "weibull", "exponential",
+]
+
+# Inputs of a well and their defaults, None for required inputs.
+# Flow rate is given either as q, the oil rate (as data["q"] of
+# ThreePhaseProduction), or as liquid_rate with water_cut
+INPUTS = {
+    "p_res": None,
+    "q": None,
+    "liquid_rate": None,
+    "p": None,
+    "water_cut": 0,
+    "production_change": 0,
+    "n": 1,
+}
+
+# Alternative inputs of flow rate, exactly one is required
+RATE_INPUTS = ("q", "liquid_rate")
+
+# Percentiles of the summary, P90 (low) to P10 (high) as in SPE-PRMS,
+# i.e. P90 is exceeded by 90 % of samples
+PERCENTILES = {"P90": 10, "P50": 50, "P10": 90}
+
+
+def draw(rng, spec, size: dt.INT) -> dt.ARRAY:
+    """
+    Draw samples of single input
+
+    INPUT
+        rng: numpy.random.Generator
+        spec: numeric (constant)
+            | (name, *parameters), e.g. ("normal", 3000, 150),
+                name from DISTRIBUTIONS with numpy.random.Generator parameters
+            | callable(rng, size) -> numeric[]
+        size: int
+
+    OUTPUT
+        numeric[size]
+    """
+
+    if (callable(spec)):
+        return np.asarray(spec(rng, size), dtype=np.float64)
+
+    if (isinstance(spec, (tuple, list))):
+        (name, *parameters) = spec
+
+        if (name not in DISTRIBUTIONS):
+            raise ValueError("Distribution does not exist: %s" % (name))
+
+        return getattr(rng, name)(*parameters, size=size)
+
+    return np.full(size, spec, dtype=np.float64)
+
+
+def check_inputs(names) -> None:
+    """
+    Raise ValueError for missing, unknown or conflicting inputs
+    """
+
+    names = set(names)
+
+    unknown = sorted(names - set(INPUTS))
+    if (unknown):
+        raise ValueError("Unknown inputs: %s" % (unknown))
+
+    missing = [
+        name for (name, default) in INPUTS.items()
+        if default is None and name not in RATE_INPUTS and name not in names
+    ]
+    if (missing):
+        raise ValueError("Missing inputs: %s" % (missing))
+
+    rates = [name for name in RATE_INPUTS if name in names]
+    if (len(rates) != 1):
+        raise ValueError("Exactly one of q (oil rate) and liquid_rate is required, %s given" % (rates))
+
+
+def get_specs(inputs: dict) -> dict:
+    """
+    Inputs completed with defaults of optional inputs
+    """
+
+    specs = {
+        name: default for (name, default) in INPUTS.items()
+        if default is not None
+    }
+    specs.update(inputs)
+
+    return specs
+
+
+def evaluate(method: dt.STRING, x: dict) -> dict:
+    """
+    Push one chunk of samples through IPR kernels
+
+    INPUT
+        method: "standing" | "eckmeir" | "fetkovich"
+        x: { input: numeric[] } (see INPUTS), with q or liquid_rate
+
+    OUTPUT
+        { "q_max": numeric[], "future_q": numeric[], "future_q_max": numeric[] }
+    """
+
+    # Oil flow rate, out of liquid rate if not given
+    q = x["q"] if "q" in x else x["liquid_rate"] * (1 - x["water_cut"])
+    p = x["p"]
+    p_res = x["p_res"]
+    future_p_res = p_res * (1 - x["production_change"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if (method == "fetkovich"):
+            q_max = q / eq.fetkovich_equation_array(p, p_res, None, x["n"])
+            future_q = eq.fetkovich_future_rate_array(q, p, p_res, future_p_res, x["n"])
+            future_q_max = future_q / eq.fetkovich_equation_array(p, future_p_res, None, x["n"])
+
+        else:
+            q_max = q / eq.vogel_equation_array(p, p_res)
+
+            if (method == "standing"):
+                future_q = eq.standing_future_rate_array(q, p, p_res, future_p_res)
+                future_q_max = future_q / eq.vogel_equation_array(p, future_p_res)
+            else:
+                future_q = eq.eckmeir_future_rate_array(q, p_res, future_p_res)
+                future_q_max = eq.eckmeir_future_rate_array(q_max, p_res, future_p_res)
+
+    # Samples with test pressure at or above reservoir pressure are infeasible,
+    # Vogel clamp would otherwise inflate their (future) q_max
+    feasible = p < p_res
+
+    return {
+        "q_max": np.where(feasible, q_max, np.nan),
+        "future_q": np.where(feasible, future_q, np.nan),
+        "future_q_max": np.where(feasible, future_q_max, np.nan),
+    }
+
+
+def summarize(values: dt.ARRAY) -> dict:
+    """
+    OUTPUT
+        { "P90": numeric, "P50": numeric, "P10": numeric,
+          "mean": numeric, "std": numeric, "valid": int }
+        over finite values
+    """
+
+    values = values[np.isfinite(values)]
+
+    if (values.size == 0):
+        summary = {name: np.nan for name in PERCENTILES}
+        summary.update({"mean": np.nan, "std": np.nan, "valid": 0})
+
+        return summary
+
+    summary = dict(zip(PERCENTILES, np.percentile(values, list(PERCENTILES.values())).tolist()))
+    summary.update({
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "valid": int(values.size),
+    })
+
+    return summary
+
+
+def simulate_well(
+    well: dict, method: dt.STRING = "standing", samples: dt.INT = 1000000,
+    seed=None, chunk_size: dt.INT = DEFAULT_CHUNK_SIZE, return_samples: dt.BOOLEAN = False
+) -> dict:
+    """
+    Monte Carlo simulation of single oil well
+
+    Samples are drawn and evaluated chunk by chunk.
+    Same seed and chunk_size give the same result
+
+    INPUT
+        well: { input: spec } (see INPUTS and draw), e.g. {
+            "p_res": ("normal", 3000, 150),
+            "liquid_rate": ("uniform", 600, 700),
+            "water_cut": ("beta", 2, 8),
+            "p": 1500,
+            "production_change": ("triangular", 0.1, 0.2, 0.3),
+            "n": ("uniform", 0.7, 1.0),         # "fetkovich" only
+        }
+            flow rate is either "q" (oil rate, water_cut unused)
+            or "liquid_rate" (oil rate = liquid_rate (1 - water_cut))
+        method: "standing" | "eckmeir" | "fetkovich"
+            DEFAULT: "standing"
+        samples: int
+            DEFAULT: 1000000
+        seed: int | numpy.random.SeedSequence | numpy.random.Generator
+            DEFAULT: None (not reproducible)
+        chunk_size (samples per chunk): int
+            DEFAULT: DEFAULT_CHUNK_SIZE
+        return_samples: bool
+            DEFAULT: False
+
+    OUTPUT
+        {
+            "method": str, "samples": int,
+            "q_max": summary, "future_q": summary, "future_q_max": summary,
+            "values"?: { "q_max": numeric[], ... } (return_samples only),
+        }
+        (see summarize), infeasible samples are left out of summaries
+    """
+
+    if (method not in MONTE_CARLO_METHODS):
+        raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (method))
+
+    check_inputs(well)
+
+    rng = np.random.default_rng(seed)
+    specs = get_specs(well)
+
+    values = {
+        name: np.empty(samples, dtype=np.float64)
+        for name in ("q_max", "future_q", "future_q_max")
+    }
+
+    for start in range(0, samples, chunk_size):
+        stop = min(start + chunk_size, samples)
+
+        x = {name: draw(rng, spec, stop - start) for (name, spec) in specs.items()}
+
+        for (name, result) in evaluate(method, x).items():
+            values[name][start:stop] = result
+
+    log.logger.debug("monte carlo %s: %d samples of %d chunks", method, samples, -(-samples // chunk_size))
+
+    result = {"method": method, "samples": samples}
+    result.update({name: summarize(x) for (name, x) in values.items()})
+
+    if (return_samples):
+        result["values"] = values
+
+    return result
+
+
+def simulate_wells(wells: list, method: dt.STRING = "standing", samples: dt.INT = 1000000, seed=None, **kwargs) -> list:
+    """
+    Monte Carlo simulation of several oil wells
+
+    Every well gets its own stream spawned from seed,
+    so its result does not depend on the other wells
+
+    INPUT
+        wells: well[] (see simulate_well)
+        method: str | str[] (one per well)
+        samples: int
+        seed: int | numpy.random.SeedSequence
+        **kwargs: chunk_size, return_samples of simulate_well
+
+    OUTPUT
+        result[] (see simulate_well)
+    """
+
+    wells = list(wells)
+    methods = [method] * len(wells) if isinstance(method, dt.STRING) else list(method)
+
+    if (len(methods) != len(wells)):
+        raise ValueError("method must be a str or one method per well")
+
+    seeds = np.random.SeedSequence(seed).spawn(len(wells))
+
+    return [
+        simulate_well(well, m, samples, s, **kwargs)
+        for (well, m, s) in zip(wells, methods, seeds)
+    ]
@@ -0,0 +1,195 @@
+"""
+nodal.py
+
+Nodal analysis of many wells:
+operating point where inflow (IPR) meets outflow (VLP)
+"""
+
+import numpy as np
+
+from .utils import *
+
+# Structured array layout of operating points
+OPERATING_POINT_DTYPE = np.dtype([
+    ("well", np.int64), ("q", np.float64), ("p_wf", np.float64), ("solved", np.bool_)
+])
+
+
+class TabulatedVLP:
+    """
+    Outflow (VLP) curves given as tables of
+    flow rate and required wellbore pressure
+    """
+
+    def __init__(self, q: dt.NUMERIC_ARRAY, p: dt.NUMERIC_ARRAY):
+        """
+        INPUT
+            q (Flow rate, ascending): numeric[points] shared by every well
+                or numeric[wells, points]
+            p (Required wellbore pressure at q): same shape as q
+        """
+
+        self.q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        self.p = np.atleast_1d(np.asarray(p, dtype=np.float64))
+
+        if (self.q.shape != self.p.shape):
+            raise ValueError("q and p must have the same shape")
+
+        if (self.q.shape[-1] < 2):
+            raise ValueError("VLP table needs at least two points")
+
+        if ((np.diff(self.q, axis=-1) < 0).any()):
+            raise ValueError("q of VLP table must be ascending")
+
+    def __repr__(self):
+        return "TabulatedVLP(shape=%s)" % (self.q.shape,)
+
+    def get_q_range(self):
+        """
+        OUTPUT
+            (q_min, q_max): (numeric[], numeric[]) of each table
+        """
+
+        return (self.q[..., 0], self.q[..., -1])
+
+    def calculate_pwf(self, q: dt.NUMERIC_ARRAY) -> dt.ARRAY:
+        """
+        Linear interpolation of required wellbore pressure,
+        end values are kept outside the table
+
+        INPUT
+            q (flow rate of each well): numeric[wells]
+
+        OUTPUT
+            p_wf: numeric[wells]
+        """
+
+        q = np.asarray(q, dtype=np.float64)
+
+        table_q = np.broadcast_to(self.q, q.shape + self.q.shape[-1:])
+        table_p = np.broadcast_to(self.p, table_q.shape)
+
+        # Segment of each well, found without a loop over wells
+        index = np.count_nonzero(table_q <= q[..., None], axis=-1) - 1
+        index = np.clip(index, 0, table_q.shape[-1] - 2)[..., None]
+
+        (q_0, q_1) = (np.take_along_axis(table_q, index, -1)[..., 0], np.take_along_axis(table_q, index + 1, -1)[..., 0])
+        (p_0, p_1) = (np.take_along_axis(table_p, index, -1)[..., 0], np.take_along_axis(table_p, index + 1, -1)[..., 0])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.clip((q - q_0) / (q_1 - q_0), 0, 1)
+
+        weight = np.where(q_1 > q_0, weight, 0)
+
+        return p_0 + weight * (p_1 - p_0)
+
+
+class GradientVLP:
+    """
+    Simple outflow model of a vertical tubing
+
+    p_wf = p_wh + gradient * depth + friction * depth * q^2
+    """
+
+    def __init__(
+        self,
+        p_wh: dt.NUMERIC_ARRAY,
+        depth: dt.NUMERIC_ARRAY,
+        gradient: dt.NUMERIC_ARRAY,
+        friction: dt.NUMERIC_ARRAY = 0,
+    ):
+        """
+        INPUT
+            p_wh (Wellhead pressure, psia): numeric | numeric[wells]
+            depth (Depth of perforation, ft): numeric | numeric[wells]
+            gradient (Static fluid gradient, psi/ft): numeric | numeric[wells]
+            friction (Friction loss, psi/ft per stbd^2): numeric | numeric[wells]
+                DEFAULT: 0
+        """
+
+        self.p_wh = np.asarray(p_wh, dtype=np.float64)
+        self.depth = np.asarray(depth, dtype=np.float64)
+        self.gradient = np.asarray(gradient, dtype=np.float64)
+        self.friction = np.asarray(friction, dtype=np.float64)
+
+    def __repr__(self):
+        return "GradientVLP(wells=%d)" % (
+            np.broadcast(self.p_wh, self.depth, self.gradient, self.friction).size
+        )
+
+    def get_q_range(self):
+        return (0, np.inf)
+
+    def calculate_pwf(self, q: dt.NUMERIC_ARRAY) -> dt.ARRAY:
+        """
+        INPUT
+            q (flow rate of each well): numeric[wells]
+
+        OUTPUT
+            p_wf: numeric[wells]
+        """
+
+        q = np.asarray(q, dtype=np.float64)
+
+        return self.p_wh + self.depth * (self.gradient + self.friction * q * q)
+
+
+def find_operating_points(
+    fleet, vlp, q_max: dt.NUMERIC_ARRAY = None,
+    tolerance: dt.NUMERIC = 1e-6, max_iterations: dt.INT = 100
+) -> dt.ARRAY:
+    """
+    Find operating point (intersection of IPR and VLP) of every well
+
+    Wellbore pressure p is solved from p = VLP(q_max * qr(p))
+    between 0 and p_res of each well, all wells at once.
+    The IPR is used directly (no inversion),
+    so any method of WellFleet is supported
+
+    INPUT
+        fleet (IPR of every well): WellFleet
+        vlp (outflow of every well): TabulatedVLP | GradientVLP
+        q_max (max flow rate): numeric[]
+            DEFAULT: fleet.calculate_q_max()
+        tolerance (of p_wf, psia): numeric
+            DEFAULT: 1e-6
+        max_iterations: int
+            DEFAULT: 100
+
+    OUTPUT
+        { "well": int, "q": numeric, "p_wf": numeric, "solved": bool }[]
+        (structured array), q and p_wf are NaN where the curves
+        do not meet (e.g. well cannot flow against the outflow)
+    """
+
+    if (q_max is None):
+        q_max = fleet.calculate_q_max()["q_max"]
+
+    q_max = np.broadcast_to(np.asarray(q_max, dtype=np.float64), (len(fleet),))
+
+    def inflow(p):
+        return q_max * fleet.calculate_rate_ratio(p)
+
+    def residual(p):
+        return p - vlp.calculate_pwf(inflow(p))
+
+    (p_wf, solved) = numerical.solve_monotone(
+        residual, 0, 0, fleet.p_res, tolerance=tolerance, max_iterations=max_iterations
+    )
+
+    with np.errstate(invalid="ignore"):
+        q = inflow(p_wf)
+
+    # Intersections beyond the VLP table are not trusted
+    (q_low, q_high) = vlp.get_q_range()
+    with np.errstate(invalid="ignore"):
+        solved = solved & np.isfinite(q) & (q >= q_low) & (q <= q_high)
+
+    result = np.empty(len(fleet), dtype=OPERATING_POINT_DTYPE)
+    result["well"] = np.arange(len(fleet))
+    result["q"] = np.where(solved, q, np.nan)
+    result["p_wf"] = np.where(solved, p_wf, np.nan)
+    result["solved"] = solved
+
+    return result
+
@@ -0,0 +1,121 @@
+"""
+plotting.py
+
+Rendering of production graphs
+
+matplotlib is only imported on first use, so calculation modules
+(src.ipr, src.future_ipr, src.utils, ...) never load it.
+The non-interactive "Agg" backend is used unless MPLBACKEND
+or the backend argument of get_pyplot says otherwise,
+and pyplot imported before (e.g. by a notebook) keeps its backend
+"""
+
+import os
+import sys
+
+from .curve_store import curve_arrays
+
+DEFAULT_BACKEND = "Agg"
+
+pyplot = None
+
+
+def get_pyplot(backend: str = None):
+    """
+    Import matplotlib.pyplot on first call
+
+    INPUT
+        backend: str
+            DEFAULT: backend of pyplot imported before,
+            MPLBACKEND environment variable or DEFAULT_BACKEND
+    """
+
+    global pyplot
+
+    if (pyplot is None):
+        import matplotlib
+
+        if (backend is not None):
+            matplotlib.use(backend)
+        elif ("matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND")):
+            matplotlib.use(DEFAULT_BACKEND)
+
+        import matplotlib.pyplot
+
+        pyplot = matplotlib.pyplot
+
+    return pyplot
+
+
+def plot_production_graph(graph, label: str = None, ax=None, scatter: bool = True):
+    """
+    Draw production graph as flow rate (x) against pressure (y)
+
+    INPUT
+        graph: { "q": numeric, "p": numeric }[] | structured array | (p, q)
+        label: str
+        ax: matplotlib Axes
+            DEFAULT: current axes
+        scatter (mark each point): bool
+            DEFAULT: True
+
+    OUTPUT
+        ax: matplotlib Axes
+    """
+
+    ax = ax or get_pyplot().gca()
+    (p, q) = curve_arrays(graph)
+
+    ax.plot(q, p, linestyle="dashed", linewidth=.75)
+
+    if (scatter):
+        ax.scatter(q, p, label=label)
+
+    return ax
+
+
+def plot_production_data(data, label: str = "Production data", ax=None):
+    """
+    Draw production data as points
+
+    INPUT
+        data: { "q": numeric, "p": numeric }[] | ProductionSeries
+        label: str
+        ax: matplotlib Axes
+            DEFAULT: current axes
+    """
+
+    ax = ax or get_pyplot().gca()
+    (p, q) = curve_arrays(data)
+
+    ax.scatter(q, p, label=label)
+
+    return ax
+
+
+def decorate(title: str = None, ax=None):
+    """
+    Add axis labels, title and legend of production graph
+    """
+
+    ax = ax or get_pyplot().gca()
+
+    if (title is not None):
+        ax.set_title(title)
+
+    ax.set_xlabel("Flow rate (stbd)")
+    ax.set_ylabel("Pressure (psia)")
+    ax.legend()
+
+    return ax
+
+
+def save_figure(path: str, **kwargs) -> None:
+    """
+    Save current figure and close it
+    """
+
+    plt = get_pyplot()
+
+    plt.savefig(path, **kwargs)
+    plt.close()
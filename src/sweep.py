@@ -0,0 +1,197 @@
+"""
+sweep.py
+
+Scenario sweeps of future oil well performance over grids of inputs,
+e.g. p_res x production_change x method x p_wf,
+without mutating OilWell instances
+"""
+
+import numpy as np
+
+from .utils import *
+from .monte_carlo import MONTE_CARLO_METHODS, check_inputs, evaluate, get_specs
+
+# Cells evaluated at once, bounds memory of temporary arrays
+DEFAULT_CHUNK_SIZE = 262144
+
+# Results of every cell
+OUTPUTS = ["q_max", "future_q_max", "future_q"]
+
+
+class SweepResult:
+    """
+    N-dimensional result of sweep labeled by its axes
+
+    dims: (str, ...) axis names, in order of array dimensions
+    coords: { axis: numeric[] | str[] } values along each axis
+    data: { output: numeric[...] } one array per output (see OUTPUTS)
+    """
+
+    def __init__(self, dims: tuple, coords: dict, data: dict):
+        self.dims = dims
+        self.coords = coords
+        self.data = data
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(self.coords[name].size for name in self.dims)
+
+    def __getitem__(self, output: dt.STRING) -> dt.ARRAY:
+        return self.data[output]
+
+    def __repr__(self):
+        axes = ", ".join("%s: %d" % (name, self.coords[name].size) for name in self.dims)
+        return "SweepResult(%s; %s)" % (axes, ", ".join(self.data))
+
+    def sel(self, **labels) -> "SweepResult":
+        """
+        Select cells by axis values, e.g. sel(method="standing", p_res=3000).
+        Selected axes are dropped from the result
+
+        OUTPUT: SweepResult
+        """
+
+        index = []
+
+        for name in self.dims:
+            if (name not in labels):
+                index.append(slice(None))
+                continue
+
+            found = np.flatnonzero(self.coords[name] == labels[name])
+            if (found.size == 0):
+                raise KeyError("%r not found in axis %s" % (labels[name], name))
+
+            index.append(int(found[0]))
+
+        unknown = sorted(set(labels) - set(self.dims))
+        if (unknown):
+            raise KeyError("Axes do not exist: %s" % (unknown))
+
+        dims = tuple(name for name in self.dims if name not in labels)
+
+        return SweepResult(
+            dims,
+            {name: self.coords[name] for name in dims},
+            {output: x[tuple(index)] for (output, x) in self.data.items()},
+        )
+
+
+def evaluate_cells(x: dict) -> dict:
+    """
+    Evaluate flat cells of several methods
+
+    INPUT
+        x: { input: numeric[] | numeric, "method": str[], "pwf": numeric[] | numeric }
+
+    OUTPUT
+        { output: numeric[] } (see OUTPUTS)
+    """
+
+    method = x["method"]
+    size = method.size
+
+    result = {output: np.full(size, np.nan) for output in OUTPUTS}
+
+    for m in np.unique(method):
+        if (m not in MONTE_CARLO_METHODS):
+            raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (m))
+
+        mask = method == m
+        cells = {
+            name: (np.asarray(value)[mask] if np.ndim(value) > 0 else value)
+            for (name, value) in x.items() if name != "method"
+        }
+
+        values = evaluate(m, cells)
+
+        # Future curve at p_wf (Vogel curve of future q_max for "eckmeir")
+        pwf = cells["pwf"]
+        future_p_res = cells["p_res"] * (1 - cells["production_change"])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if (m == "fetkovich"):
+                rate_ratio = eq.fetkovich_equation_array(pwf, future_p_res, None, cells["n"])
+            else:
+                rate_ratio = eq.vogel_equation_array(pwf, future_p_res)
+
+        future_q = np.where(pwf <= future_p_res, values["future_q_max"] * rate_ratio, np.nan)
+
+        result["q_max"][mask] = values["q_max"]
+        result["future_q_max"][mask] = values["future_q_max"]
+        result["future_q"][mask] = future_q
+
+    return result
+
+
+def sweep(axes: dict, fixed: dict = None, chunk_size: dt.INT = DEFAULT_CHUNK_SIZE) -> SweepResult:
+    """
+    Evaluate future oil well performance on every cell
+    of the grid spanned by axes
+
+    Cells are evaluated in flat chunks of at most chunk_size,
+    so memory does not grow with temporary arrays of the whole grid
+
+    INPUT
+        axes: { name: values[] }, in order of result dimensions, e.g. {
+            "p_res": [2500, 3000, 3500],
+            "production_change": np.linspace(0, 0.3, 31),
+            "method": ["standing", "eckmeir", "fetkovich"],
+            "pwf": np.linspace(0, 2000, 201),
+        }
+        fixed: { name: numeric } inputs which are not swept, e.g. { "q": 500, "p": 1500 }
+
+        Names: p_res, p (test pressure, required),
+        q (test oil rate) or liquid_rate (test liquid rate, with water_cut),
+        production_change, n (Fetkovich), method and pwf
+            DEFAULT: water_cut = 0, production_change = 0, n = 1,
+            method = "standing", pwf = p
+        chunk_size (cells per chunk): int
+            DEFAULT: DEFAULT_CHUNK_SIZE
+
+    OUTPUT
+        SweepResult with
+            q_max (present max flow rate),
+            future_q_max (future max flow rate),
+            future_q (future flow rate at pwf, NaN above future p_res)
+    """
+
+    fixed = dict(fixed or {})
+
+    both = sorted(set(axes) & set(fixed))
+    if (both):
+        raise ValueError("Inputs are both swept and fixed: %s" % (both))
+
+    check_inputs((set(axes) | set(fixed)) - {"method", "pwf"})
+
+    dims = tuple(axes)
+    coords = {
+        name: np.atleast_1d(np.asarray(values, dtype=np.str_ if name == "method" else np.float64))
+        for (name, values) in axes.items()
+    }
+
+    fixed = get_specs(fixed)
+    fixed.setdefault("method", "standing")
+
+    shape = tuple(coords[name].size for name in dims)
+    size = int(np.prod(shape))
+
+    data = {output: np.empty(shape, dtype=np.float64) for output in OUTPUTS}
+    flat = {output: x.reshape(-1) for (output, x) in data.items()}
+
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        index = np.unravel_index(np.arange(start, stop), shape)
+
+        x = {name: coords[name][i] for (name, i) in zip(dims, index)}
+        x.update((name, value) for (name, value) in fixed.items() if name not in x)
+
+        x["method"] = np.broadcast_to(np.asarray(x["method"], dtype=np.str_), (stop - start,))
+        x.setdefault("pwf", x["p"])
+
+        for (output, values) in evaluate_cells(x).items():
+            flat[output][start:stop] = values
+
+    log.logger.debug("sweep %s: %d cells", dict(zip(dims, shape)), size)
+
+    return SweepResult(dims, coords, data)
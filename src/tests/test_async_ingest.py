@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from src import async_ingest
+
+ROWS = [
+    {"well": "A", "q": 252.0, "p": 1653.0},
+    {"well": "B", "q": 300.0, "p": 2300.0},
+    {"well": "A", "q": 516.0, "p": 1507.0, "t": 2.0},
+    {"well": "B", "q": 550.0, "p": 2000.0},
+    {"well": "A", "q": 768.0, "p": 1335.0},
+]
+
+
+def csv_text(rows):
+    lines = ["well,q,p,t"] + [
+        "%s,%s,%s,%s" % (x["well"], x["q"], x["p"], x.get("t", "")) for x in rows
+    ]
+
+    return "\n".join(lines) + "\n"
+
+
+def ndjson_text(rows):
+    return "\n".join(json.dumps(x) for x in rows) + "\n"
+
+
+def test_async_ingest_keeps_order_and_reports_errors():
+    files = {
+        "b.ndjson": ndjson_text(ROWS[3:]),
+        "a.csv": csv_text(ROWS[:3]),
+        "broken.csv": "well,q\nA,1\n",
+    }
+    source = async_ingest.MemorySource(files, delay=0.01)
+
+    (batches, errors) = async_ingest.run_ingest([source], max_concurrency=2)
+
+    assert source.max_active <= 2
+    assert list(errors) == [(0, "broken.csv")]
+
+    np.testing.assert_array_equal(batches["A"].q, [252, 516, 768])
+    np.testing.assert_array_equal(batches["B"].q, [300, 550])
+    np.testing.assert_array_equal(batches["A"].t, [np.nan, 2, np.nan])
+
+
+def test_directory_source(tmp_path):
+    (tmp_path / "a.csv").write_text(csv_text(ROWS))
+    (tmp_path / "notes.txt").write_text("not a test file")
+
+    (batches, errors) = async_ingest.run_ingest([async_ingest.DirectorySource(str(tmp_path), "*.csv")])
+
+    assert errors == {}
+    np.testing.assert_array_equal(batches["B"].p, [2300, 2000])
+
+
+def test_workers_are_bounded():
+    files = {"%03d.ndjson" % i: ndjson_text(ROWS) for i in range(200)}
+    source = async_ingest.MemorySource(files, delay=0.001)
+
+    async def run():
+        (names, tasks) = ([], [])
+
+        async for (index, name, tests) in async_ingest.iter_files([source], max_concurrency=4):
+            names.append(name)
+            tasks.append(len(asyncio.all_tasks()))
+
+        return (names, tasks)
+
+    (names, tasks) = asyncio.run(run())
+
+    assert sorted(names) == sorted(files)
+    assert source.max_active <= 4
+
+    # Current task, producer and 4 workers, not one task per file
+    assert max(tasks) <= 6
+
+
+def test_sources_without_files():
+    (batches, errors) = async_ingest.run_ingest([async_ingest.MemorySource({})])
+
+    assert batches == {} and errors == {}
+
+    with pytest.raises(ValueError):
+        async_ingest.run_ingest([async_ingest.MemorySource({})], max_concurrency=0)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.curve_store import CurveStore, write_curves
+from src.fleet import WellFleet
+
+
+def test_curve_store_round_trip(tmp_path):
+    fleet = WellFleet([1734.0, 2500.0], [768.0, 550.0], [1335.0, 2000.0])
+    graph = fleet.get_production_graph(10)
+
+    curves = [graph[0], [{"p": 10.0, "q": 5.0}, {"p": 20.0, "q": 1.0}], ([1.0], [2.0])]
+    path = str(tmp_path / "curves.bin")
+    write_curves(path, curves)
+
+    store = CurveStore(path)
+
+    assert len(store) == 3
+    np.testing.assert_array_equal(store[0][0], graph["p"][0])
+    np.testing.assert_array_equal(store[0][1], graph["q"][0])
+    assert store.get_production_graph(1) == [{"p": 10.0, "q": 5.0}, {"p": 20.0, "q": 1.0}]
+    assert store.get_production_graph(-1) == [{"p": 1.0, "q": 2.0}]
+
+
+def test_curve_store_rejects_other_files(tmp_path):
+    (tmp_path / "other.bin").write_bytes(b"x" * 100)
+
+    with pytest.raises(ValueError):
+        CurveStore(str(tmp_path / "other.bin"))
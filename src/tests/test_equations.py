@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from src.utils import eq
+
+P_RES = 3000.0
+Q_MAX = 1200.0
+
+# Wellbore pressures away from the Vogel clamp at p = p_res
+PRESSURES = np.array([14.7, 500.0, 1335.0, 2000.0, 2900.0])
+
+
+def test_vogel_inverse_of_forward():
+    q = Q_MAX * eq.vogel_equation_array(PRESSURES, P_RES)
+    pr = eq.pressure_ratio_from_vogel_equation_array(q, Q_MAX)
+
+    np.testing.assert_allclose(pr * P_RES, PRESSURES, rtol=1e-10)
+
+
+@pytest.mark.parametrize("n", [0.6, 0.85, 1.0, 1.2])
+def test_fetkovich_inverse_of_forward(n):
+    q = Q_MAX * eq.fetkovich_equation_array(PRESSURES, P_RES, None, n)
+    pr = eq.pressure_ratio_from_fetkovich_equation_array(q, Q_MAX, n)
+
+    np.testing.assert_allclose(pr * P_RES, PRESSURES, rtol=1e-10)
+
+
+@pytest.mark.parametrize("phase", ["oil", "water"])
+def test_wiggin_inverse_of_forward(phase):
+    q = Q_MAX * eq.wiggin_equation_array(phase, PRESSURES, P_RES)
+    pr = eq.pressure_ratio_from_wiggin_equation_array(phase, q, Q_MAX)
+
+    np.testing.assert_allclose(pr * P_RES, PRESSURES, rtol=1e-10)
+
+
+@pytest.mark.parametrize("p_b", [1000.0, 2500.0, 3500.0])
+def test_composite_inverse_of_forward(p_b):
+    q = Q_MAX * eq.composite_equation_array(PRESSURES, P_RES, p_b)
+    pr = eq.pressure_ratio_from_composite_equation_array(q, Q_MAX, P_RES, p_b)
+
+    np.testing.assert_allclose(pr * P_RES, PRESSURES, rtol=1e-10)
+
+
+def test_scalar_and_array_equations_agree():
+    for p in PRESSURES.tolist():
+        assert eq.vogel_equation(p, P_RES) == pytest.approx(eq.vogel_equation_array(p, P_RES))
+        assert eq.fetkovich_equation(p, P_RES, None, 0.8) == pytest.approx(eq.fetkovich_equation_array(p, P_RES, None, 0.8))
+        assert eq.wiggin_equation("oil", p, P_RES) == pytest.approx(eq.wiggin_equation_array("oil", p, P_RES))
+        assert eq.composite_equation(p, P_RES, 2000.0) == pytest.approx(eq.composite_equation_array(p, P_RES, 2000.0))
+
+    q = 700.0
+    assert eq.pressure_ratio_from_vogel_equation(q, Q_MAX) == pytest.approx(eq.pressure_ratio_from_vogel_equation_array(q, Q_MAX))
+    assert eq.pressure_ratio_from_fetkovich_equation(q, Q_MAX, 0.8) == pytest.approx(eq.pressure_ratio_from_fetkovich_equation_array(q, Q_MAX, 0.8))
+    assert eq.pressure_ratio_from_wiggin_equation("water", q, Q_MAX) == pytest.approx(eq.pressure_ratio_from_wiggin_equation_array("water", q, Q_MAX))
+    assert eq.pressure_ratio_from_composite_equation(q, Q_MAX, P_RES, 2000.0) == pytest.approx(eq.pressure_ratio_from_composite_equation_array(q, Q_MAX, P_RES, 2000.0))
+
+
+def test_inverse_masks_invalid_elements():
+    q = np.array([600.0, 1300.0, -1.0, np.nan])
+
+    for pr in (
+        eq.pressure_ratio_from_vogel_equation_array(q, Q_MAX),
+        eq.pressure_ratio_from_fetkovich_equation_array(q, Q_MAX, 0.8),
+        eq.pressure_ratio_from_wiggin_equation_array("oil", q, Q_MAX),
+        eq.pressure_ratio_from_composite_equation_array(q, Q_MAX, P_RES, 2000.0),
+    ):
+        assert np.isfinite(pr[0])
+        assert np.isnan(pr[1:]).all()
+
+    assert np.isnan(eq.pressure_ratio_from_fetkovich_equation_array(600.0, Q_MAX, [-1.0, 0.0])).all()
+    assert np.isnan(eq.pressure_ratio_from_wiggin_equation_array("gas", 600.0, Q_MAX))
+
+
+def test_rate_ratio_function_inverse():
+    vogel = lambda pr: eq.vogel_equation_array(pr, 1)
+
+    q = Q_MAX * eq.vogel_equation_array(PRESSURES, P_RES)
+    pr = eq.pressure_ratio_from_rate_ratio_function(vogel, q, Q_MAX)
+
+    np.testing.assert_allclose(pr * P_RES, PRESSURES, rtol=1e-8)
+
+
+def test_rate_ratio_function_bounds():
+    vogel = lambda pr: eq.vogel_equation_array(pr, 1)
+
+    pr = eq.pressure_ratio_from_rate_ratio_function(vogel, np.array([0.0, Q_MAX, 1.5 * Q_MAX]), Q_MAX)
+
+    assert pr[0] == 1.0
+    assert pr[1] == pytest.approx(0.0, abs=1e-10)
+    assert np.isnan(pr[2])
+
+
+def test_curve_family_matches_single_curves():
+    p_res = np.array([2000.0, 3000.0])
+    q_max = np.array([800.0, 1200.0])
+    grid = np.linspace(0, 1, 11)
+
+    (p, q) = eq.curve_family("vogel", p_res, q_max, grid)
+    np.testing.assert_allclose(q, q_max[:, None] * eq.vogel_equation_array(p, p_res[:, None]))
+
+    n = np.array([0.7, 1.1])
+    (p, q) = eq.curve_family("fetkovich", p_res, q_max, grid, n)
+    np.testing.assert_allclose(q, q_max[:, None] * eq.fetkovich_equation_array(p, p_res[:, None], None, n[:, None]))
+
+    # Grid of each curve
+    (p, q) = eq.curve_family("vogel", p_res, q_max, np.array([grid, grid**2]))
+    np.testing.assert_allclose(p[1], p_res[1] * grid**2)
+    np.testing.assert_allclose(q, q_max[:, None] * eq.vogel_equation_array(p, p_res[:, None]))
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from src.fleet import WellFleet
+from src.ipr import TwoPhaseProduction, ThreePhaseProduction
+from src.utils import eq, err
+
+P_RES = np.array([1734.0, 2500.0, 3000.0])
+P_B = np.array([1200.0, 2000.0, 3500.0])
+
+# Three tests of each well, the last one is used for q_max
+TESTS = {
+    "well": np.array([0, 0, 0, 1, 1, 1, 2, 2, 2]),
+    "q": np.array([252.0, 516.0, 768.0, 300.0, 550.0, 700.0, 100.0, 400.0, 650.0]),
+    "p": np.array([1653.0, 1507.0, 1335.0, 2300.0, 2000.0, 1800.0, 2900.0, 2500.0, 2100.0]),
+}
+
+
+def well_tests(i):
+    mask = TESTS["well"] == i
+
+    return [{"q": q, "p": p} for (q, p) in zip(TESTS["q"][mask].tolist(), TESTS["p"][mask].tolist())]
+
+
+def create_fleet(method, **kwargs):
+    return WellFleet(P_RES, TESTS["q"], TESTS["p"], method, well=TESTS["well"], **kwargs)
+
+
+def create_production(i, method):
+    production = TwoPhaseProduction(P_RES[i], P_B[i] if method == "composite" else None)
+    production.data = well_tests(i)
+
+    return production
+
+
+@pytest.mark.parametrize("method", ["vogel", "fetkovich", "composite"])
+def test_q_max_and_pwf_match_two_phase_production(method):
+    fleet = create_fleet(method, p_b=P_B)
+
+    q_max = fleet.calculate_q_max()["q_max"]
+    p_wf = fleet.calculate_pwf(0.5 * q_max)["p_wf"]
+
+    for i in range(len(fleet)):
+        production = create_production(i, method)
+
+        expected_q_max = production.calculate_q_max(method, well_tests(i)[-1])
+        assert q_max[i] == pytest.approx(expected_q_max, rel=1e-10)
+        assert p_wf[i] == pytest.approx(production.calculate_pwf(method, 0.5 * expected_q_max, expected_q_max), rel=1e-10)
+
+
+def test_fetkovich_coefficients_match_two_phase_production():
+    (C, n) = create_fleet("fetkovich").get_fetkovich_coefficients()
+
+    for i in range(len(P_RES)):
+        expected = create_production(i, "fetkovich").get_fetkovich_coefficients()
+        np.testing.assert_allclose((C[i], n[i]), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("phase", ["oil", "water"])
+def test_q_max_and_pwf_match_three_phase_production(phase):
+    fleet = create_fleet("wiggin", water_cut=0.3, phase=phase)
+
+    q_max = fleet.calculate_q_max()["q_max"]
+    p_wf = fleet.calculate_pwf(0.5 * q_max)["p_wf"]
+
+    for i in range(len(fleet)):
+        production = ThreePhaseProduction(P_RES[i], 0.3)
+
+        expected_q_max = production.calculate_q_max(phase, "wiggin", well_tests(i)[-1])
+        assert q_max[i] == pytest.approx(expected_q_max, rel=1e-10)
+        assert p_wf[i] == pytest.approx(production.calculate_pwf(phase, 0.5 * expected_q_max, expected_q_max), rel=1e-10)
+
+
+def test_production_graph_matches_vogel_curve():
+    fleet = create_fleet("vogel")
+
+    q_max = fleet.calculate_q_max()["q_max"]
+    graph = fleet.get_production_graph(10)
+
+    assert graph.shape == (3, 11)
+    np.testing.assert_allclose(graph["p"][:, -1], P_RES)
+    np.testing.assert_allclose(graph["q"], q_max[:, None] * eq.vogel_equation_array(graph["p"], P_RES[:, None]))
+
+
+def test_mixed_methods():
+    method = np.array(["vogel", "fetkovich", "composite"])
+    q_max = create_fleet(method, p_b=P_B).calculate_q_max()["q_max"]
+
+    for i in range(3):
+        assert q_max[i] == pytest.approx(create_fleet(method[i], p_b=P_B).calculate_q_max()["q_max"][i])
+
+
+def test_invalid_wells_raise_value_errors():
+    with pytest.raises(err.MethodNotExistExecption):
+        create_fleet("linear")
+
+    with pytest.raises(err.PhaseNotExistsException):
+        create_fleet("wiggin", phase="gas")
+
+    with pytest.raises(ValueError):
+        create_fleet("composite")
+
+    # Package errors are value errors, as WellFleet validates its inputs
+    assert issubclass(err.MethodNotExistExecption, ValueError)
+    assert issubclass(err.PhaseNotExistsException, ValueError)
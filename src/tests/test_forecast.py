@@ -0,0 +1,42 @@
+import pytest
+
+from src.forecast import forecast_chunk, forecast_well, run_forecast
+
+WELL = {"p_res": 1734, "data": [{"q": 768, "p": 1335}], "production_change": 0.2, "method": "standing"}
+
+
+def create_wells():
+    wells = []
+
+    for (i, method) in enumerate(["standing", "eckmeir", "fetkovich"] * 3):
+        data = [{"q": 252 + 10 * i, "p": 1653}, {"q": 516 + 10 * i, "p": 1507}, {"q": 768 + 10 * i, "p": 1335}]
+        wells.append(dict(WELL, data=data, method=method, production_change=0.02 * (i + 1)))
+
+    # Failed well between valid ones
+    wells.insert(4, dict(WELL, method="linear"))
+
+    return wells
+
+
+def test_forecast_reports_failed_wells():
+    results = forecast_chunk([WELL, dict(WELL, method="linear"), dict(WELL, data=[])])
+
+    assert results[0] == forecast_well(WELL)
+    assert results[0]["error"] is None
+    assert results[1]["error"].startswith("MethodNotExistExecption")
+    assert results[2]["error"] is not None
+
+
+@pytest.mark.parametrize("chunksize", [None, 1, 4])
+def test_process_pool_matches_serial_run(chunksize):
+    wells = create_wells()
+
+    serial = run_forecast(wells, max_workers=1)
+    parallel = run_forecast(wells, max_workers=2, chunksize=chunksize)
+
+    assert len(parallel) == len(wells)
+    assert parallel == serial
+
+    # Results keep the order of wells
+    assert [x["method"] for x in parallel] == [x["method"] for x in wells]
+    assert parallel[4]["error"].startswith("MethodNotExistExecption")
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from src.future_ipr import OilWell
+from src.utils import eq
+
+DATA = [
+    {"q": 252, "p": 1653},
+    {"q": 516, "p": 1507},
+    {"q": 768, "p": 1335},
+]
+
+
+def create_well():
+    well = OilWell(1734)
+    well.data = DATA
+
+    return well
+
+
+@pytest.mark.parametrize("tolerance", [None, 1.0])
+def test_production_graph_reports_invalid_method(tolerance, capsys):
+    well = create_well()
+
+    assert well.get_production_graph("eckmeir_future", 1000, 10, 1734, DATA[-1], tolerance) is None
+    assert "does not exist" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("method", ["standing", "fetkovich"])
+def test_adaptive_production_graph_follows_curve(method):
+    well = create_well()
+    q_max = well.calculate_q_max(method, 1734, DATA[-1])
+
+    fixed = well.get_production_graph(method, q_max, 200, 1734, DATA[-1])
+    adaptive = well.get_production_graph(method, q_max, 4, 1734, DATA[-1], 1.0)
+
+    assert adaptive[0]["p"] == pytest.approx(14.7)
+    assert adaptive[-1]["p"] == pytest.approx(1734)
+
+    # Measured data stays on the curve, as with fixed intervals
+    assert {x["p"] for x in DATA} <= {x["p"] for x in adaptive}
+
+    p = [x["p"] for x in fixed]
+    q = np.interp(p, [x["p"] for x in adaptive], [x["q"] for x in adaptive])
+    np.testing.assert_allclose(q, [x["q"] for x in fixed], atol=1.0 + 0.01)
+
+
+@pytest.mark.parametrize("method", ["standing", "fetkovich"])
+def test_pwf_inverse_of_production_graph(method):
+    well = create_well()
+    graph = well.get_production_graph(method, 1200, 10, 1734, DATA[-1])
+
+    for x in graph[1:-1]:
+        assert well.calculate_pwf(1734, x["q"], 1200, method) == pytest.approx(x["p"], abs=0.1)
+
+
+def test_pwf_of_rate_ratio_function():
+    well = create_well()
+    vogel = lambda pr: eq.vogel_equation_array(pr, 1)
+
+    assert well.calculate_pwf(1734, 500, 1200, vogel) == pytest.approx(well.calculate_pwf(1734, 500, 1200))
+
+
+def test_pwf_reports_invalid_method(capsys):
+    assert create_well().calculate_pwf(1734, 500, 1200, "eckmeir_future") is None
+    assert "does not exist" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("method", ["standing", "eckmeir", "fetkovich"])
+def test_future_schedule_matches_single_steps(method):
+    well = create_well()
+
+    # The last step is below the pressure of the latest data
+    changes = [0.1, 0.2] + ([] if method == "fetkovich" else [0.3])
+    schedule = well.get_future_schedule(method, production_change=changes)
+
+    for (i, change) in enumerate(changes):
+        well.production_change = change
+        well.future_p_res = 1734 * (1 - change)
+
+        assert schedule["future_p_res"][i] == pytest.approx(well.future_p_res)
+        assert schedule["future_q"][i] == pytest.approx(well.calculate_future_q(method, DATA[-1]))
+
+    assert schedule["curve"].shape == (len(changes), 21)
+    np.testing.assert_allclose(schedule["curve"]["p"][:, -1], schedule["future_p_res"])
+
+
+def test_future_schedule_needs_pressures():
+    with pytest.raises(ValueError):
+        create_well().get_future_schedule("standing")
+
+    with pytest.raises(ValueError):
+        create_well().get_future_schedule("standing", [1500], [0.1])
+
+    with pytest.raises(ValueError):
+        create_well().get_future_schedule("linear", [1500])
+
+
+@pytest.mark.parametrize("data", [DATA, DATA[-1:]])
+@pytest.mark.parametrize("method", ["standing", "fetkovich"])
+def test_production_graph_family_matches_single_graphs(method, data):
+    well = OilWell(1734)
+    well.data = data
+
+    p_res = np.array([1734.0, 1700.0, 1734.0])
+    q_max = np.array([1200.0, 900.0, 1000.0])
+
+    family = well.get_production_graph_family(method, q_max, p_res, n=10)
+
+    assert family.shape == (3, 11)
+    np.testing.assert_allclose(family["p"][:, 0], 14.7)
+    np.testing.assert_allclose(family["p"][:, -1], p_res)
+
+    for i in range(3):
+        # Same equations and fit as get_production_graph
+        if (method == "standing"):
+            expected = [q_max[i] * eq.vogel_equation(p, p_res[i]) for p in family["p"][i]]
+        else:
+            (C, n) = well.get_fetkovich_coefficients(p_res[i])
+            expected = [q_max[i] * eq.fetkovich_equation(p, p_res[i], None, n) for p in family["p"][i]]
+
+        np.testing.assert_allclose(family["q"][i], expected)
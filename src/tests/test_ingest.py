@@ -0,0 +1,85 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from src import ingest
+from src.ipr import TwoPhaseProduction
+from src.utils import numerical
+
+ROWS = [
+    {"well": "A", "q": 252.0, "p": 1653.0},
+    {"well": "B", "q": 300.0, "p": 2300.0},
+    {"well": "A", "q": 516.0, "p": 1507.0, "t": 2.0},
+    {"well": "B", "q": 550.0, "p": 2000.0},
+    {"well": "A", "q": 768.0, "p": 1335.0},
+]
+
+P_RES = {"A": 1734.0, "B": 2500.0}
+
+
+def text_file(text, name):
+    file = io.StringIO(text)
+    file.name = name
+
+    return file
+
+
+def csv_text(rows):
+    lines = ["well,q,p,t"] + [
+        "%s,%s,%s,%s" % (x["well"], x["q"], x["p"], x.get("t", "")) for x in rows
+    ]
+
+    return "\n".join(lines) + "\n"
+
+
+def ndjson_text(rows):
+    return "\n".join(json.dumps(x) for x in rows) + "\n"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+def test_read_chunks(format, chunk_size):
+    text = csv_text(ROWS) if format == "csv" else ndjson_text(ROWS)
+    chunks = list(ingest.read_chunks(text_file(text, "tests." + format), chunk_size))
+
+    assert all(x.q.size <= chunk_size for x in chunks)
+
+    np.testing.assert_array_equal(np.concatenate([x.well for x in chunks]), [x["well"] for x in ROWS])
+    np.testing.assert_array_equal(np.concatenate([x.q for x in chunks]), [x["q"] for x in ROWS])
+
+    t = np.concatenate([np.full(x.q.size, np.nan) if x.t is None else x.t for x in chunks])
+    np.testing.assert_array_equal(t, [x.get("t", np.nan) for x in ROWS])
+
+
+def test_read_chunks_reports_line():
+    with pytest.raises(ValueError, match="line 3"):
+        list(ingest.read_chunks(text_file('{"well": "A", "q": 1, "p": 2}\n\n{"well": "A", "q": 1}\n', "x.ndjson")))
+
+    with pytest.raises(ValueError):
+        list(ingest.read_chunks(text_file("well,q\nA,1\n", "x.csv")))
+
+
+def test_accumulated_fits_match_power_regression():
+    chunks = ingest.read_chunks(text_file(csv_text(ROWS), "tests.csv"), 2)
+    fits = ingest.accumulate_fits(chunks, P_RES)
+
+    for well in P_RES:
+        tests = [x for x in ROWS if x["well"] == well]
+        q = np.array([x["q"] for x in tests])
+        p = np.array([x["p"] for x in tests])
+
+        np.testing.assert_allclose(
+            fits[well].power_coefficients(), numerical.power_regression(q, P_RES[well]**2 - p**2)
+        )
+
+
+def test_load_productions():
+    chunks = ingest.read_chunks(text_file(ndjson_text(ROWS), "tests.ndjson"), 2)
+    productions = ingest.load_productions(chunks, lambda well: TwoPhaseProduction(P_RES[well]))
+
+    assert sorted(productions) == ["A", "B"]
+    np.testing.assert_array_equal(productions["A"].data.q, [252, 516, 768])
+    np.testing.assert_array_equal(productions["A"].data.t, [np.nan, 2, np.nan])
+    assert productions["B"].data.t is None or np.isnan(productions["B"].data.t).all()
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from src import ipr
+from src.future_ipr import OilWell
+from src.ipr import TwoPhaseProduction
+from src.utils import eq, instrument
+
+DATA = [
+    {"q": 252, "p": 1653},
+    {"q": 516, "p": 1507},
+    {"q": 768, "p": 1335},
+]
+
+CLASSES = [ipr.Production, TwoPhaseProduction, OilWell]
+
+
+def class_attributes():
+    return [dict(vars(cls)) for cls in CLASSES]
+
+
+@pytest.fixture
+def instrumented():
+    instrument.reset()
+
+    try:
+        yield
+    finally:
+        instrument.disable()
+        instrument.reset()
+
+
+def test_disable_restores_original_attributes(instrumented):
+    attributes = class_attributes()
+    vogel_equation = eq.vogel_equation
+
+    instrument.enable()
+
+    assert TwoPhaseProduction.calculate_q_max is not attributes[1]["calculate_q_max"]
+    assert eq.vogel_equation is not vogel_equation
+
+    instrument.disable()
+
+    assert eq.vogel_equation is vogel_equation
+
+    for (cls, before, after) in zip(CLASSES, attributes, class_attributes()):
+        assert set(after) == set(before), cls
+        assert all(after[name] is before[name] for name in before), cls
+
+
+def test_only_own_methods_are_wrapped(instrumented):
+    instrument.enable()
+
+    # Inherited methods are wrapped on their base class only
+    assert "get_fetkovich_coefficients" not in vars(TwoPhaseProduction)
+    assert vars(ipr.Production)["get_fetkovich_coefficients"].__wrapped__ is not None
+
+    # Memoization key helpers are not wrapped
+    assert not hasattr(vars(TwoPhaseProduction)["q_max_key"], "__wrapped__")
+    assert not hasattr(vars(OilWell)["pwf_key"], "__wrapped__")
+
+
+def test_calls_are_counted_while_enabled(instrumented):
+    production = TwoPhaseProduction(1734)
+    production.data = DATA
+
+    instrument.enable()
+    production.calculate_q_max("fetkovich", DATA[-1])
+    production.calculate_q_max("vogel", DATA[-1])
+    instrument.disable()
+
+    production.calculate_q_max("vogel", DATA[-1])
+
+    statistics = instrument.snapshot()
+
+    assert statistics["TwoPhaseProduction.calculate_q_max"]["calls"] == 2
+    assert statistics["ipr.Production.get_fetkovich_coefficients"]["calls"] == 1
+    assert statistics["equations.vogel_equation"]["calls"] == 1
+    assert not any(label.endswith("_key") for label in statistics)
+
+    assert json.loads(instrument.dump("json")) == statistics
+    assert instrument.dump().splitlines()[0].split()[0] == "method"
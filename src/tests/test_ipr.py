@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from src.ipr import TwoPhaseProduction, ThreePhaseProduction
+from src.utils import eq, numerical
+
+DATA = [
+    {"q": 252, "p": 1653},
+    {"q": 516, "p": 1507},
+    {"q": 768, "p": 1335},
+]
+
+
+def create_production(p_b=None):
+    production = TwoPhaseProduction(1734, p_b)
+    production.data = DATA
+
+    return production
+
+
+def test_fetkovich_fit_once_per_data(monkeypatch):
+    calls = []
+    power_regression = numerical.power_regression
+
+    def counted(data_x, data_y):
+        calls.append(len(data_x))
+        return power_regression(data_x, data_y)
+
+    monkeypatch.setattr(numerical, "power_regression", counted)
+
+    production = create_production()
+    q_max = production.calculate_q_max("fetkovich", DATA[-1])
+    production.get_production_graph("fetkovich", q_max, 50)
+
+    assert calls == [3]
+
+    production.p_res = 1800
+    production.get_fetkovich_coefficients()
+
+    assert calls == [3, 3]
+
+
+def test_fetkovich_fit_follows_data_changes():
+    production = create_production()
+    before = production.get_fetkovich_coefficients()
+
+    production.data[2] = {"q": 700, "p": 1335}
+    after = production.get_fetkovich_coefficients()
+
+    expected = TwoPhaseProduction(1734)
+    expected.data = DATA[:2] + [{"q": 700, "p": 1335}]
+
+    assert after != before
+    assert after == pytest.approx(expected.get_fetkovich_coefficients())
+
+
+@pytest.mark.parametrize("tolerance", [None, 1.0])
+def test_production_graph_reports_invalid_method(tolerance, capsys):
+    production = create_production()
+
+    assert production.get_production_graph("linear", 1000, 10, tolerance) is None
+    assert "does not exist" in capsys.readouterr().out
+
+    assert production.get_production_graph("composite", 1000, 10, tolerance) is None
+    assert "p_b" in capsys.readouterr().out
+
+    assert ThreePhaseProduction(1734, 0.3).get_production_graph("gas", 1000, 10, tolerance) is None
+    assert "Phase" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("method", ["vogel", "fetkovich", "composite"])
+def test_adaptive_production_graph_follows_curve(method):
+    production = create_production(1500)
+    q_max = production.calculate_q_max(method, DATA[-1])
+
+    fixed = production.get_production_graph(method, q_max, 200)
+    adaptive = production.get_production_graph(method, q_max, 4, 1.0)
+
+    assert adaptive[0]["p"] == pytest.approx(14.7)
+    assert adaptive[-1]["p"] == pytest.approx(1734)
+
+    # Measured data (and bubble point) stays on the curve, as with fixed intervals
+    points = {x["p"] for x in DATA} | ({1500} if method == "composite" else set())
+    assert points <= {x["p"] for x in adaptive}
+
+    # Linear interpolation of adaptive points stays within tolerance (and rounding)
+    p = [x["p"] for x in fixed]
+    q = np.interp(p, [x["p"] for x in adaptive], [x["q"] for x in adaptive])
+    np.testing.assert_allclose(q, [x["q"] for x in fixed], atol=1.0 + 0.01)
+
+
+@pytest.mark.parametrize("method", ["vogel", "fetkovich"])
+def test_pwf_inverse_of_q_max(method):
+    production = create_production()
+    q_max = production.calculate_q_max(method, DATA[-1])
+
+    assert production.calculate_pwf(method, DATA[-1]["q"], q_max) == pytest.approx(DATA[-1]["p"])
+
+
+def test_composite_pwf_inverse_of_q_max():
+    production = create_production(1500)
+    q_max = production.calculate_q_max("composite", DATA[-1])
+
+    for data in DATA:
+        q = q_max * eq.composite_equation(data["p"], 1734, 1500)
+        assert production.calculate_pwf("composite", q, q_max) == pytest.approx(data["p"])
+
+
+def test_pwf_of_rate_ratio_function():
+    production = create_production()
+    q_max = production.calculate_q_max("vogel", DATA[-1])
+
+    p_wf = production.calculate_pwf(lambda pr: eq.vogel_equation_array(pr, 1), DATA[-1]["q"], q_max)
+
+    assert p_wf == pytest.approx(DATA[-1]["p"])
+
+
+@pytest.mark.parametrize("phase", ["oil", "water"])
+def test_three_phase_pwf_of_rate_ratio_function(phase):
+    production = ThreePhaseProduction(1734, 0.3)
+    wiggin = lambda pr: eq.wiggin_equation_array(phase, pr, 1)
+
+    expected = production.calculate_pwf(phase, 500, 1200)
+
+    assert expected == pytest.approx(production.calculate_pwf(phase, 500, 1200, "wiggin"))
+    assert production.calculate_pwf(phase, 500, 1200, wiggin) == pytest.approx(expected)
+
+
+def test_pwf_reports_invalid_method(capsys):
+    assert create_production().calculate_pwf("linear", 500, 1200) is None
+    assert "does not exist" in capsys.readouterr().out
+
+    assert create_production().calculate_pwf("composite", 500, 1200) is None
+    assert "p_b" in capsys.readouterr().out
+
+    assert ThreePhaseProduction(1734, 0.3).calculate_pwf("oil", 500, 1200, "vogel") is None
+    assert "does not exist" in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import io
+import logging
+
+from src.utils import log
+
+
+def test_enable_debug_replaces_handler():
+    (first, second) = (io.StringIO(), io.StringIO())
+
+    try:
+        log.enable_debug(first)
+        log.enable_debug(second)
+        log.enable_debug(second)
+
+        log.logger.debug("message")
+
+        assert first.getvalue() == ""
+        assert second.getvalue() == "ipyr DEBUG: message\n"
+    finally:
+        log.disable_debug()
+
+    log.logger.debug("message")
+    assert second.getvalue() == "ipyr DEBUG: message\n"
+
+
+def test_disable_debug_keeps_other_handlers():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handlers = list(log.logger.handlers)
+
+    log.logger.addHandler(handler)
+
+    try:
+        log.enable_debug(io.StringIO())
+        log.disable_debug()
+
+        assert log.logger.handlers == handlers + [handler]
+
+        log.logger.warning("message")
+        assert stream.getvalue() == "message\n"
+    finally:
+        log.logger.removeHandler(handler)
@@ -0,0 +1,75 @@
+import pytest
+
+from src.ipr import TwoPhaseProduction
+from src.utils import memo
+
+DATA = [
+    {"q": 252, "p": 1653},
+    {"q": 516, "p": 1507},
+    {"q": 768, "p": 1335},
+]
+
+
+@pytest.fixture
+def cache():
+    try:
+        yield memo.enable_memoization(maxsize=2)
+    finally:
+        memo.disable_memoization()
+
+
+def create_production():
+    production = TwoPhaseProduction(1734)
+    production.data = DATA
+
+    return production
+
+
+def test_lru_evicts_least_recently_used():
+    cache = memo.LRUCache(2)
+
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.lookup("a") == (True, 1)
+
+    cache.store("c", 3)
+
+    assert cache.lookup("b") == (False, None)
+    assert cache.lookup("a") == (True, 1)
+    assert cache.statistics()["evictions"] == 1
+
+    with pytest.raises(ValueError):
+        memo.LRUCache(0)
+
+
+def test_repeated_q_max_hits_cache(cache):
+    production = create_production()
+
+    first = production.calculate_q_max("vogel", DATA[-1])
+    assert production.calculate_q_max("vogel", DATA[-1]) == first
+
+    statistics = memo.get_statistics()
+    assert (statistics["hits"], statistics["misses"], statistics["size"]) == (1, 1, 1)
+
+    # Failed calculations are not kept
+    assert production.calculate_q_max("linear", DATA[-1]) is None
+    assert memo.get_statistics()["size"] == 1
+
+
+def test_memoized_q_max_follows_data(cache):
+    production = create_production()
+    before = production.calculate_q_max("fetkovich", DATA[-1])
+
+    production.data[0] = {"q": 200, "p": 1653}
+    after = production.calculate_q_max("fetkovich", DATA[-1])
+
+    expected = TwoPhaseProduction(1734)
+    expected.data = [{"q": 200, "p": 1653}] + DATA[1:]
+
+    assert after != before
+    assert after == pytest.approx(expected.calculate_q_max("fetkovich", DATA[-1]))
+
+
+def test_disabled_memoization():
+    assert memo.get_statistics() is None
+    assert create_production().calculate_q_max("vogel", DATA[-1]) is not None
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src import monte_carlo as mc
+from src.ipr import TwoPhaseProduction
+from src.utils import err
+
+WELL = {"p_res": 1734, "q": 768, "p": 1335}
+
+
+def test_constant_inputs_match_two_phase_production():
+    result = mc.simulate_well(WELL, "standing", 100, seed=0)
+
+    production = TwoPhaseProduction(1734)
+    expected = production.calculate_q_max("vogel", {"q": 768, "p": 1335})
+
+    assert result["q_max"]["P50"] == pytest.approx(expected)
+    assert result["q_max"]["valid"] == 100
+
+
+def test_liquid_rate_with_water_cut():
+    oil = mc.simulate_well(WELL, "standing", 100, seed=0)
+    liquid = mc.simulate_well(
+        {"p_res": 1734, "liquid_rate": 768 / 0.7, "water_cut": 0.3, "p": 1335}, "standing", 100, seed=0
+    )
+
+    for name in ("q_max", "future_q", "future_q_max"):
+        assert liquid[name]["P50"] == pytest.approx(oil[name]["P50"])
+
+    # Water cut does not change q given as oil rate
+    with_water_cut = mc.simulate_well(dict(WELL, water_cut=0.3), "standing", 100, seed=0)
+    assert with_water_cut["q_max"]["P50"] == pytest.approx(oil["q_max"]["P50"])
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        mc.simulate_well({"p_res": 1734, "p": 1335}, "standing", 10)
+
+    with pytest.raises(ValueError):
+        mc.simulate_well(dict(WELL, liquid_rate=1000), "standing", 10)
+
+    with pytest.raises(ValueError):
+        mc.simulate_well(dict(WELL, skin=2), "standing", 10)
+
+    with pytest.raises(err.MethodNotExistExecption):
+        mc.simulate_well(WELL, "vogel", 10)
+
+
+@pytest.mark.parametrize("method", mc.MONTE_CARLO_METHODS)
+def test_infeasible_samples_are_masked(method):
+    well = dict(WELL, p_res=("uniform", 1200, 1800), production_change=0.1)
+    result = mc.simulate_well(well, method, 10000, seed=1, chunk_size=3000, return_samples=True)
+
+    values = result["values"]
+    p_res = mc.draw(np.random.default_rng(1), well["p_res"], 3000)
+    infeasible = p_res <= 1335
+
+    assert np.isfinite(values["q_max"][:3000][~infeasible]).all()
+
+    for name in ("q_max", "future_q", "future_q_max"):
+        assert np.isnan(values[name][:3000][infeasible]).all()
+        assert result[name]["valid"] == np.isfinite(values[name]).sum()
+
+
+def test_seeded_results_are_reproducible():
+    well = dict(WELL, p_res=("normal", 1734, 50), q=("uniform", 700, 800))
+
+    first = mc.simulate_well(well, "fetkovich", 5000, seed=7, chunk_size=1000)
+    second = mc.simulate_well(well, "fetkovich", 5000, seed=7, chunk_size=1000)
+
+    assert first == second
+
+    results = mc.simulate_wells([well, WELL], "standing", 1000, seed=7)
+    assert results[1]["q_max"]["P50"] == pytest.approx(mc.simulate_well(WELL, "standing", 10)["q_max"]["P50"])
+
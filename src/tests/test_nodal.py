@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.fleet import WellFleet
+from src.nodal import GradientVLP, TabulatedVLP, find_operating_points
+from src.utils import eq
+
+P_RES = np.array([1734.0, 2500.0, 3000.0])
+
+
+def create_fleet(method="vogel"):
+    # Two tests of each well, Fetkovich needs at least two
+    return WellFleet(
+        P_RES, [516.0, 768.0, 550.0, 700.0, 400.0, 650.0], [1507.0, 1335.0, 2000.0, 1800.0, 2500.0, 2100.0],
+        method, well=[0, 0, 1, 1, 2, 2]
+    )
+
+
+def test_constant_outflow_pressure():
+    fleet = create_fleet()
+    q_max = fleet.calculate_q_max()["q_max"]
+
+    # Outflow needs 1000 psia at any rate
+    result = find_operating_points(fleet, GradientVLP(200.0, 2000.0, 0.4))
+
+    assert result["solved"].all()
+    np.testing.assert_allclose(result["p_wf"], 1000.0, atol=1e-6)
+    np.testing.assert_allclose(result["q"], q_max * eq.vogel_equation_array(1000.0, P_RES), rtol=1e-8)
+
+
+@pytest.mark.parametrize("method", ["vogel", "fetkovich"])
+def test_operating_point_on_both_curves(method):
+    fleet = create_fleet(method)
+    vlp = TabulatedVLP([0.0, 500.0, 1000.0, 2000.0], [800.0, 1100.0, 1500.0, 2600.0])
+
+    result = find_operating_points(fleet, vlp)
+
+    assert result["solved"].all()
+    np.testing.assert_allclose(result["p_wf"], vlp.calculate_pwf(result["q"]), atol=1e-5)
+    np.testing.assert_allclose(result["p_wf"], fleet.calculate_pwf(result["q"])["p_wf"], rtol=1e-6)
+
+
+def test_well_that_cannot_flow():
+    # Outflow needs more than p_res of the first well at any rate
+    result = find_operating_points(create_fleet(), GradientVLP(1000.0, 2000.0, 0.4))
+
+    assert result["solved"].tolist() == [False, True, True]
+    assert np.isnan(result["q"][0]) and np.isnan(result["p_wf"][0])
@@ -0,0 +1,199 @@
+import numpy as np
+import pytest
+
+from src.utils import numerical
+
+P_RES = 3000.0
+
+
+def fetkovich_tests(C, n, p):
+    """
+    Exact Fetkovich tests q = C (p_res^2 - p^2)^n
+    as power regression data (x = q, y = p_res^2 - p^2)
+    """
+
+    y = P_RES**2 - np.asarray(p, dtype=np.float64)**2
+
+    return (C * y**n, y)
+
+
+def test_accumulator_matches_polyfit():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 10, 50)
+    y = 3 + 2 * x + rng.normal(0, 0.1, 50)
+
+    (b0, b1) = numerical.RegressionAccumulator().add_many(x, y).coefficients()
+
+    np.testing.assert_allclose((b1, b0), np.polyfit(x, y, 1))
+
+
+def test_accumulator_add_remove_and_merge():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(1, 10, 20)
+    y = rng.uniform(1, 10, 20)
+
+    whole = numerical.RegressionAccumulator(log_space=True).add_many(x, y)
+
+    merged = (
+        numerical.RegressionAccumulator(log_space=True).add_many(x[:7], y[:7])
+        + numerical.RegressionAccumulator(log_space=True).add_many(x[7:], y[7:])
+    )
+    np.testing.assert_allclose(merged.power_coefficients(), whole.power_coefficients())
+
+    partial = numerical.RegressionAccumulator(log_space=True).add_many(x[:19], y[:19])
+    whole.remove(x[19], y[19])
+    np.testing.assert_allclose(whole.power_coefficients(), partial.power_coefficients())
+
+    with pytest.raises(ValueError):
+        numerical.RegressionAccumulator().merge(numerical.RegressionAccumulator(log_space=True))
+
+
+def test_power_regression_recovers_fetkovich_coefficients():
+    (q, y) = fetkovich_tests(2e-3, 0.8, [1000, 1500, 2000, 2500])
+
+    (C, n) = numerical.power_regression(q, y)
+
+    # y = C x^(1 / n), i.e. p_res^2 - p^2 = C q^(1 / n)
+    assert C == pytest.approx(2e-3 ** (-1 / 0.8), rel=1e-8)
+    assert n == pytest.approx(0.8, rel=1e-10)
+
+
+def test_power_regression_of_non_positive_data():
+    # Test pressure above p_res, i.e. p_res^2 - p^2 < 0
+    with pytest.raises(ValueError):
+        numerical.power_regression([252, 516], [1e5, -1e5])
+
+    with pytest.raises(ValueError):
+        numerical.power_regression([0, 516], [1e5, 2e5])
+
+    with pytest.raises(ValueError):
+        numerical.RegressionAccumulator(log_space=True).add(516, -1e5)
+
+
+def test_grouped_regression_matches_single_groups():
+    rng = np.random.default_rng(2)
+    groups = np.repeat(np.arange(4), 5)
+    x = rng.uniform(10, 1000, groups.size)
+    y = rng.uniform(1e5, 1e7, groups.size)
+
+    (C, n) = numerical.grouped_power_regression(x, y, groups, 5)
+
+    for group in range(4):
+        mask = groups == group
+        np.testing.assert_allclose((C[group], n[group]), numerical.power_regression(x[mask], y[mask]))
+
+    # Group without points
+    assert np.isnan(C[4]) and np.isnan(n[4])
+
+
+def test_adaptive_sample_within_tolerance():
+    function = lambda x: 1 - 0.2 * x - 0.8 * x * x
+
+    (x, y) = numerical.adaptive_sample(function, 0.0, 1.0, 1e-3)
+
+    assert x[0] == 0.0 and x[-1] == 1.0
+    assert np.all(np.diff(x) > 0)
+
+    middle = (x[:-1] + x[1:]) / 2
+    assert np.max(np.abs(function(middle) - (y[:-1] + y[1:]) / 2)) <= 1e-3
+
+
+def test_adaptive_sample_keeps_points():
+    function = lambda x: x * x
+
+    (x, y) = numerical.adaptive_sample(function, 0.0, 1.0, 1e-2, points=[0.123, 0.5, 2.0])
+
+    assert 0.123 in x and 2.0 not in x
+    assert np.all(np.diff(x) > 0)
+    np.testing.assert_allclose(y, function(x))
+
+    with pytest.raises(ValueError):
+        numerical.adaptive_sample(function, 0.0, 1.0, 0.0)
+
+
+def test_solve_monotone():
+    target = np.array([0.0, 0.5, 2.0, 8.0])
+    (x, converged) = numerical.solve_monotone(lambda x: x**3, target, 0.0, 2.0, tolerance=1e-12)
+
+    np.testing.assert_allclose(x[converged] ** 3, target[converged], atol=1e-9)
+    assert converged.tolist() == [True, True, True, True]
+
+    # No sign change in bracket
+    (x, converged) = numerical.solve_monotone(lambda x: x**3, 9.0, 0.0, 2.0)
+    assert not converged
+
+
+def test_solve_monotone_roots_at_bracket_ends():
+    # Residual at the upper end is within tolerance but not zero
+    function = lambda x: 1 - x + 1e-12
+
+    (x, converged) = numerical.solve_monotone(function, 0.0, 0.0, 1.0, tolerance=1e-10)
+    assert converged and x == 1.0
+
+    (x, converged) = numerical.solve_monotone(function, 1.0, 0.0, 1.0, tolerance=1e-10)
+    assert converged and x == 0.0
+
+
+def test_weighted_regression_ignores_zero_weight():
+    (q, y) = fetkovich_tests(2e-3, 0.8, [1000, 1500, 2000, 2500])
+    q = np.append(q, 10 * q[0])
+    y = np.append(y, y[0] / 3)
+
+    weights = np.array([1, 1, 1, 1, 0], dtype=np.float64)
+    (C, n) = numerical.grouped_power_regression(q, y, np.zeros(q.size, dtype=np.intp), 1, weights)
+
+    assert n[0] == pytest.approx(0.8, rel=1e-8)
+
+
+@pytest.mark.parametrize("loss", ["huber", "tukey"])
+def test_robust_regression_with_outlier(loss):
+    (q, y) = fetkovich_tests(2e-3, 0.8, [800, 1200, 1600, 2000, 2400, 2700])
+
+    # Test with a badly measured rate
+    q[2] *= 3
+
+    (C, n) = numerical.robust_power_regression(q, y, loss=loss)
+    (C_ls, n_ls) = numerical.power_regression(q, y)
+
+    assert abs(n - 0.8) < abs(n_ls - 0.8)
+    assert n == pytest.approx(0.8, rel=0.05 if loss == "huber" else 1e-6)
+
+
+def test_robust_regression_single_test_wells():
+    (q, y) = fetkovich_tests(2e-3, 0.8, [1500, 2000, 1000])
+    groups = np.array([0, 0, 1])
+
+    (C, n, weights) = numerical.robust_grouped_power_regression(q, y, groups, 2, single_n=1.0)
+
+    assert n[0] == pytest.approx(0.8, rel=1e-6)
+    assert n[1] == 1.0
+    assert C[1] * q[2] ** (1 / n[1]) == pytest.approx(y[2])
+
+
+def test_theil_sen_pair_budget(monkeypatch):
+    rng = np.random.default_rng(3)
+
+    # Well with 2000 tests (~2M pairs) and well with 10 tests (45 pairs)
+    groups = np.repeat([0, 1], [2000, 10])
+    x = rng.uniform(0, 10, groups.size)
+    y = 1 + 2 * x + rng.normal(0, 0.01, groups.size)
+    y[:200] += 50
+
+    sizes = []
+    grouped_median = numerical.grouped_median
+
+    def counted(values, groups, n_groups):
+        sizes.append(np.size(values))
+        return grouped_median(values, groups, n_groups)
+
+    monkeypatch.setattr(numerical, "grouped_median", counted)
+
+    (b0, b1) = numerical.grouped_theil_sen(x, y, groups, 2, max_pairs=500)
+
+    # Slopes of 500 sampled pairs and all 45 pairs
+    assert sizes[0] <= 500 + 45
+    np.testing.assert_allclose(b1, 2, rtol=0.01)
+    np.testing.assert_allclose(b0, 1, atol=0.1)
+
+    # Seeded sampling gives the same line
+    np.testing.assert_array_equal(numerical.grouped_theil_sen(x, y, groups, 2, max_pairs=500), (b0, b1))
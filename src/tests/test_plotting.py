@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from src import plotting
+
+
+@pytest.fixture
+def matplotlib(monkeypatch, tmp_path):
+    """
+    Fake matplotlib package recording its backends,
+    pyplot is not imported yet
+    """
+
+    (tmp_path / "pyplot.py").write_text("")
+
+    module = types.ModuleType("matplotlib")
+    module.__path__ = [str(tmp_path)]
+    module.backends = []
+    module.use = module.backends.append
+
+    monkeypatch.setitem(sys.modules, "matplotlib", module)
+
+    # Drop matplotlib.pyplot imported by a test once it ends
+    monkeypatch.setitem(sys.modules, "matplotlib.pyplot", None)
+    monkeypatch.delitem(sys.modules, "matplotlib.pyplot")
+
+    monkeypatch.setattr(plotting, "pyplot", None)
+    monkeypatch.delenv("MPLBACKEND", raising=False)
+
+    return module
+
+
+def test_calculation_modules_do_not_import_matplotlib():
+    code = "import sys, src, src.plotting; print(sorted(x for x in sys.modules if x.startswith('matplotlib')))"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, stdout=subprocess.PIPE, check=True).stdout
+
+    assert output.decode().strip() == "[]"
+
+
+def test_default_backend_on_first_use(matplotlib):
+    pyplot = plotting.get_pyplot()
+
+    assert pyplot is sys.modules["matplotlib.pyplot"]
+    assert matplotlib.backends == [plotting.DEFAULT_BACKEND]
+
+    # Imported once
+    assert plotting.get_pyplot() is pyplot
+    assert matplotlib.backends == [plotting.DEFAULT_BACKEND]
+
+
+def test_explicit_backend(matplotlib):
+    plotting.get_pyplot("svg")
+
+    assert matplotlib.backends == ["svg"]
+
+
+def test_backend_of_environment(matplotlib, monkeypatch):
+    monkeypatch.setenv("MPLBACKEND", "pdf")
+    plotting.get_pyplot()
+
+    # Left to matplotlib
+    assert matplotlib.backends == []
+
+
+def test_pyplot_imported_before_keeps_its_backend(matplotlib, monkeypatch):
+    pyplot = types.ModuleType("matplotlib.pyplot")
+    monkeypatch.setitem(sys.modules, "matplotlib.pyplot", pyplot)
+    matplotlib.pyplot = pyplot
+
+    assert plotting.get_pyplot() is pyplot
+    assert matplotlib.backends == []
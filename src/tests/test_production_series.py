@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.utils.production_series import ProductionSeries
+
+DATA = [
+    {"q": 252, "p": 1653},
+    {"q": 516, "p": 1507},
+    {"q": 768, "p": 1335},
+]
+
+
+def test_rows_and_columns():
+    series = ProductionSeries(DATA)
+
+    assert len(series) == 3
+    assert series.to_list() == [{"q": float(x["q"]), "p": float(x["p"])} for x in DATA]
+    np.testing.assert_array_equal(series.q, [252, 516, 768])
+    assert series.t is None
+
+    assert series[-1] == {"q": 768.0, "p": 1335.0}
+    np.testing.assert_array_equal(series[1:].p, [1507, 1335])
+
+
+def test_columns_are_read_only():
+    series = ProductionSeries(DATA)
+
+    with pytest.raises(ValueError):
+        series.q[0] = 1
+
+    with pytest.raises(ValueError):
+        series.p[:] = 0
+
+    np.testing.assert_array_equal(series.q, [252, 516, 768])
+
+
+def test_modifications_bump_version():
+    series = ProductionSeries(DATA)
+    versions = [series.version]
+
+    series.append({"q": 900, "p": 1100})
+    versions.append(series.version)
+
+    series[0] = {"q": 250, "p": 1653}
+    versions.append(series.version)
+
+    series.extend_arrays([1000], [900])
+    versions.append(series.version)
+
+    series.pop(1)
+    versions.append(series.version)
+
+    assert versions == sorted(set(versions))
+    np.testing.assert_array_equal(series.q, [250, 768, 900, 1000])
+
+
+def test_timestamps_are_filled_with_nan():
+    series = ProductionSeries(DATA)
+    series.append({"q": 900, "p": 1100, "t": 5})
+    series.extend_arrays([1000], [900])
+
+    np.testing.assert_array_equal(series.t, [np.nan, np.nan, np.nan, 5, np.nan])
+
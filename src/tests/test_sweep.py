@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src import monte_carlo as mc
+from src.sweep import sweep
+
+
+def test_sweep_matches_evaluate():
+    result = sweep(
+        {"p_res": [1500, 1734, 2000], "method": ["standing", "fetkovich"]},
+        {"q": 768, "p": 1335, "production_change": 0.1},
+        chunk_size=4,
+    )
+
+    assert result.shape == (3, 2)
+
+    for method in ("standing", "fetkovich"):
+        expected = mc.evaluate(method, mc.get_specs({
+            "p_res": np.array([1500.0, 1734.0, 2000.0]), "q": 768, "p": 1335, "production_change": 0.1,
+        }))
+
+        np.testing.assert_allclose(result.sel(method=method)["q_max"], expected["q_max"])
+        np.testing.assert_allclose(result.sel(method=method)["future_q_max"], expected["future_q_max"])
+
+
+def test_sweep_with_liquid_rate():
+    oil = sweep({"p_res": [1734, 2000]}, {"q": 768, "p": 1335})
+    liquid = sweep({"water_cut": [0.3]}, {"liquid_rate": 768 / 0.7, "p": 1335, "p_res": 1734})
+
+    assert liquid["q_max"][0] == pytest.approx(oil["q_max"][0])
+
+    with pytest.raises(ValueError):
+        sweep({"p_res": [1734]}, {"p": 1335})
+
+    with pytest.raises(ValueError):
+        sweep({"p_res": [1734]}, {"q": 768, "p": 1335, "p_res": 2000})
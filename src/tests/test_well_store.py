@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.well_store import WellStore
+
+ROWS = [
+    {"well": "A", "q": 252.0, "p": 1653.0},
+    {"well": "B", "q": 300.0, "p": 2300.0},
+    {"well": "A", "q": 516.0, "p": 1507.0, "t": 2.0},
+    {"well": "B", "q": 550.0, "p": 2000.0},
+    {"well": "A", "q": 768.0, "p": 1335.0},
+]
+
+
+def test_well_store_refits_changed_wells_only(tmp_path):
+    path = str(tmp_path / "wells.sqlite")
+
+    with WellStore(path) as store:
+        store.put_wells(["A", "B"], [1734.0, 2500.0], "fetkovich")
+        store.add_tests([x["well"] for x in ROWS], [x["q"] for x in ROWS], [x["p"] for x in ROWS])
+
+        assert store.update_fits() == 2
+        assert store.update_fits() == 0
+
+        store.add_tests(["B"], [650.0], [1800.0])
+        assert store.update_fits() == 1
+
+    with WellStore(path) as store:
+        assert store.update_fits() == 0
+
+        fits = store.load_fits()
+        (C, n) = store.load_fleet().get_fetkovich_coefficients()
+
+        np.testing.assert_allclose(fits["n"], n)
+        np.testing.assert_allclose(fits["C"], C)
+
+        # Changed well properties also need a refit
+        store.put_wells(["A"], [1800.0], "fetkovich")
+        assert store.update_fits() == 1
+        assert store.update_fits(force=True) == 2
@@ -5,3 +5,18 @@ from . import errors as err
 from . import equations as eq
 from . import numericals as numerical
 
+from . import production_series as ps
+from . import fit_cache as fc
+
+from . import memo
+from . import logger as log
+from . import instrumentation as instrument
+
+instrument.register_functions(eq, [
+    name for (name, value) in vars(eq).items()
+    if callable(value) and getattr(value, "__module__", None) == eq.__name__ and name != "is_scalar"
+], "equations")
+instrument.register_functions(numerical, [
+    "power_regression", "linear_regression", "grouped_power_regression",
+    "robust_grouped_power_regression",
+], "numericals")
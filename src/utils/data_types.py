@@ -1,5 +1,7 @@
 from typing import Union, List, Dict
 
+import numpy as np
+
 # Defining data types constant
 ## Generic data types
 NUMERIC = Union[int, float]
@@ -8,6 +10,11 @@ FLOAT = float
 STRING = str
 BOOLEAN = bool
 
+## Array data types
+ARRAY = np.ndarray
+NUMERIC_ARRAY = Union[NUMERIC, ARRAY]
+STRING_ARRAY = Union[STRING, ARRAY]
+
 ## Optional data types
 OPTIONAL_NUMERIC = Union[NUMERIC, None]
 
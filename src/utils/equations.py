@@ -1,38 +1,86 @@
 from . import data_types as dt
+from . import numericals as numerical
 
 from math import pow, sqrt
 
-def vogel_equation(p: dt.NUMERIC, p_res: dt.NUMERIC) -> dt.NUMERIC:
+import numpy as np
+
+# Lowest flow rate ratio returned by Vogel equation
+MIN_FLOW_RATE_RATIO = 0.00000001
+
+
+def is_scalar(*values) -> dt.BOOLEAN:
+    """
+    Check whether all values are single numbers,
+    so the kernels can keep using the plain math path
+
+    INPUT:
+        values: dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.BOOLEAN
+    """
+    return all(isinstance(x, (int, float, np.number)) for x in values)
+
+
+def vogel_equation(p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY) -> dt.NUMERIC_ARRAY:
     """
     Calculation of flow rate ratio
     Using Vogel Equation
 
     INPUT:
-        p (pressure): dt.NUMERIC
-        p_res (reservoir presure): dt.NUMERIC
+        p (pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir presure): dt.NUMERIC_ARRAY
 
-    OUTPUT: dt.NUMERIC
+    OUTPUT: dt.NUMERIC_ARRAY
     """
+    if (not is_scalar(p, p_res)):
+        return vogel_equation_array(p, p_res)
+
     pr = p / p_res          # pressure ratio
 
     # Vogel equation result
     result = 1 - (0.2 * pr) - (0.8 * pow(pr, 2))
 
-    return result if result > 0 else 0.00000001
+    return result if result > 0 else MIN_FLOW_RATE_RATIO
+
+
+def vogel_equation_array(p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY) -> dt.ARRAY:
+    """
+    Calculation of flow rate ratio
+    Using Vogel Equation for arrays of pressure
+
+    Both inputs are broadcast against each other, e.g.
+    p_res[:, None] (wells) with p[None, :] (pressure points)
+    gives a (wells x pressure points) result
+
+    INPUT:
+        p (pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir presure): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    pr = np.asarray(p, dtype=np.float64) / np.asarray(p_res, dtype=np.float64)
+
+    # Vogel equation result
+    result = 1 - (0.2 * pr) - (0.8 * pr * pr)
+
+    return np.where(result > 0, result, MIN_FLOW_RATE_RATIO)
 
 
-def pressure_ratio_from_vogel_equation(q: dt.NUMERIC, q_max: dt.NUMERIC):
+def pressure_ratio_from_vogel_equation(q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY) -> dt.NUMERIC_ARRAY:
     """
     Calculation of pressure ratio
     Based on re-arrange of Vogel equation
 
     INPUT:
-        p_res (reservoir pressure): dt.NUMERIC
-        q (flow rate): dt.NUMERIC
-        q_max (max flow rate): dt.NUMERIC
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
 
-    OUTPUT: dt.NUMERIC
+    OUTPUT: dt.NUMERIC_ARRAY
     """
+    if (not is_scalar(q, q_max)):
+        return pressure_ratio_from_vogel_equation_array(q, q_max)
+
     # Quadratic equation constants
     a = -0.8
     b = -0.2
@@ -42,27 +90,78 @@ def pressure_ratio_from_vogel_equation(q: dt.NUMERIC, q_max: dt.NUMERIC):
     qr = q / q_max
 
     # Analytical results of pressure ratio
-    result = (-a - sqrt(pow(b, 2) - (4 * a * (c - qr)), 0.5)) / (2 * a)
+    result = (-b - sqrt(pow(b, 2) - (4 * a * (c - qr)))) / (2 * a)
 
     return result
 
 
+def pressure_ratio_from_quadratic_array(
+    a: dt.NUMERIC_ARRAY, b: dt.NUMERIC_ARRAY, qr: dt.ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio for arrays of flow rate ratio
+    Based on re-arrange of quadratic IPR: qr = 1 + b * pr + a * pr^2
+
+    Elements without a physical solution are masked with NaN
+    instead of raising, i.e. negative discriminant, qr < 0, qr > 1
+    (q above q_max) and non-finite ratios. qr = 1 (q = q_max) gives 0
+
+    INPUT:
+        a (quadratic constant): dt.NUMERIC_ARRAY
+        b (linear constant): dt.NUMERIC_ARRAY
+        qr (flow rate ratio): dt.ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    with np.errstate(invalid="ignore"):
+        discriminant = (b * b) - (4 * a * (1 - qr))
+
+        valid = (discriminant >= 0) & (qr >= 0) & (qr <= 1)
+        root = np.sqrt(np.where(valid, discriminant, 0))
+
+        pr = np.where(valid, (-b - root) / (2 * a), np.nan)
+
+    return np.clip(pr, 0, 1)
+
+
+def pressure_ratio_from_vogel_equation_array(q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio for arrays of flow rate
+    Based on re-arrange of Vogel equation
+
+    q and q_max are broadcast against each other,
+    invalid elements are NaN (see pressure_ratio_from_quadratic_array)
+
+    INPUT:
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qr = np.asarray(q, dtype=np.float64) / np.asarray(q_max, dtype=np.float64)
+
+    return pressure_ratio_from_quadratic_array(-0.8, -0.2, qr)
+
+
 def fetkovich_equation(
-    p: dt.NUMERIC, p_res: dt.NUMERIC, C: dt.OPTIONAL_NUMERIC, n: dt.NUMERIC
-) -> dt.NUMERIC:
+    p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, C: dt.OPTIONAL_NUMERIC, n: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
     """
     Calculation of flow rate (q) using Fetkovich equation
     along with Rawlin and Schellhardt method
 
     INPUT
-        p (wellbore pressure): dt.NUMERIC
-        p_res (reservoir_pressure): dt.NUMERIC
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir_pressure): dt.NUMERIC_ARRAY
         C (C coefficient): dt.NUMERIC
-        n (n coefficient): dt.NUMERIC
+        n (n coefficient): dt.NUMERIC_ARRAY
 
     OUTPUT
-        q: dt.NUMERIC
+        q: dt.NUMERIC_ARRAY
     """
+    if (not is_scalar(p, p_res, n)):
+        return fetkovich_equation_array(p, p_res, C, n)
 
     psr = pow(p / p_res, 2)
 
@@ -70,42 +169,245 @@ def fetkovich_equation(
     return result
 
 
+def fetkovich_equation_array(
+    p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, C: dt.OPTIONAL_NUMERIC, n: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of flow rate (q) using Fetkovich equation
+    along with Rawlin and Schellhardt method for arrays of pressure
+
+    p, p_res and n are broadcast against each other,
+    so n may hold one coefficient per well
+
+    INPUT
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir_pressure): dt.NUMERIC_ARRAY
+        C (C coefficient): dt.NUMERIC
+        n (n coefficient): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        q: dt.ARRAY
+    """
+    pr = np.asarray(p, dtype=np.float64) / np.asarray(p_res, dtype=np.float64)
+
+    result = np.power(1 - (pr * pr), np.asarray(n, dtype=np.float64))
+    return result
+
+
 def pressure_ratio_from_fetkovich_equation(
-    q: dt.NUMERIC, q_max: dt.NUMERIC, n: dt.NUMERIC
-) -> dt.NUMERIC:
+    q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, n: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
     """
     Calculation of pressure ratio
-    Based on re-arrange of Vogel equation
+    Based on re-arrange of Fetkovich equation
 
     INPUT:
-        p_res (reservoir pressure): dt.NUMERIC
-        q (flow rate): dt.NUMERIC
-        q_max (max flow rate): dt.NUMERIC
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+        n (n coefficient): dt.NUMERIC_ARRAY
 
-    OUTPUT: dt.NUMERIC
+    OUTPUT: dt.NUMERIC_ARRAY
     """
+    if (not is_scalar(q, q_max, n)):
+        return pressure_ratio_from_fetkovich_equation_array(q, q_max, n)
+
     qr = q / q_max
 
-    pr = sqrt(1 - sqrt(qr, n), 2)
+    pr = sqrt(1 - pow(qr, 1 / n))
 
     return pr
 
 
+def pressure_ratio_from_fetkovich_equation_array(
+    q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, n: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio for arrays of flow rate
+    Based on re-arrange of Fetkovich equation
+
+    q, q_max and n are broadcast against each other.
+    Elements with qr < 0, qr > 1 (q above q_max), n <= 0
+    or non-finite inputs are masked with NaN
+
+    INPUT:
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+        n (n coefficient): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    n = np.asarray(n, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qr = np.asarray(q, dtype=np.float64) / np.asarray(q_max, dtype=np.float64)
+
+        valid = (qr >= 0) & (qr <= 1) & (n > 0) & np.isfinite(n)
+        qr_n = np.power(np.where(valid, qr, 0), 1 / np.where(valid, n, 1))
+
+        pr = np.where(valid, np.sqrt(np.clip(1 - qr_n, 0, 1)), np.nan)
+
+    return pr
+
+
+def composite_equation(
+    p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, p_b: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
+    """
+    Calculation of flow rate ratio (q / q_max)
+    using composite IPR: straight line productivity index (PI)
+    above bubble point pressure and Vogel equation below it
+
+    q = J (p_res - p)                                   p >= p_b
+    q = J (p_res - p_b) + J p_b / 1.8 vogel(p, p_b)     p < p_b
+    q_max = J (p_res - p_b) + J p_b / 1.8
+
+    Bubble point above reservoir pressure gives Vogel equation
+
+    INPUT
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
+        p_b (bubble point pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        qr: dt.NUMERIC_ARRAY
+    """
+    if (not is_scalar(p, p_res, p_b)):
+        return composite_equation_array(p, p_res, p_b)
+
+    p_b = min(p_b, p_res)
+    linear_part = p_res - p_b
+    vogel_part = p_b / 1.8
+
+    if (p >= p_b):
+        q = p_res - p
+    else:
+        pr = p / p_b
+        q = linear_part + vogel_part * (1 - (0.2 * pr) - (0.8 * pow(pr, 2)))
+
+    return q / (linear_part + vogel_part)
+
+
+def composite_equation_array(
+    p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, p_b: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of flow rate ratio (q / q_max)
+    using composite IPR for arrays of pressure
+
+    p, p_res and p_b are broadcast against each other,
+    e.g. p_res[:, None] and p_b[:, None] (wells) with p[None, :]
+
+    INPUT
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
+        p_b (bubble point pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        qr: dt.ARRAY
+    """
+    p = np.asarray(p, dtype=np.float64)
+    p_res = np.asarray(p_res, dtype=np.float64)
+    p_b = np.minimum(np.asarray(p_b, dtype=np.float64), p_res)
+
+    linear_part = p_res - p_b
+    vogel_part = p_b / 1.8
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pr = p / p_b
+        below = linear_part + vogel_part * (1 - (0.2 * pr) - (0.8 * pr * pr))
+
+        q = np.where(p >= p_b, p_res - p, below)
+
+        return q / (linear_part + vogel_part)
+
+
+def pressure_ratio_from_composite_equation(
+    q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, p_b: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
+    """
+    Calculation of pressure ratio (p / p_res)
+    Based on re-arrange of composite IPR
+
+    INPUT:
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
+        p_b (bubble point pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.NUMERIC_ARRAY
+    """
+    if (not is_scalar(q, q_max, p_res, p_b)):
+        return pressure_ratio_from_composite_equation_array(q, q_max, p_res, p_b)
+
+    p_b = min(p_b, p_res)
+    linear_part = p_res - p_b
+    vogel_part = p_b / 1.8
+
+    # Flow rate of the linear part
+    q_linear = q / q_max * (linear_part + vogel_part)
+
+    if (q_linear <= linear_part):
+        return (p_res - q_linear) / p_res
+
+    # Remaining flow rate follows Vogel equation below bubble point
+    pr_b = pressure_ratio_from_vogel_equation(q_linear - linear_part, vogel_part)
+
+    return pr_b * p_b / p_res
+
+
+def pressure_ratio_from_composite_equation_array(
+    q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, p_b: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio (p / p_res) for arrays of flow rate
+    Based on re-arrange of composite IPR
+
+    Elements with q outside [0, q_max] or non-finite inputs are NaN
+
+    INPUT:
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
+        p_b (bubble point pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    p_res = np.asarray(p_res, dtype=np.float64)
+    p_b = np.minimum(np.asarray(p_b, dtype=np.float64), p_res)
+
+    linear_part = p_res - p_b
+    vogel_part = p_b / 1.8
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qr = np.asarray(q, dtype=np.float64) / np.asarray(q_max, dtype=np.float64)
+        q_linear = qr * (linear_part + vogel_part)
+
+        pr_linear = (p_res - q_linear) / p_res
+        pr_vogel = pressure_ratio_from_vogel_equation_array(q_linear - linear_part, vogel_part) * p_b / p_res
+
+        pr = np.where(q_linear <= linear_part, pr_linear, pr_vogel)
+
+        valid = (qr >= 0) & (qr <= 1)
+        return np.where(valid, pr, np.nan)
+
+
 def wiggin_equation(
-        phase: dt.STRING, p: dt.NUMERIC, p_res: dt.NUMERIC
-) -> dt.NUMERIC:
+        phase: dt.STRING_ARRAY, p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
     """
     Calculation of flow rate ratio
     using Wiggin equation according to phase selection
 
     INPUT
-        phase: str
-        p (wellbore pressure): dt.NUMERIC
-        p_res (reservoir pressure): dt.NUMERIC
+        phase: str | str[]
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
 
     OUTPUT
-        qr: dt.NUMERIC
+        qr: dt.NUMERIC_ARRAY
     """
+    if (not isinstance(phase, dt.STRING) or not is_scalar(p, p_res)):
+        return wiggin_equation_array(phase, p, p_res)
 
     # Initiate pressure ratio
     pr = p / p_res
@@ -119,27 +421,289 @@ def wiggin_equation(
     return qr
 
 
-def pressure_ratio_from_wiggin_equation(phase: dt.STRING, q: dt.NUMERIC, q_max: dt.NUMERIC):
+def wiggin_equation_array(
+        phase: dt.STRING_ARRAY, p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of flow rate ratio
+    using Wiggin equation for arrays of pressure
+
+    phase may be a single phase or an array of phases
+    broadcast against p and p_res (e.g. one phase per well).
+    Unknown phases give NaN
+
+    INPUT
+        phase: str | str[]
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (reservoir pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        qr: dt.ARRAY
+    """
+
+    # Initiate pressure ratio
+    pr = np.asarray(p, dtype=np.float64) / np.asarray(p_res, dtype=np.float64)
+
+    # Phase switch of equation constants
+    phase = np.asarray(phase)
+    is_oil = phase == "oil"
+    is_water = phase == "water"
+
+    a = np.where(is_oil, 0.48, np.where(is_water, 0.28, np.nan))
+    b = np.where(is_oil, 0.52, np.where(is_water, 0.72, np.nan))
+
+    # calculation of flow rate ratio
+    qr = 1 - (b * pr) - (a * pr * pr)
+
+    return qr
+
+
+def pressure_ratio_from_wiggin_equation(
+    phase: dt.STRING_ARRAY, q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY
+) -> dt.NUMERIC_ARRAY:
     """
     Calculation of pressure ratio (wellbore pressure)
     Based on re-arrange of Wiggin equation
 
     INPUT:
-        p_res (reservoir pressure): dt.NUMERIC
-        q (flow rate): dt.NUMERIC
-        q_max (max flow rate): dt.NUMERIC
+        phase: str | str[]
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
 
-    OUTPUT: dt.NUMERIC
+    OUTPUT: dt.NUMERIC_ARRAY
     """
+    if (not isinstance(phase, dt.STRING) or not is_scalar(q, q_max)):
+        return pressure_ratio_from_wiggin_equation_array(phase, q, q_max)
+
     # Quadratic equation constants
     a = -0.48 if phase == "oil" else -0.28
-    b = -0.52 if phase == "water" else -0.72
+    b = -0.52 if phase == "oil" else -0.72
     c = 1
 
     # Flow rate ratio
     qr = q / q_max
 
     # Analytical results of pressure ratio
-    pr = (-a - sqrt(pow(b, 2) - (4 * a * (c - qr)), 0.5)) / (2 * a)
+    pr = (-b - sqrt(pow(b, 2) - (4 * a * (c - qr)))) / (2 * a)
 
     return pr
+
+
+def pressure_ratio_from_wiggin_equation_array(
+    phase: dt.STRING_ARRAY, q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio (wellbore pressure) for arrays of flow rate
+    Based on re-arrange of Wiggin equation
+
+    phase, q and q_max are broadcast against each other,
+    invalid elements and unknown phases are NaN
+    (see pressure_ratio_from_quadratic_array)
+
+    INPUT:
+        phase: str | str[]
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+
+    OUTPUT: dt.ARRAY
+    """
+    # Quadratic equation constants
+    phase = np.asarray(phase)
+    is_oil = phase == "oil"
+    is_water = phase == "water"
+
+    a = np.where(is_oil, -0.48, np.where(is_water, -0.28, np.nan))
+    b = np.where(is_oil, -0.52, np.where(is_water, -0.72, np.nan))
+
+    # Flow rate ratio
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qr = np.asarray(q, dtype=np.float64) / np.asarray(q_max, dtype=np.float64)
+
+    return pressure_ratio_from_quadratic_array(a, b, qr)
+
+
+def pressure_ratio_from_rate_ratio_function(
+    rate_ratio, q: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, derivative=None,
+    tolerance: dt.NUMERIC = 1e-10, max_iterations: dt.INT = 100
+) -> dt.ARRAY:
+    """
+    Calculation of pressure ratio of any IPR
+    by numerical inversion of its flow rate ratio
+
+    rate_ratio must decrease monotonically from 1 at pr = 0
+    to 0 at pr = 1, e.g. lambda pr: vogel_equation_array(pr, 1).
+    Parameters varying per element (like n of each well)
+    are bound in rate_ratio with shapes broadcast against q
+
+    INPUT:
+        rate_ratio (qr from pressure ratio): callable(pr[]) -> qr[]
+        q (flow rate): dt.NUMERIC_ARRAY
+        q_max (max flow rate): dt.NUMERIC_ARRAY
+        derivative (d qr / d pr): callable(pr[]) -> numeric[]
+            DEFAULT: None (finite difference)
+        tolerance: dt.NUMERIC
+            DEFAULT: 1e-10
+        max_iterations: dt.INT
+            DEFAULT: 100
+
+    OUTPUT: dt.ARRAY, NaN where q is outside [0, q_max]
+        or the solver did not converge
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        qr = np.asarray(q, dtype=np.float64) / np.asarray(q_max, dtype=np.float64)
+
+    valid = (qr >= 0) & (qr <= 1)
+
+    # Rate ratios at or below the (clamped) end of the IPR are reached at pr = 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        at_end = valid & (qr <= np.asarray(rate_ratio(np.ones_like(qr)), dtype=np.float64))
+
+    (pr, converged) = numerical.solve_monotone(
+        rate_ratio, np.where(valid & ~at_end, qr, np.nan), 0.0, 1.0,
+        derivative, tolerance, max_iterations
+    )
+
+    return np.where(at_end, 1.0, np.where(valid & converged, pr, np.nan))
+
+
+def standing_future_rate_array(
+    q: dt.NUMERIC_ARRAY, p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, future_p_res: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of future flow rate at the same wellbore pressure
+    using Standing method (present PI scaled by squared pressure ratio)
+
+    j_p = 1.8 q_max / p_res / ((1 + 0.8 p / p_res) / 1.8)
+    j_f = j_p (future_p_res / p_res)^2
+    q_f = j_f future_p_res / 1.8 vogel(p, future_p_res)
+
+    Elements with p at or above future_p_res are NaN
+
+    INPUT
+        q (present flow rate): dt.NUMERIC_ARRAY
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (present reservoir pressure): dt.NUMERIC_ARRAY
+        future_p_res (future reservoir pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        q_f: dt.ARRAY
+    """
+    q = np.asarray(q, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    p_res = np.asarray(p_res, dtype=np.float64)
+    future_p_res = np.asarray(future_p_res, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q_max = q / vogel_equation_array(p, p_res)
+
+        j_p = (1.8 * q_max / p_res) / ((1 + 0.8 * (p / p_res)) / 1.8)
+        j_f = j_p * (future_p_res / p_res) ** 2
+
+        q_f = (j_f * future_p_res / 1.8) * vogel_equation_array(p, future_p_res)
+
+    return np.where(p < future_p_res, q_f, np.nan)
+
+
+def eckmeir_future_rate_array(
+    q: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY, future_p_res: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of future flow rate (or future q_max from present q_max)
+    using Eckmeir method
+
+    q_f = (future_p_res / p_res)^3 q
+
+    INPUT
+        q (present flow rate): dt.NUMERIC_ARRAY
+        p_res (present reservoir pressure): dt.NUMERIC_ARRAY
+        future_p_res (future reservoir pressure): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        q_f: dt.ARRAY
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pr = np.asarray(future_p_res, dtype=np.float64) / np.asarray(p_res, dtype=np.float64)
+
+        return pr ** 3 * np.asarray(q, dtype=np.float64)
+
+
+def fetkovich_future_rate_array(
+    q: dt.NUMERIC_ARRAY, p: dt.NUMERIC_ARRAY, p_res: dt.NUMERIC_ARRAY,
+    future_p_res: dt.NUMERIC_ARRAY, n: dt.NUMERIC_ARRAY
+) -> dt.ARRAY:
+    """
+    Calculation of future flow rate at the same wellbore pressure
+    using Fetkovich method (present PI scaled by pressure ratio)
+
+    j_p = q / (p_res^2 - p^2)^n
+    j_f = j_p future_p_res / p_res
+    q_f = j_f (future_p_res^2 - p^2)^n
+
+    Elements with p at or above future_p_res are NaN
+
+    INPUT
+        q (present flow rate): dt.NUMERIC_ARRAY
+        p (wellbore pressure): dt.NUMERIC_ARRAY
+        p_res (present reservoir pressure): dt.NUMERIC_ARRAY
+        future_p_res (future reservoir pressure): dt.NUMERIC_ARRAY
+        n (n coefficient): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        q_f: dt.ARRAY
+    """
+    q = np.asarray(q, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    p_res = np.asarray(p_res, dtype=np.float64)
+    future_p_res = np.asarray(future_p_res, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        j_p = q / np.power(p_res * p_res - p * p, n)
+        j_f = j_p * (future_p_res / p_res)
+
+        q_f = j_f * np.power(future_p_res * future_p_res - p * p, n)
+
+    return np.where(p < future_p_res, q_f, np.nan)
+
+
+def curve_family(
+    method, p_res: dt.NUMERIC_ARRAY, q_max: dt.NUMERIC_ARRAY, grid: dt.NUMERIC_ARRAY, n: dt.NUMERIC_ARRAY = None
+):
+    """
+    Calculation of many production graphs sharing
+    one dimensionless pressure grid (p / p_res)
+
+    Flow rate ratio only depends on p / p_res, so it is evaluated
+    once on the grid (or once per curve if n varies per curve)
+    and scaled by q_max of every curve
+
+    INPUT
+        method: "vogel" | "fetkovich" | callable(pr[]) -> qr[]
+        p_res (reservoir pressure of each curve): dt.NUMERIC_ARRAY
+        q_max (max flow rate of each curve): dt.NUMERIC_ARRAY
+        grid (pressure ratio p / p_res, 0 to 1): dt.NUMERIC_ARRAY
+            shared by all curves, or one row per curve
+        n (n coefficient of "fetkovich", one or one per curve): dt.NUMERIC_ARRAY
+
+    OUTPUT
+        (p, q): (dt.ARRAY, dt.ARRAY), both of shape (curves, points)
+    """
+    p_res = np.atleast_1d(np.asarray(p_res, dtype=np.float64))
+    grid = np.asarray(grid, dtype=np.float64)
+
+    q_max = np.broadcast_to(np.asarray(q_max, dtype=np.float64), p_res.shape)
+
+    if (method == "vogel"):
+        qr = vogel_equation_array(grid, 1.0)
+    elif (method == "fetkovich"):
+        n = np.asarray(n, dtype=np.float64)
+        qr = fetkovich_equation_array(grid, 1.0, None, n[:, None] if n.ndim > 0 else n)
+    elif (callable(method)):
+        qr = np.asarray(method(grid), dtype=np.float64)
+    else:
+        raise ValueError("Method of curve family does not exist: %s" % (method))
+
+    p = p_res[:, None] * (grid if grid.ndim == 2 else grid[None, :])
+    q = q_max[:, None] * np.broadcast_to(qr, p.shape)
+
+    return (p, q)
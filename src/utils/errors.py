@@ -1,6 +1,9 @@
 # Error of not existing methods
-class MethodNotExistExecption(BaseException):
+class MethodNotExistExecption(ValueError):
     pass
 
-class PhaseNotExistsException(BaseException):
-    pass
\ No newline at end of file
+class PhaseNotExistsException(ValueError):
+    pass
+
+class BubblePointNotExistException(ValueError):
+    pass
@@ -0,0 +1,45 @@
+"""
+fit_cache.py
+
+Caching of fitted coefficients of production data
+"""
+
+from . import data_types as dt
+
+
+class FitCache:
+    """
+    Fitted coefficients keyed by fitting parameters,
+    all entries are dropped once the data version changes
+    (see ProductionSeries.version)
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.version = None
+
+    def get(self, key, version: dt.INT, fit):
+        """
+        Get cached fitting result or fit it once
+
+        INPUT
+            key: hashable fitting parameters, e.g. ("fetkovich", p_res)
+            version: data version
+            fit: callable without argument returning fitting result
+
+        OUTPUT
+            fitting result
+        """
+
+        if (version != self.version):
+            self.entries.clear()
+            self.version = version
+
+        if (key not in self.entries):
+            self.entries[key] = fit()
+
+        return self.entries[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.version = None
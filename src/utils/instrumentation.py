@@ -0,0 +1,171 @@
+"""
+instrumentation.py
+
+Opt-in call counts and timings of calculation methods
+
+Registered methods are only wrapped while instrumentation is enabled,
+disabling restores the original functions,
+so there is no cost at all while disabled
+"""
+
+import functools
+import inspect
+import json
+import time
+
+from . import data_types as dt
+
+# (owner, attribute name, label) of registered methods
+targets = []
+
+# Original attributes of wrapped targets, { (owner, name): (existed, value) }
+originals = {}
+
+# { label: [calls, total seconds] }
+statistics = {}
+
+enabled = False
+
+
+def register_functions(module, names: list, prefix: dt.STRING = None) -> None:
+    """
+    Register module functions, e.g. register_functions(eq, ["vogel_equation"])
+    """
+
+    prefix = prefix or module.__name__.split(".")[-1]
+
+    for name in names:
+        register(module, name, "%s.%s" % (prefix, name))
+
+
+def register_class(cls, names: list = None, prefix: dt.STRING = None) -> None:
+    """
+    Register public methods defined by class itself,
+    inherited methods are counted by registering their base class.
+    Memoization key helpers (*_key) are not registered
+    """
+
+    prefix = prefix or cls.__name__
+
+    if (names is None):
+        names = sorted(
+            name for (name, value) in vars(cls).items()
+            if inspect.isfunction(value) and not name.startswith("_") and not name.endswith("_key")
+        )
+
+    for name in names:
+        register(cls, name, "%s.%s" % (prefix, name))
+
+
+def register(owner, name: dt.STRING, label: dt.STRING) -> None:
+    targets.append((owner, name, label))
+
+    if (enabled):
+        wrap(owner, name, label)
+
+
+def wrap(owner, name: dt.STRING, label: dt.STRING) -> None:
+    if ((owner, name) in originals):
+        return
+
+    existed = name in vars(owner)
+    function = getattr(owner, name)
+
+    originals[(owner, name)] = (existed, vars(owner).get(name))
+    record = statistics.setdefault(label, [0, 0.0])
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record[0] += 1
+            record[1] += time.perf_counter() - start
+
+    setattr(owner, name, wrapper)
+
+
+def enable() -> None:
+    """
+    Start counting calls and time of registered methods
+    """
+
+    global enabled
+
+    enabled = True
+
+    for (owner, name, label) in targets:
+        wrap(owner, name, label)
+
+
+def disable() -> None:
+    """
+    Restore original methods, collected statistics are kept
+    """
+
+    global enabled
+
+    enabled = False
+
+    for ((owner, name), (existed, value)) in originals.items():
+        if (existed):
+            setattr(owner, name, value)
+        else:
+            delattr(owner, name)
+
+    originals.clear()
+
+
+def is_enabled() -> dt.BOOLEAN:
+    return enabled
+
+
+def reset() -> None:
+    """
+    Set all counts and timings to zero
+    """
+
+    for record in statistics.values():
+        record[0] = 0
+        record[1] = 0.0
+
+
+def snapshot() -> dict:
+    """
+    OUTPUT
+        { label: { "calls": int, "total": numeric, "mean": numeric } }
+        of methods called at least once
+    """
+
+    return {
+        label: {
+            "calls": calls,
+            "total": total,
+            "mean": total / calls,
+        }
+        for (label, (calls, total)) in sorted(statistics.items())
+        if calls > 0
+    }
+
+
+def dump(format: dt.STRING = "text") -> dt.STRING:
+    """
+    Statistics as "text" table (slowest total first) or "json"
+    """
+
+    data = snapshot()
+
+    if (format == "json"):
+        return json.dumps(data, indent=2)
+
+    if (format != "text"):
+        raise ValueError("format must be 'text' or 'json'")
+
+    lines = ["%-56s %10s %12s %12s" % ("method", "calls", "total (s)", "mean (s)")]
+
+    for (label, x) in sorted(data.items(), key=lambda item: -item[1]["total"]):
+        lines.append("%-56s %10d %12.6f %12.9f" % (label, x["calls"], x["total"], x["mean"]))
+
+    return "\n".join(lines)
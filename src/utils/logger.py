@@ -0,0 +1,49 @@
+"""
+logger.py
+
+Logging of calculation details,
+silent unless debug logging is enabled
+"""
+
+import logging
+
+logger = logging.getLogger("ipyr")
+logger.addHandler(logging.NullHandler())
+
+# Handler of the last enable_debug call
+debug_handler = None
+
+
+def enable_debug(stream=None) -> logging.Handler:
+    """
+    Show debug messages of calculations on stream (DEFAULT: stderr),
+    replacing the handler of any previous call
+    """
+
+    global debug_handler
+
+    if (debug_handler is not None):
+        logger.removeHandler(debug_handler)
+
+    debug_handler = logging.StreamHandler(stream)
+    debug_handler.setFormatter(logging.Formatter("%(name)s %(levelname)s: %(message)s"))
+
+    logger.addHandler(debug_handler)
+    logger.setLevel(logging.DEBUG)
+
+    return debug_handler
+
+
+def disable_debug() -> None:
+    """
+    Remove the handler of enable_debug,
+    handlers added by the application are kept
+    """
+
+    global debug_handler
+
+    if (debug_handler is not None):
+        logger.removeHandler(debug_handler)
+        debug_handler = None
+
+    logger.setLevel(logging.NOTSET)
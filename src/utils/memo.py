@@ -0,0 +1,152 @@
+"""
+memo.py
+
+Opt-in memoization of repeated calculations
+with size-bounded LRU eviction
+"""
+
+import functools
+
+from collections import OrderedDict
+
+from . import data_types as dt
+
+DEFAULT_MAXSIZE = 4096
+
+# Shared cache, None while memoization is disabled
+cache = None
+
+
+class LRUCache:
+    """
+    Least recently used cache with hit / miss statistics
+    """
+
+    def __init__(self, maxsize: dt.INT = DEFAULT_MAXSIZE):
+        if (maxsize <= 0):
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> dt.INT:
+        return len(self.entries)
+
+    def __repr__(self):
+        return "LRUCache(maxsize=%d, size=%d, hits=%d, misses=%d)" % (
+            self.maxsize, len(self), self.hits, self.misses
+        )
+
+    def lookup(self, key):
+        """
+        OUTPUT
+            (found, value): (bool, any)
+        """
+
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return (False, None)
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return (True, value)
+
+    def store(self, key, value) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while (len(self.entries) > self.maxsize):
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def statistics(self) -> dict:
+        calls = self.hits + self.misses
+
+        return {
+            "maxsize": self.maxsize,
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / calls if calls > 0 else 0.0,
+        }
+
+
+def enable_memoization(maxsize: dt.INT = DEFAULT_MAXSIZE) -> LRUCache:
+    """
+    Start memoization of decorated methods with a new cache
+    """
+
+    global cache
+
+    cache = LRUCache(maxsize)
+    return cache
+
+
+def disable_memoization() -> None:
+    global cache
+
+    cache = None
+
+
+def get_statistics() -> dict:
+    """
+    Statistics of the shared cache, None while disabled
+    """
+
+    return None if cache is None else cache.statistics()
+
+
+def is_hashable_scalar(*values) -> dt.BOOLEAN:
+    return all(isinstance(x, (int, float, str)) or x is None for x in values)
+
+
+def memoized(key_function):
+    """
+    Memoize method results in the shared cache while enabled
+
+    INPUT
+        key_function (same arguments as the method): callable
+            returns hashable key, or None when the call
+            must not be cached (e.g. arrays)
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if (cache is None):
+                return method(*args, **kwargs)
+
+            key = key_function(*args, **kwargs)
+            if (key is None):
+                return method(*args, **kwargs)
+
+            (found, value) = cache.lookup(key)
+            if (found):
+                return value
+
+            value = method(*args, **kwargs)
+
+            # Failed calculations (None) are not kept
+            if (value is not None):
+                cache.store(key, value)
+
+            return value
+
+        return wrapper
+
+    return decorator
@@ -1,5 +1,150 @@
 import math
 
+import numpy as np
+
+class RegressionAccumulator:
+    """
+    Sufficient statistics of least squares regression
+    (n, sum of x, y, xy, x^2 and y^2)
+
+    Points can be added or removed one by one in O(1)
+    and accumulators of separated data can be merged,
+    so the fit never needs to revisit earlier data.
+
+    log_space = True keeps the statistics of ln (x) and ln (y)
+    for power regression, otherwise the statistics of x and y
+    for linear regression
+    """
+
+    def __init__(self, log_space: bool = False):
+        self.log_space = log_space
+
+        self.n = 0
+        self.x = 0.0
+        self.y = 0.0
+        self.xy = 0.0
+        self.x_squared = 0.0
+        self.y_squared = 0.0
+
+    def __repr__(self):
+        return "RegressionAccumulator(log_space=%s, n=%d)" % (self.log_space, self.n)
+
+    def update(self, x, y, sign: int) -> None:
+        if (self.log_space):
+            x = math.log(x)
+            y = math.log(y)
+
+        self.n += sign
+        self.x += sign * x
+        self.y += sign * y
+        self.xy += sign * x * y
+        self.x_squared += sign * x**2
+        self.y_squared += sign * y**2
+
+    def add(self, x, y) -> "RegressionAccumulator":
+        """
+        Add single point (x, y)
+        """
+
+        self.update(x, y, 1)
+        return self
+
+    def remove(self, x, y) -> "RegressionAccumulator":
+        """
+        Remove single point (x, y) added before
+        """
+
+        self.update(x, y, -1)
+        return self
+
+    def add_many(self, data_x, data_y) -> "RegressionAccumulator":
+        """
+        Add several points at once
+
+        INPUT
+            data_x: numeric[]
+            data_y: numeric[]
+        """
+
+        x = np.asarray(data_x, dtype=np.float64)
+        y = np.asarray(data_y, dtype=np.float64)
+
+        if (self.log_space):
+            if ((x <= 0).any() or (y <= 0).any()):
+                raise ValueError("math domain error")
+
+            x = np.log(x)
+            y = np.log(y)
+
+        self.n += x.size
+        self.x += float(np.sum(x))
+        self.y += float(np.sum(y))
+        self.xy += float(np.dot(x, y))
+        self.x_squared += float(np.dot(x, x))
+        self.y_squared += float(np.dot(y, y))
+
+        return self
+
+    def merge(self, other: "RegressionAccumulator") -> "RegressionAccumulator":
+        """
+        Combine statistics of two accumulators into a new one,
+        e.g. partial fits from parallel workers
+        """
+
+        if (self.log_space != other.log_space):
+            raise ValueError("Cannot merge accumulators of different space")
+
+        result = RegressionAccumulator(self.log_space)
+
+        result.n = self.n + other.n
+        result.x = self.x + other.x
+        result.y = self.y + other.y
+        result.xy = self.xy + other.xy
+        result.x_squared = self.x_squared + other.x_squared
+        result.y_squared = self.y_squared + other.y_squared
+
+        return result
+
+    def __add__(self, other: "RegressionAccumulator") -> "RegressionAccumulator":
+        return self.merge(other)
+
+    def coefficients(self):
+        """
+        y = b1 (x) + b0
+
+        OUTPUT: (b0, b1)
+        """
+
+        n = self.n
+
+        b1 = ((n * self.xy) - (self.x * self.y)) / \
+            ((n * self.x_squared - self.x**2))
+
+        b0 = (self.y - b1 * self.x) / n
+
+        return (b0, b1)
+
+    def linear_coefficients(self):
+        """
+        Same output as linear_regression
+        """
+
+        (b0, b1) = self.coefficients()
+
+        return (b0, 1 / b1)
+
+    def power_coefficients(self):
+        """
+        Same output as power_regression, i.e. (C, n)
+        """
+
+        if (not self.log_space):
+            raise ValueError("Power regression needs log_space accumulator")
+
+        (b0, b1) = self.coefficients()
+
+        return (math.exp(b0), 1 / b1)
+
 def power_regression(data_x, data_y):
     """
     y = a * x^b
@@ -13,52 +158,439 @@ def power_regression(data_x, data_y):
     y = bx + a // y = b1 (x) + b0
     """
 
-    n = len(data_x)
+    return RegressionAccumulator(log_space=True).add_many(data_x, data_y).power_coefficients()
 
-    x = [math.log(i) for i in data_x]
-    y = [math.log(i) for i in data_y]
-    xy = [x[i] * y[i] for i in range(n)]
-    x_squared = [i**2 for i in x]
-    y_squared = [i**2 for i in y]
+def linear_regression(data_x, data_y):
+    """
+    y = a + b + x
+    """
 
-    sums = {
-        "x": sum(x),
-        "y": sum(y),
-        "xy": sum(xy),
-        "x_squared": sum(x_squared),
-        "y_squared": sum(y_squared),
-    }
+    return RegressionAccumulator().add_many(data_x, data_y).linear_coefficients()
 
-    b1 = ((n * sums["xy"]) - (sums["x"] * sums["y"])) / \
-        ((n * sums["x_squared"] - sums["x"]**2))
-    
-    b0 = (sums["y"] - b1 * sums["x"]) / n
-    b0 = math.exp(b0)
+def grouped_power_regression(data_x, data_y, groups, n_groups: int, weights=None):
+    """
+    power_regression of many groups (e.g. wells) at once
 
-    return (b0, 1 / b1)
+    INPUT
+        data_x: numeric[]
+        data_y: numeric[]
+        groups (group index of each point, 0 <= group < n_groups): int[]
+        n_groups: int
+        weights (weight of each point, e.g. test quality): numeric[]
+            DEFAULT: None (equal weights)
 
-def linear_regression(data_x, data_y):
+    OUTPUT
+        (C, n): (numeric[], numeric[]), NaN for groups
+        with less than two distinct points
     """
-    y = a + b + x
+
+    groups = np.asarray(groups, dtype=np.intp)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log(np.asarray(data_x, dtype=np.float64))
+        y = np.log(np.asarray(data_y, dtype=np.float64))
+
+        (b0, b1) = grouped_linear_coefficients(x, y, groups, n_groups, weights)
+
+        return (np.exp(b0), 1 / b1)
+
+def grouped_linear_coefficients(x, y, groups, n_groups: int, weights=None):
     """
+    Weighted least squares y = b0 + b1 x of every group
 
-    n = len(data_x)
+    OUTPUT
+        (b0, b1): (numeric[], numeric[]), NaN for groups
+        with less than two distinct points
+    """
 
-    xy = [data_x[i] * data_y[i] for i in range(n)]
-    x_squared = [i**2 for i in data_x]
-    y_squared = [i**2 for i in data_y]
+    w = np.ones(x.shape) if weights is None else np.asarray(weights, dtype=np.float64)
 
-    sums = {
-        "x": sum(data_x),
-        "y": sum(data_y),
-        "xy": sum(xy),
-        "x_squared": sum(x_squared),
-        "y_squared": sum(y_squared),
-    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = np.bincount(groups, w, n_groups)
+        sum_x = np.bincount(groups, w * x, n_groups)
+        sum_y = np.bincount(groups, w * y, n_groups)
+        sum_xy = np.bincount(groups, w * x * y, n_groups)
+        sum_x_squared = np.bincount(groups, w * x * x, n_groups)
 
-    b1 = ((n * sums["xy"]) - (sums["x"] * sums["y"])) / \
-        ((n * sums["x_squared"] - sums["x"]**2))
-    
-    b0 = (sums["y"] - b1 * sums["x"]) / n
+        denominator = (n * sum_x_squared) - sum_x**2
+
+        # Relative test keeps rounding noise of equal x from passing as spread
+        distinct = np.abs(denominator) > 1e-12 * np.maximum(n * sum_x_squared, 1e-300)
+        denominator = np.where(distinct, denominator, np.nan)
+
+        b1 = ((n * sum_xy) - (sum_x * sum_y)) / denominator
+        b0 = (sum_y - b1 * sum_x) / n
+
+    return (b0, b1)
+
+def grouped_median(values, groups, n_groups: int):
+    """
+    Median of every group, NaN for empty groups
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.intp)
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    has_values = counts > 0
+    lower = np.where(has_values, starts + (counts - 1) // 2, 0)
+    upper = np.where(has_values, starts + counts // 2, 0)
+
+    if (sorted_values.size == 0):
+        return np.full(n_groups, np.nan)
+
+    return np.where(has_values, (sorted_values[lower] + sorted_values[upper]) / 2, np.nan)
+
+# Tuning constants of robust losses (95 % efficiency for normal errors)
+ROBUST_TUNING = {"huber": 1.345, "tukey": 4.685}
+
+# Smallest residual scale (of logs) used by robust regression
+MIN_ROBUST_SCALE = 1e-9
+
+def robust_weights(u, loss: str, tuning: float):
+    """
+    IRLS weights of scaled residuals u
+    """
+
+    u = np.abs(u)
+
+    if (loss == "huber"):
+        return np.where(u <= tuning, 1.0, tuning / np.maximum(u, 1e-300))
+
+    if (loss == "tukey"):
+        return np.where(u < tuning, (1 - (u / tuning)**2)**2, 0.0)
+
+    raise ValueError("loss must be 'huber', 'tukey' or None")
+
+# Largest number of point pairs of each group used by grouped_theil_sen
+MAX_THEIL_SEN_PAIRS = 10000
+
+def grouped_theil_sen(x, y, groups, n_groups: int, max_pairs: int = MAX_THEIL_SEN_PAIRS, seed: int = 0):
+    """
+    Theil-Sen line of every group: median slope of all point pairs
+    of the group and median intercept, robust up to ~29 % outliers
+
+    Groups with more than max_pairs pairs use max_pairs random pairs
+    (seeded, so fits are reproducible), keeping memory linear in points
+
+    OUTPUT
+        (b0, b1): (numeric[], numeric[]), NaN for groups
+        with less than two distinct points
+    """
+
+    order = np.argsort(groups, kind="stable")
+    (x, y, groups) = (x[order], y[order], groups[order])
+
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sampled = counts * (counts - 1) // 2 > max_pairs
+
+    # All pairs (i, j > i) inside each small group, without a loop over groups
+    rank = np.arange(groups.size) - starts[groups]
+    partners = np.where(sampled[groups], 0, counts[groups] - rank - 1)
+
+    first = np.repeat(np.arange(groups.size), partners)
+    offset = np.arange(first.size) - np.repeat(np.cumsum(partners) - partners, partners)
+    second = first + offset + 1
+
+    # Random pairs (i, j != i) inside each large group
+    large = np.repeat(np.flatnonzero(sampled), max_pairs)
+
+    if (large.size > 0):
+        rng = np.random.default_rng(seed)
+        count = counts[large]
+
+        i = (rng.random(large.size) * count).astype(np.intp)
+        j = (rng.random(large.size) * (count - 1)).astype(np.intp)
+        j += j >= i
+
+        first = np.concatenate([first, starts[large] + i])
+        second = np.concatenate([second, starts[large] + j])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (y[second] - y[first]) / (x[second] - x[first])
+
+    finite = np.isfinite(slope)
+    b1 = grouped_median(slope[finite], groups[first][finite], n_groups)
+    b0 = grouped_median(y - b1[groups] * x, groups, n_groups)
+
+    return (b0, b1)
+
+def robust_grouped_power_regression(
+    data_x, data_y, groups, n_groups: int, weights=None, loss: str = "huber",
+    tuning: float = None, single_n: float = None,
+    max_iterations: int = 50, tolerance: float = 1e-8,
+    max_pairs: int = MAX_THEIL_SEN_PAIRS
+):
+    """
+    Weighted, robust power_regression of many groups at once
+    by iteratively reweighted least squares (IRLS) on logs
+
+    IRLS starts from the Theil-Sen line of each group, residuals are
+    scaled by their median absolute deviation (MAD) about that line.
+    Points far from the fit of their group lose weight (huber)
+    or are rejected (tukey). Groups whose points have a single
+    distinct x (e.g. wells with one test) are not fitted:
+    n = single_n is assumed and C passes through their (weighted) mean point
+
+    INPUT
+        data_x: numeric[]
+        data_y: numeric[]
+        groups (group index of each point, 0 <= group < n_groups): int[]
+        n_groups: int
+        weights (prior weight of each point): numeric[]
+            DEFAULT: None (equal weights)
+        loss: "huber" | "tukey" | None (weighted least squares only)
+            DEFAULT: "huber"
+        tuning: numeric
+            DEFAULT: ROBUST_TUNING of loss
+        single_n (n assumed for single point groups): numeric
+            DEFAULT: None (NaN, as grouped_power_regression)
+        max_iterations: int
+            DEFAULT: 50
+        tolerance (of coefficients between iterations): numeric
+            DEFAULT: 1e-8
+        max_pairs (point pairs of each group of the Theil-Sen start): int
+            DEFAULT: MAX_THEIL_SEN_PAIRS
+
+    OUTPUT
+        (C, n, point_weights): (numeric[], numeric[], numeric[]),
+        point_weights are the final weights of each point
+        (0 for rejected points and invalid data)
+    """
+
+    if (loss is not None and loss not in ROBUST_TUNING):
+        raise ValueError("loss must be 'huber', 'tukey' or None")
+
+    groups = np.asarray(groups, dtype=np.intp)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log(np.asarray(data_x, dtype=np.float64))
+        y = np.log(np.asarray(data_y, dtype=np.float64))
+
+    prior = np.ones(x.shape) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # Points without finite logs (q <= 0, p >= p_res) do not take part
+    valid = np.isfinite(x) & np.isfinite(y) & (prior > 0)
+    prior = np.where(valid, prior, 0.0)
+    (x, y) = (np.where(valid, x, 0.0), np.where(valid, y, 0.0))
+
+    point_weights = prior
+    (b0, b1) = grouped_linear_coefficients(x, y, groups, n_groups, point_weights)
+
+    if (loss is not None):
+        tuning = ROBUST_TUNING[loss] if tuning is None else tuning
+
+        (start_b0, start_b1) = grouped_theil_sen(x[valid], y[valid], groups[valid], n_groups, max_pairs)
+        fitted = np.isfinite(start_b1)
+        (b0, b1) = (np.where(fitted, start_b0, b0), np.where(fitted, start_b1, b1))
+
+        # Scale of each group, kept for all iterations.
+        # Floor keeps exact fits from turning rounding noise into outliers
+        residual = y - (b0[groups] + b1[groups] * x)
+        scale = grouped_median(np.abs(residual[valid]), groups[valid], n_groups) / 0.6745
+        scale = np.maximum(scale, MIN_ROBUST_SCALE)
+
+        for _ in range(max_iterations):
+            residual = y - (b0[groups] + b1[groups] * x)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                u = residual / scale[groups]
+
+            point_weights = prior * robust_weights(np.where(np.isfinite(u), u, 0), loss, tuning)
+
+            (new_b0, new_b1) = grouped_linear_coefficients(x, y, groups, n_groups, point_weights)
+
+            # Groups left with less than two distinct points keep the previous fit
+            keep = fitted & ~np.isfinite(new_b1)
+            (new_b0, new_b1) = (np.where(keep, b0, new_b0), np.where(keep, b1, new_b1))
+
+            change = np.abs(np.concatenate([(new_b0 - b0)[fitted], (new_b1 - b1)[fitted]]))
+            (b0, b1) = (new_b0, new_b1)
+
+            if (change.size == 0 or not change.max() > tolerance):
+                break
+
+    if (single_n is not None):
+        # Single point groups: assumed n through the mean point
+        w_sum = np.bincount(groups, point_weights, n_groups)
+        single = ~np.isfinite(b1) & (w_sum > 0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_x = np.bincount(groups, point_weights * x, n_groups) / w_sum
+            mean_y = np.bincount(groups, point_weights * y, n_groups) / w_sum
+
+        b1 = np.where(single, 1 / single_n, b1)
+        b0 = np.where(single, mean_y - b1 * mean_x, b0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.exp(b0), 1 / b1, point_weights)
+
+def robust_power_regression(data_x, data_y, weights=None, loss: str = "huber", single_n: float = None, **kwargs):
+    """
+    robust_grouped_power_regression of single group
+
+    OUTPUT
+        (C, n): (numeric, numeric)
+    """
+
+    data_x = np.atleast_1d(np.asarray(data_x, dtype=np.float64))
+
+    (C, n, point_weights) = robust_grouped_power_regression(
+        data_x, data_y, np.zeros(data_x.size, dtype=np.intp), 1,
+        weights, loss, single_n=single_n, **kwargs
+    )
+
+    return (float(C[0]), float(n[0]))
+
+# Largest number of points placed by adaptive_sample
+MAX_ADAPTIVE_POINTS = 1000
+
+def adaptive_sample(
+    function, start, stop, tolerance, n: int = 1,
+    max_points: int = MAX_ADAPTIVE_POINTS, points=None
+):
+    """
+    Sample y = function(x) between start and stop, splitting intervals
+    until linear interpolation between neighbouring points is within
+    tolerance of the function at every interval midpoint
+
+    INPUT
+        function (accepts and returns arrays): callable(x[]) -> y[]
+        start: numeric
+        stop: numeric
+        tolerance (absolute error of y): numeric
+        n (initial even intervals): int
+            DEFAULT: 1
+        max_points: int
+            DEFAULT: MAX_ADAPTIVE_POINTS
+        points (always sampled, e.g. measured data): numeric[]
+            DEFAULT: None
+
+    OUTPUT
+        (x, y): (numeric[], numeric[]) sorted by x
+    """
+
+    if (tolerance <= 0):
+        raise ValueError("tolerance must be positive")
+
+    x = np.linspace(start, stop, max(int(n), 1) + 1)
+
+    if (points is not None):
+        points = np.asarray(points, dtype=np.float64)
+        x = np.union1d(x, points[(points > start) & (points < stop)])
+
+    y = np.asarray(function(x), dtype=np.float64)
+
+    while (x.size < max_points):
+        x_mid = (x[:-1] + x[1:]) / 2
+        y_mid = np.asarray(function(x_mid), dtype=np.float64)
+
+        error = np.abs(y_mid - (y[:-1] + y[1:]) / 2)
+        split = np.flatnonzero(error > tolerance)
+
+        if (split.size == 0):
+            break
+
+        # Spend the remaining points on the largest errors
+        budget = max_points - x.size
+        if (split.size > budget):
+            split = split[np.argsort(error[split])[::-1][:budget]]
+            split.sort()
+
+        x = np.insert(x, split + 1, x_mid[split])
+        y = np.insert(y, split + 1, y_mid[split])
+
+    return (x, y)
+
+def solve_monotone(
+    function, target, lower, upper, derivative=None,
+    tolerance: float = 1e-10, max_iterations: int = 100
+):
+    """
+    Solve function(x) = target for every element at once,
+    with function monotone between lower and upper
+
+    Newton steps (derivative, or finite difference if not given)
+    are kept inside the bracket, otherwise the bracket is bisected.
+    Elements stop once converged, elements without sign change
+    in the bracket are NaN
+
+    INPUT
+        function (accepts and returns arrays): callable(x[]) -> y[]
+        target: numeric[]
+        lower: numeric[]
+        upper: numeric[]
+        derivative (dy/dx, accepts and returns arrays): callable(x[]) -> y[]
+            DEFAULT: None (finite difference)
+        tolerance (of x and of function(x) - target): numeric
+            DEFAULT: 1e-10
+        max_iterations: int
+            DEFAULT: 100
+
+    OUTPUT
+        (x, converged): (numeric[], bool[])
+    """
+
+    target = np.asarray(target, dtype=np.float64)
+    shape = np.broadcast(target, np.asarray(lower), np.asarray(upper)).shape
+
+    target = np.broadcast_to(target, shape)
+    lower = np.array(np.broadcast_to(np.asarray(lower, dtype=np.float64), shape))
+    upper = np.array(np.broadcast_to(np.asarray(upper, dtype=np.float64), shape))
+
+    def residual(x):
+        return np.broadcast_to(np.asarray(function(x), dtype=np.float64), shape) - target
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        f_lower = residual(lower)
+        f_upper = residual(upper)
+
+        # Roots at the bracket ends, within tolerance
+        at_lower = np.abs(f_lower) <= tolerance
+        at_upper = np.abs(f_upper) <= tolerance
+
+        x = np.where(at_lower, lower, np.where(at_upper, upper, (lower + upper) / 2))
+        converged = at_lower | at_upper
+
+        bracketed = (np.sign(f_lower) != np.sign(f_upper)) & np.isfinite(f_lower) & np.isfinite(f_upper)
+        active = bracketed & ~converged
+
+        for _ in range(max_iterations):
+            if (not active.any()):
+                break
+
+            f_x = residual(x)
+
+            # Keep sign change inside [lower, upper]
+            same_as_lower = np.sign(f_x) == np.sign(f_lower)
+            lower = np.where(active & same_as_lower, x, lower)
+            f_lower = np.where(active & same_as_lower, f_x, f_lower)
+            upper = np.where(active & ~same_as_lower, x, upper)
+
+            if (derivative is not None):
+                slope = np.broadcast_to(np.asarray(derivative(x), dtype=np.float64), shape)
+            else:
+                step = 1e-7 * np.maximum(np.abs(upper - lower), 1e-12)
+                slope = (residual(x + step) - f_x) / step
+
+            newton = x - f_x / slope
+            inside = np.isfinite(newton) & (newton > lower) & (newton < upper)
+            x_next = np.where(inside, newton, (lower + upper) / 2)
+
+            done = active & (
+                (np.abs(f_x) <= tolerance)
+                | (np.abs(x_next - x) <= tolerance)
+                | (np.abs(upper - lower) <= tolerance)
+            )
+
+            x = np.where(active & ~done, x_next, x)
+            converged = converged | done
+            active = active & ~done
 
-    return (b0, 1 / b1)
+    return (np.where(bracketed | converged, x, np.nan), converged)
@@ -0,0 +1,244 @@
+"""
+production_series.py
+
+Columnar storage of production data
+"""
+
+from . import data_types as dt
+
+import numpy as np
+
+# Initial capacity of non-empty series
+MIN_CAPACITY = 4
+
+# Data shown by repr before truncation
+MAX_PREVIEW = 5
+
+
+class ProductionSeries:
+    """
+    Production data stored as contiguous float64 columns
+    of flow rate (q), pressure (p) and optional timestamp (t)
+
+    Single data are still read and written as
+    { "q": numeric, "p": numeric } (with "t" if timestamps exist),
+    while q, p and t give zero-copy, read-only NumPy views of the columns.
+    Data are modified through [], append, extend and pop only.
+
+    version counts modifications, so fitted coefficients
+    can be reused until the data changes
+    """
+
+    __slots__ = ("_q", "_p", "_t", "size", "version")
+
+    def __init__(self, data: dt.FLOWRATE_PRESSURE_DATA = ()):
+        """
+        INPUT
+            data: { "q": numeric, "p": numeric, "t"?: numeric }[] | ProductionSeries
+        """
+
+        self._q = np.empty(0, dtype=np.float64)
+        self._p = np.empty(0, dtype=np.float64)
+        self._t = None
+
+        self.size = 0
+        self.version = 0
+
+        self.extend(data)
+
+    @classmethod
+    def from_arrays(cls, q, p, t=None) -> "ProductionSeries":
+        """
+        Create series from columns of flow rate, pressure
+        and optional timestamp
+
+        INPUT
+            q (flow rate): numeric[]
+            p (pressure): numeric[]
+            t (timestamp): numeric[]
+
+        OUTPUT: ProductionSeries
+        """
+
+        series = cls()
+
+        series._q = np.array(q, dtype=np.float64, copy=True).ravel()
+        series._p = np.array(p, dtype=np.float64, copy=True).ravel()
+
+        if (series._q.size != series._p.size):
+            raise ValueError("q and p must have the same length")
+
+        if (t is not None):
+            series._t = np.array(t, dtype=np.float64, copy=True).ravel()
+
+            if (series._t.size != series._q.size):
+                raise ValueError("t must have the same length as q and p")
+
+        series.size = series._q.size
+
+        return series
+
+    def view(self, column: dt.ARRAY) -> dt.ARRAY:
+        # Writes through the view would not bump version
+        result = column[:self.size]
+        result.flags.writeable = False
+
+        return result
+
+    @property
+    def q(self) -> dt.ARRAY:
+        return self.view(self._q)
+
+    @property
+    def p(self) -> dt.ARRAY:
+        return self.view(self._p)
+
+    @property
+    def t(self):
+        return None if self._t is None else self.view(self._t)
+
+    def reserve(self, capacity: dt.INT) -> None:
+        """
+        Grow columns to hold at least capacity data
+        """
+
+        if (capacity <= self._q.size):
+            return
+
+        capacity = max(capacity, 2 * self._q.size, MIN_CAPACITY)
+
+        self._q = self.grow(self._q, capacity)
+        self._p = self.grow(self._p, capacity)
+
+        if (self._t is not None):
+            self._t = self.grow(self._t, capacity)
+
+    def grow(self, column: dt.ARRAY, capacity: dt.INT) -> dt.ARRAY:
+        result = np.empty(capacity, dtype=np.float64)
+        result[:self.size] = column[:self.size]
+
+        return result
+
+    def set_row(self, index: dt.INT, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA) -> None:
+        self._q[index] = data["q"]
+        self._p[index] = data["p"]
+
+        if ("t" in data):
+            if (self._t is None):
+                self._t = np.full(self._q.size, np.nan)
+
+            self._t[index] = data["t"]
+
+        elif (self._t is not None):
+            self._t[index] = np.nan
+
+    def append(self, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA) -> None:
+        self.reserve(self.size + 1)
+        self.set_row(self.size, data)
+
+        self.size += 1
+        self.version += 1
+
+    def extend(self, data: dt.FLOWRATE_PRESSURE_DATA) -> None:
+        if (isinstance(data, ProductionSeries)):
+            self.extend_arrays(data.q, data.p, data.t)
+            return
+
+        for x in data:
+            self.reserve(self.size + 1)
+            self.set_row(self.size, x)
+
+            self.size += 1
+
+        self.version += 1
+
+    def extend_arrays(self, q, p, t=None) -> None:
+        """
+        Append columns of flow rate, pressure and optional timestamp
+        """
+
+        q = np.asarray(q, dtype=np.float64).ravel()
+        p = np.asarray(p, dtype=np.float64).ravel()
+
+        if (q.size != p.size):
+            raise ValueError("q and p must have the same length")
+
+        start = self.size
+        stop = start + q.size
+
+        self.reserve(stop)
+
+        self._q[start:stop] = q
+        self._p[start:stop] = p
+
+        if (t is not None and self._t is None):
+            self._t = np.full(self._q.size, np.nan)
+
+        if (self._t is not None):
+            self._t[start:stop] = np.nan if t is None else np.asarray(t, dtype=np.float64).ravel()
+
+        self.size = stop
+        self.version += 1
+
+    def pop(self, index: dt.INT = -1) -> dt.FLOWRATE_PRESSURE_SINGLE_DATA:
+        data = self[index]
+        index = range(self.size)[index]
+
+        for column in (self._q, self._p, self._t):
+            if (column is not None):
+                column[index:self.size - 1] = column[index + 1:self.size]
+
+        self.size -= 1
+        self.version += 1
+
+        return data
+
+    def clear(self) -> None:
+        self.size = 0
+        self.version += 1
+
+    def to_list(self) -> dt.FLOWRATE_PRESSURE_DATA:
+        return list(self)
+
+    def __len__(self) -> dt.INT:
+        return self.size
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self.row(i)
+
+    def row(self, index: dt.INT) -> dt.FLOWRATE_PRESSURE_SINGLE_DATA:
+        data = {"q": float(self._q[index]), "p": float(self._p[index])}
+
+        if (self._t is not None):
+            data["t"] = float(self._t[index])
+
+        return data
+
+    def __getitem__(self, index):
+        if (isinstance(index, slice)):
+            return ProductionSeries.from_arrays(self.q[index], self.p[index], None if self._t is None else self.t[index])
+
+        return self.row(range(self.size)[index])
+
+    def __setitem__(self, index: dt.INT, data: dt.FLOWRATE_PRESSURE_SINGLE_DATA) -> None:
+        self.set_row(range(self.size)[index], data)
+        self.version += 1
+
+    def preview(self, limit: dt.INT = MAX_PREVIEW) -> dt.STRING:
+        """
+        Text of the first limit data, one per line
+        """
+
+        lines = ["    " + dt.STRING(self.row(i)) + "," for i in range(min(self.size, limit))]
+
+        if (self.size > limit):
+            lines.append("    ... (%d more)" % (self.size - limit))
+
+        return "\n".join(lines)
+
+    def __repr__(self):
+        if (self.size > MAX_PREVIEW):
+            return "ProductionSeries(size=%d, [\n%s\n])" % (self.size, self.preview())
+
+        return repr(self.to_list())
@@ -0,0 +1,404 @@
+"""
+well_store.py
+
+Persistent SQLite store of wells, well tests and fitted IPR results
+
+Schema:
+    wells (id, name, p_res, method, water_cut, phase, p_b)
+    tests (id, well_id, q, p, t, weight), indexed by well_id
+    fits (well_id, method, tests_hash, C, n, q_max), one row per well and method
+
+tests_hash covers everything a fit depends on (tests, well
+properties and fitting options), so update_fits only refits
+wells changed since their stored fit
+"""
+
+import hashlib
+import sqlite3
+
+import numpy as np
+
+from .utils import *
+from .fleet import FLEET_METHODS, WellFleet
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wells (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    p_res REAL NOT NULL,
+    method TEXT NOT NULL DEFAULT 'vogel',
+    water_cut REAL NOT NULL DEFAULT 0,
+    phase TEXT NOT NULL DEFAULT 'oil',
+    p_b REAL
+);
+
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    well_id INTEGER NOT NULL REFERENCES wells (id) ON DELETE CASCADE,
+    q REAL NOT NULL,
+    p REAL NOT NULL,
+    t REAL,
+    weight REAL NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS tests_well_id ON tests (well_id, id);
+
+CREATE TABLE IF NOT EXISTS fits (
+    well_id INTEGER NOT NULL REFERENCES wells (id) ON DELETE CASCADE,
+    method TEXT NOT NULL,
+    tests_hash TEXT NOT NULL,
+    C REAL,
+    n REAL,
+    q_max REAL,
+    PRIMARY KEY (well_id, method)
+);
+"""
+
+# Structured array layout of stored fits
+FIT_DTYPE = np.dtype([
+    ("well", np.int64), ("C", np.float64), ("n", np.float64), ("q_max", np.float64)
+])
+
+
+def as_column(values, size: dt.INT, dtype=np.float64) -> dt.ARRAY:
+    return np.broadcast_to(np.asarray(values, dtype=dtype), (size,))
+
+
+def as_float(values) -> list:
+    """
+    Python floats of array, NaN stored as NULL
+    """
+
+    return [None if x != x else x for x in np.asarray(values, dtype=np.float64).tolist()]
+
+
+class WellStore:
+    """
+    Wells, tests and fits kept in a SQLite database,
+    loaded back as arrays and WellFleet
+    """
+
+    def __init__(self, path=":memory:"):
+        """
+        INPUT
+            path (database file, ":memory:" for a temporary one): str
+                DEFAULT: ":memory:"
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def __repr__(self):
+        return "WellStore(%r, wells=%d, tests=%d)" % (
+            self.path, self.count("wells"), self.count("tests")
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def count(self, table: dt.STRING) -> dt.INT:
+        return self.connection.execute("SELECT COUNT(*) FROM %s" % (table)).fetchone()[0]
+
+    def put_wells(
+        self,
+        name: dt.STRING_ARRAY,
+        p_res: dt.NUMERIC_ARRAY,
+        method: dt.STRING_ARRAY = "vogel",
+        water_cut: dt.NUMERIC_ARRAY = 0,
+        phase: dt.STRING_ARRAY = "oil",
+        p_b: dt.NUMERIC_ARRAY = np.nan,
+    ) -> None:
+        """
+        Insert wells, or update properties of existing wells (by name)
+        in a single transaction
+
+        INPUT
+            see WellFleet, name (unique name of each well): str[]
+        """
+
+        name = np.atleast_1d(np.asarray(name, dtype=np.str_))
+        size = name.size
+
+        rows = list(zip(
+            name.tolist(),
+            as_float(as_column(p_res, size)),
+            as_column(method, size, np.str_).tolist(),
+            as_float(as_column(water_cut, size)),
+            as_column(phase, size, np.str_).tolist(),
+            as_float(as_column(p_b, size)),
+        ))
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO wells (name, p_res) VALUES (?, ?)",
+                [(x[0], x[1]) for x in rows],
+            )
+            self.connection.executemany(
+                "UPDATE wells SET p_res = ?, method = ?, water_cut = ?, phase = ?, p_b = ? WHERE name = ?",
+                [x[1:] + (x[0],) for x in rows],
+            )
+
+    def get_well_ids(self, name: dt.STRING_ARRAY) -> dt.ARRAY:
+        """
+        Database id of each well name
+
+        OUTPUT
+            int[], KeyError for unknown wells
+        """
+
+        ids = dict(self.connection.execute("SELECT name, id FROM wells"))
+        name = np.atleast_1d(np.asarray(name, dtype=np.str_)).tolist()
+
+        unknown = sorted(set(name) - set(ids))
+        if (unknown):
+            raise KeyError("Wells do not exist: %s" % (unknown[:10]))
+
+        return np.array([ids[x] for x in name], dtype=np.int64)
+
+    def add_tests(
+        self,
+        well: dt.STRING_ARRAY,
+        q: dt.NUMERIC_ARRAY,
+        p: dt.NUMERIC_ARRAY,
+        t: dt.NUMERIC_ARRAY = None,
+        weight: dt.NUMERIC_ARRAY = 1,
+    ) -> None:
+        """
+        Insert well tests in a single transaction
+
+        INPUT
+            well (well name of each test): str[]
+            q (Flow rate of each test): numeric[]
+            p (Pressure of each test): numeric[]
+            t (Timestamp of each test): numeric[]
+                DEFAULT: None
+            weight (Weight of each test in Fetkovich fitting): numeric | numeric[]
+                DEFAULT: 1
+        """
+
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        size = q.size
+
+        well_id = self.get_well_ids(well)
+        if (well_id.size != size):
+            raise ValueError("well must have the same length as q and p")
+
+        rows = zip(
+            well_id.tolist(),
+            q.tolist(),
+            as_column(p, size).tolist(),
+            as_float(as_column(np.nan if t is None else t, size)),
+            as_column(weight, size).tolist(),
+        )
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO tests (well_id, q, p, t, weight) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def delete_tests(self, well: dt.STRING_ARRAY) -> None:
+        """
+        Remove all tests of wells
+        """
+
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM tests WHERE well_id = ?",
+                [(x,) for x in self.get_well_ids(well).tolist()],
+            )
+
+    def load_arrays(self) -> dict:
+        """
+        Load all wells and tests as arrays, wells in order of insertion
+
+        OUTPUT
+            {
+                "id": int[], "name": str[], "p_res": numeric[], "method": str[],
+                "water_cut": numeric[], "phase": str[], "p_b": numeric[],
+                "test_well" (well index of each test): int[],
+                "q": numeric[], "p": numeric[], "t": numeric[], "weight": numeric[],
+            }
+        """
+
+        wells = self.connection.execute(
+            "SELECT id, name, p_res, method, water_cut, phase, p_b FROM wells ORDER BY id"
+        ).fetchall()
+        tests = self.connection.execute(
+            "SELECT well_id, q, p, t, weight FROM tests ORDER BY well_id, id"
+        ).fetchall()
+
+        wells = list(zip(*wells)) or [()] * 7
+        tests = np.array(tests, dtype=np.float64).reshape(-1, 5)
+
+        ids = np.array(wells[0], dtype=np.int64)
+
+        return {
+            "id": ids,
+            "name": np.array(wells[1], dtype=np.str_),
+            "p_res": np.array(wells[2], dtype=np.float64),
+            "method": np.array(wells[3], dtype=np.str_),
+            "water_cut": np.array(wells[4], dtype=np.float64),
+            "phase": np.array(wells[5], dtype=np.str_),
+            "p_b": np.array(wells[6], dtype=np.float64),
+            "test_well": np.searchsorted(ids, tests[:, 0].astype(np.int64)),
+            "q": tests[:, 1],
+            "p": tests[:, 2],
+            "t": tests[:, 3],
+            "weight": tests[:, 4],
+        }
+
+    def load_fleet(self, method: dt.STRING = None, arrays: dict = None, **kwargs) -> WellFleet:
+        """
+        Create WellFleet of all stored wells and tests
+
+        INPUT
+            method (same method for every well): str
+                DEFAULT: None (stored method of each well)
+            arrays (result of load_arrays): dict
+                DEFAULT: load_arrays()
+            **kwargs: fetkovich_loss, single_n of WellFleet
+
+        OUTPUT: WellFleet, wells in order of load_arrays
+        """
+
+        x = self.load_arrays() if arrays is None else arrays
+
+        return WellFleet(
+            x["p_res"], x["q"], x["p"],
+            method=x["method"] if method is None else method,
+            water_cut=x["water_cut"],
+            phase=x["phase"],
+            well=x["test_well"],
+            p_b=x["p_b"],
+            weight=x["weight"],
+            **kwargs
+        )
+
+    def get_tests_hashes(self, method: dt.STRING, arrays: dict, options: tuple = ()) -> list:
+        """
+        Hash of everything a fit of each well depends on
+
+        OUTPUT
+            str[] (hex digest of each well)
+        """
+
+        order = np.argsort(arrays["test_well"], kind="stable")
+        bounds = np.searchsorted(arrays["test_well"][order], np.arange(arrays["id"].size + 1))
+
+        columns = np.stack([arrays["q"], arrays["p"], arrays["weight"]], axis=1)[order]
+        hashes = []
+
+        for i in range(arrays["id"].size):
+            digest = hashlib.blake2b(digest_size=16)
+
+            digest.update(repr((
+                method, options, float(arrays["p_res"][i]), float(arrays["water_cut"][i]),
+                dt.STRING(arrays["phase"][i]), float(arrays["p_b"][i]),
+            )).encode())
+            digest.update(np.ascontiguousarray(columns[bounds[i]:bounds[i + 1]]).tobytes())
+
+            hashes.append(digest.hexdigest())
+
+        return hashes
+
+    def update_fits(self, method: dt.STRING = "fetkovich", force: dt.BOOLEAN = False, **kwargs) -> dt.INT:
+        """
+        Fit wells with new or changed tests (or properties)
+        since their stored fit of method, and store the results
+
+        INPUT
+            method (fitted for every well): str
+                DEFAULT: "fetkovich"
+            force (refit every well): bool
+                DEFAULT: False
+            **kwargs: fetkovich_loss, single_n of WellFleet
+
+        OUTPUT
+            number of refitted wells
+        """
+
+        if (method not in FLEET_METHODS):
+            raise err.MethodNotExistExecption("Method of calculation does not exist: %s" % (method))
+
+        x = self.load_arrays()
+        hashes = self.get_tests_hashes(method, x, tuple(sorted(kwargs.items())))
+
+        stored = dict(self.connection.execute(
+            "SELECT well_id, tests_hash FROM fits WHERE method = ?", (method,)
+        ))
+
+        changed = np.array([
+            force or stored.get(well_id) != digest
+            for (well_id, digest) in zip(x["id"].tolist(), hashes)
+        ], dtype=bool)
+
+        if (not changed.any()):
+            return 0
+
+        # Fleet of changed wells and their tests only
+        keep = changed[x["test_well"]]
+        position = np.cumsum(changed) - 1
+
+        subset = {
+            name: values[changed] for (name, values) in x.items()
+            if name in ("id", "name", "p_res", "method", "water_cut", "phase", "p_b")
+        }
+        subset.update({
+            name: x[name][keep] for name in ("q", "p", "t", "weight")
+        })
+        subset["test_well"] = position[x["test_well"][keep]]
+
+        fleet = self.load_fleet(method, subset, **kwargs)
+
+        (C, n) = fleet.get_fetkovich_coefficients() if method == "fetkovich" else (np.full(len(fleet), np.nan),) * 2
+        q_max = fleet.calculate_q_max()["q_max"]
+
+        rows = zip(
+            subset["id"].tolist(),
+            [method] * len(fleet),
+            [digest for (digest, is_changed) in zip(hashes, changed) if is_changed],
+            as_float(C), as_float(n), as_float(q_max),
+        )
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fits (well_id, method, tests_hash, C, n, q_max) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        log.logger.debug("refitted %d of %d wells (%s)", len(fleet), x["id"].size, method)
+
+        return len(fleet)
+
+    def load_fits(self, method: dt.STRING = "fetkovich") -> dt.ARRAY:
+        """
+        Stored fits of method, wells in order of load_arrays
+
+        OUTPUT
+            { "well": int, "C": numeric, "n": numeric, "q_max": numeric }[]
+            (structured array), NaN for wells without stored fit
+        """
+
+        ids = [x[0] for x in self.connection.execute("SELECT id FROM wells ORDER BY id")]
+        fits = {
+            well_id: values for (well_id, *values) in self.connection.execute(
+                "SELECT well_id, C, n, q_max FROM fits WHERE method = ?", (method,)
+            )
+        }
+
+        result = np.empty(len(ids), dtype=FIT_DTYPE)
+        result["well"] = np.arange(len(ids))
+
+        values = np.array([fits.get(x, (None, None, None)) for x in ids], dtype=np.float64).reshape(-1, 3)
+        (result["C"], result["n"], result["q_max"]) = (values[:, 0], values[:, 1], values[:, 2])
+
+        return result